@@ -0,0 +1,689 @@
+"""Benchmarks of the SDF load, the pipeline stages and the dashboard callbacks on
+synthetic inputs of different sizes.
+
+Run all the benchmarks and save the results:
+
+    python -m benchmarks.bench run --sizes small medium -o new.json
+
+Compare two result files (exits with 1 if there are regressions):
+
+    python -m benchmarks.bench compare old.json new.json
+
+The benchmarks can also be run by pytest: `pytest benchmarks`.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from functools import cached_property
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+import mat_dp_pipeline.data_sources as ds
+from mat_dp_pipeline import App, create_sdf, pipeline
+from mat_dp_pipeline.data_sources.country_sets import Identifier
+from mat_dp_pipeline.data_sources.mat_dp_db import mat_dp_names_to_paths
+from mat_dp_pipeline.pipeline.calculation import calculate
+from mat_dp_pipeline.pipeline.common import ProcessableInput, SparseYearsInput
+from mat_dp_pipeline.pipeline.flatten_hierarchy import flatten_hierarchy
+from mat_dp_pipeline.pipeline.pipeline import PipelineOutput
+from mat_dp_pipeline.pipeline.sparse_to_processable_input import to_processable_input
+from mat_dp_pipeline.sdf import (
+    SDFCache,
+    SDFFormat,
+    StandardDataFormat,
+    Year,
+    convert_sdf,
+)
+from mat_dp_pipeline.sdf.standard_data_format import load
+from mat_dp_pipeline.sdf.synthetic import (
+    SyntheticSDFSpec,
+    generate_sdf,
+    write_synthetic_sdf,
+)
+
+
+@dataclass(frozen=True)
+class Size:
+    """Size of the benchmark inputs.
+
+    Attributes:
+        name (str): Name of the size
+        spec (SyntheticSDFSpec): Shape of the synthetic SDF
+        n_regions (int): Number of countries in the data sources' inputs
+        n_models (int): Number of models in the IAM targets
+        n_scenarios (int): Number of scenarios of each model in the IAM targets
+        n_renders (int): Number of leaves the dashboard tabs are rendered for
+    """
+
+    name: str
+    spec: SyntheticSDFSpec
+    n_regions: int
+    n_models: int
+    n_scenarios: int
+    n_renders: int
+
+
+SIZES: dict[str, Size] = {
+    s.name: s
+    for s in [
+        Size(
+            name="small",
+            spec=SyntheticSDFSpec(depth=2, fan_out=3),
+            n_regions=5,
+            n_models=2,
+            n_scenarios=2,
+            n_renders=2,
+        ),
+        Size(
+            name="medium",
+            spec=SyntheticSDFSpec(depth=3, fan_out=6, n_techs=20, n_resources=10),
+            n_regions=30,
+            n_models=3,
+            n_scenarios=5,
+            n_renders=5,
+        ),
+        Size(
+            name="large",
+            spec=SyntheticSDFSpec(
+                depth=4, fan_out=8, n_techs=30, n_resources=15, n_indicators=3
+            ),
+            n_regions=100,
+            n_models=5,
+            n_scenarios=10,
+            n_renders=10,
+        ),
+    ]
+}
+
+_TARGET_YEARS = [str(y) for y in range(2020, 2055, 5)]
+_TMBA_PARAMETERS = [
+    "Power Generation Capacity (Aggregate)",
+    "Power Generation (Aggregate)",
+]
+_IAM_PARAMETERS = ["Capacity|Electricity"]
+_IAMc_PARAMETERS = ["Capacity Additions|Electricity"]
+
+
+class Workspace:
+    """Inputs of the benchmarks of a single size. They are built lazily, on the first
+    use, and shared between the benchmarks. Building them is never timed.
+    """
+
+    size: Size
+    directory: Path
+
+    def __init__(self, size: Size, directory: Path):
+        self.size = size
+        self.directory = directory
+        self._rng = np.random.default_rng(size.spec.seed)
+
+    @cached_property
+    def sdf_dir(self) -> Path:
+        return write_synthetic_sdf(self.directory / "sdf", self.size.spec)
+
+    @cached_property
+    def binary_sdf_dir(self) -> Path:
+        return convert_sdf(
+            self.sdf_dir, self.directory / "sdf_binary", SDFFormat.BINARY
+        )
+
+    @cached_property
+    def sdf_archive(self) -> Path:
+        return convert_sdf(self.sdf_dir, self.directory / "sdf.sdfa")
+
+    @cached_property
+    def sdf(self) -> StandardDataFormat:
+        return generate_sdf(self.size.spec)
+
+    @cached_property
+    def flattened(self) -> list[tuple[Path, SparseYearsInput]]:
+        return flatten_hierarchy(self.sdf)
+
+    @cached_property
+    def inputs(self) -> list[tuple[Path, Year, ProcessableInput]]:
+        cache = {}
+        return [
+            inpt
+            for path, sparse_years in self.flattened
+            for inpt in to_processable_input(path, sparse_years, cache)
+        ]
+
+    @cached_property
+    def output(self) -> PipelineOutput:
+        return pipeline(self.sdf)
+
+    @cached_property
+    def app(self) -> App:
+        return App(self.output)
+
+    @cached_property
+    def rendered_paths(self) -> list[Path]:
+        return self.app.paths[: self.size.n_renders]
+
+    @cached_property
+    def countries(self) -> pd.DataFrame:
+        """Countries of the MatDP DB with their names and ISO codes, indexed by path."""
+        source = ds.MatDPDBIntensitiesSource
+        countries = pd.DataFrame(
+            {
+                "name": {p: n for n, p in source.country_to_path().items()},
+                "alpha_2": {
+                    p: c for c, p in source.country_to_path(Identifier.alpha_2).items()
+                },
+                "alpha_3": {
+                    p: c for c, p in source.country_to_path(Identifier.alpha_3).items()
+                },
+            }
+        ).dropna()
+        return countries.iloc[: self.size.n_regions]
+
+    @cached_property
+    def matdp_intensities(self) -> pd.DataFrame:
+        """Raw "Material intensities" sheet: all the techs in every region,
+        continent and "General".
+        """
+        tech_map = ds.create_tech_map(ds.TechMapTypes.TMBA)
+        techs = sorted(set(tech_map.values())) + list(self.size.spec.techs)
+        locations = list(mat_dp_names_to_paths)
+        locations += self.countries["name"].to_list()
+        resources = self.size.spec.resources
+
+        index = pd.MultiIndex.from_product(
+            [locations, range(len(techs))], names=["Location", "Tech"]
+        )
+        tech_of_row = index.get_level_values("Tech")
+        values = self._rng.uniform(0.0, 10.0, size=(len(index), len(resources)))
+        raw = pd.DataFrame(
+            {
+                "Technology category": [techs[t][0] for t in tech_of_row],
+                "Technology name": [techs[t][1] for t in tech_of_row],
+                "Technology description": "Synthetic tech",
+                "Units": [f"tonnes/{techs[t][0]} unit" for t in tech_of_row],
+                "Location": index.get_level_values("Location"),
+                "Total": values.sum(axis=1),
+                "Comments": None,
+                "Data collection date": "2023-01-01",
+                "Updated on": "2023-01-01",
+                "Technology primary purpose": "Benchmark",
+            }
+        )
+        return raw.join(pd.DataFrame(values.round(6), columns=resources))
+
+    @cached_property
+    def matdp_indicators(self) -> pd.DataFrame:
+        """Raw "Material emissions" sheet."""
+        spec = self.size.spec
+        raw = pd.DataFrame(
+            {
+                "Material code": spec.resources,
+                "Material description": "Synthetic resource",
+                "Object title in Ecoinvent": "Synthetic resource",
+                "Location of dataset": "GLO",
+                "Notes": "Benchmark",
+            }
+        )
+        values = self._rng.uniform(0.0, 5.0, size=(len(raw), spec.n_indicators))
+        return raw.join(pd.DataFrame(values.round(6), columns=spec.indicators))
+
+    def _targets_values(self, n_rows: int) -> pd.DataFrame:
+        values = self._rng.uniform(0.0, 1000.0, size=(n_rows, len(_TARGET_YEARS)))
+        return pd.DataFrame(values.round(3), columns=_TARGET_YEARS)
+
+    @cached_property
+    def tmba_targets(self) -> pd.DataFrame:
+        """Raw TEMBA results: every tech of the tech map, for all the parameters."""
+        variables = list(ds.create_tech_map(ds.TechMapTypes.TMBA))
+        keys = pd.MultiIndex.from_product(
+            [self.countries["alpha_2"], _TMBA_PARAMETERS, variables],
+            names=["country", "parameter", "variable"],
+        ).to_frame(index=False)
+        keys.insert(0, "Unnamed: 0", range(len(keys)))
+        keys.insert(1, "scenario", "Benchmark")
+        return keys.join(self._targets_values(len(keys)))
+
+    @cached_property
+    def tmba_csv(self) -> Path:
+        path = self.directory / "tmba_results.csv"
+        self.tmba_targets.to_csv(path, index=False)
+        return path
+
+    def _iam_targets(
+        self, parameter: str, unit: str, with_index_column: bool
+    ) -> pd.DataFrame:
+        variables = list(ds.create_tech_map(ds.TechMapTypes.IAM))
+        keys = pd.MultiIndex.from_product(
+            [
+                [f"Model {m}" for m in range(self.size.n_models)],
+                [f"Scenario {s}" for s in range(self.size.n_scenarios)],
+                self.countries["alpha_3"],
+                [f"{parameter}|{v}" for v in variables],
+            ],
+            names=["Model", "Scenario", "Region", "Variable"],
+        ).to_frame(index=False)
+        keys["Unit"] = unit
+        if with_index_column:
+            keys.insert(0, "Unnamed: 0", range(len(keys)))
+        return keys.join(self._targets_values(len(keys)))
+
+    @cached_property
+    def iam_targets(self) -> pd.DataFrame:
+        return self._iam_targets(_IAM_PARAMETERS[0], "GW", with_index_column=True)
+
+    @cached_property
+    def iamc_targets(self) -> pd.DataFrame:
+        return self._iam_targets(_IAMc_PARAMETERS[0], "GW/yr", with_index_column=False)
+
+    def matdp_sources(self) -> dict[str, Any]:
+        # The sources may modify the frames they're given, so each gets a copy
+        return dict(
+            intensities=ds.MatDPDBIntensitiesSource(self.matdp_intensities.copy()),
+            indicators=ds.MatDPDBIndicatorsSource(self.matdp_indicators.copy()),
+        )
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    """A benchmarked operation.
+
+    Attributes:
+        name (str): Name of the benchmark
+        unit (str): What the throughput is counted in
+        prepare (Callable[[Workspace], Callable[[], Any]]): Builds the (untimed) inputs
+            in the workspace and returns the timed operation
+        items (Callable[[Workspace], int]): Number of units processed by a single run
+    """
+
+    name: str
+    unit: str
+    prepare: Callable[[Workspace], Callable[[], Any]]
+    items: Callable[[Workspace], int]
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, unit: str, items: Callable[[Workspace], int]):
+    def decorator(prepare: Callable[[Workspace], Callable[[], Any]]):
+        BENCHMARKS[name] = Benchmark(name=name, unit=unit, prepare=prepare, items=items)
+        return prepare
+
+    return decorator
+
+
+def _n_leaves(ws: Workspace) -> int:
+    return ws.size.spec.n_leaves
+
+
+@benchmark("sdf.load", unit="leaves", items=_n_leaves)
+def _sdf_load(ws: Workspace):
+    return lambda: load(ws.sdf_dir)
+
+
+@benchmark("sdf.load[serial]", unit="leaves", items=_n_leaves)
+def _sdf_load_serial(ws: Workspace):
+    return lambda: load(ws.sdf_dir, workers=1)
+
+
+@benchmark("sdf.load[processes]", unit="leaves", items=_n_leaves)
+def _sdf_load_processes(ws: Workspace):
+    return lambda: load(ws.sdf_dir, processes=True)
+
+
+@benchmark("sdf.load[binary]", unit="leaves", items=_n_leaves)
+def _sdf_load_binary(ws: Workspace):
+    return lambda: load(ws.binary_sdf_dir)
+
+
+@benchmark("sdf.load[cached]", unit="leaves", items=_n_leaves)
+def _sdf_load_cached(ws: Workspace):
+    # The warm-up run fills the cache, the timed ones only decode its entries
+    cache = SDFCache(ws.directory / "sdf_cache")
+    return lambda: load(ws.sdf_dir, cache=cache)
+
+
+@benchmark("sdf.save", unit="leaves", items=_n_leaves)
+def _sdf_save(ws: Workspace):
+    sdf = ws.sdf
+    return lambda: sdf.save(ws.directory / "saved_sdf")
+
+
+@benchmark("sdf.save[incremental]", unit="leaves", items=_n_leaves)
+def _sdf_save_incremental(ws: Workspace):
+    # After the warm-up run, every file is up to date
+    sdf = ws.sdf
+    return lambda: sdf.save(ws.directory / "incremental_sdf", incremental=True)
+
+
+@benchmark("create_sdf[archive]", unit="leaves", items=_n_leaves)
+def _create_sdf_archive(ws: Workspace):
+    return lambda: create_sdf(ws.sdf_archive)
+
+
+@benchmark("create_sdf[stored]", unit="leaves", items=_n_leaves)
+def _create_sdf_stored(ws: Workspace):
+    return lambda: create_sdf(
+        intensities=ds.StoredIntensities(ws.sdf_dir),
+        indicators=ds.StoredIndicators(ws.sdf_dir),
+        targets=ds.StoredTargets(ws.sdf_dir),
+    )
+
+
+@benchmark("create_sdf[tmba]", unit="rows", items=lambda ws: len(ws.tmba_targets))
+def _create_sdf_tmba(ws: Workspace):
+    return lambda: create_sdf(
+        targets=ds.TMBATargetsSource(
+            ws.tmba_targets.copy(), _TMBA_PARAMETERS, ds.MatDPDBIntensitiesSource
+        ),
+        **ws.matdp_sources(),
+    )
+
+
+@benchmark(
+    "create_sdf[tmba-chunked]", unit="rows", items=lambda ws: len(ws.tmba_targets)
+)
+def _create_sdf_tmba_chunked(ws: Workspace):
+    return lambda: create_sdf(
+        targets=ds.TMBATargetsSource.from_csv(
+            ws.tmba_csv,
+            _TMBA_PARAMETERS,
+            ds.MatDPDBIntensitiesSource,
+            chunksize=10_000,
+        ),
+        **ws.matdp_sources(),
+    )
+
+
+@benchmark("create_sdf[iam]", unit="rows", items=lambda ws: len(ws.iam_targets))
+def _create_sdf_iam(ws: Workspace):
+    return lambda: create_sdf(
+        targets=ds.IntegratedAssessmentModel(
+            ws.iam_targets.copy(), _IAM_PARAMETERS, ds.MatDPDBIntensitiesSource
+        ),
+        **ws.matdp_sources(),
+    )
+
+
+@benchmark("create_sdf[iamc]", unit="rows", items=lambda ws: len(ws.iamc_targets))
+def _create_sdf_iamc(ws: Workspace):
+    return lambda: create_sdf(
+        targets=ds.IntegratedAssessmentModelc(
+            ws.iamc_targets.copy(), _IAMc_PARAMETERS, ds.MatDPDBIntensitiesSource
+        ),
+        **ws.matdp_sources(),
+    )
+
+
+@benchmark("flatten_hierarchy", unit="leaves", items=_n_leaves)
+def _flatten_hierarchy(ws: Workspace):
+    sdf = ws.sdf
+    return lambda: flatten_hierarchy(sdf)
+
+
+@benchmark("to_processable_input", unit="leaves", items=_n_leaves)
+def _to_processable_input(ws: Workspace):
+    flattened = ws.flattened
+
+    def run():
+        cache = {}
+        for path, sparse_years in flattened:
+            for _ in to_processable_input(path, sparse_years, cache):
+                pass
+
+    return run
+
+
+@benchmark("calculate", unit="inputs", items=lambda ws: len(ws.inputs))
+def _calculate(ws: Workspace):
+    inputs = ws.inputs
+    return lambda: [calculate(inpt) for _, _, inpt in inputs]
+
+
+@benchmark("pipeline", unit="leaves", items=_n_leaves)
+def _pipeline(ws: Workspace):
+    sdf = ws.sdf
+    return lambda: pipeline(sdf)
+
+
+@benchmark(
+    "App.render_tab_content",
+    unit="renders",
+    items=lambda ws: len(ws.rendered_paths) * (1 + len(ws.app.indicators)),
+)
+def _render_tab_content(ws: Workspace):
+    app, paths = ws.app, ws.rendered_paths
+    tabs = ["materials"] + [f"ind_{i}" for i in range(len(app.indicators))]
+
+    def run():
+        for path in paths:
+            for tab in tabs:
+                app.render_tab_content(tab, "All", *path.parts)
+
+    return run
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Result of a single benchmark.
+
+    Attributes:
+        name (str): Name of the benchmark
+        size (str): Name of the inputs' size
+        unit (str): What the throughput is counted in
+        items (int): Number of units processed by a single run
+        times (list[float]): Wall times of the runs, in seconds
+        peak_memory (int): Peak memory allocated by the main process during an extra,
+            untimed run, in bytes (as traced by tracemalloc)
+    """
+
+    name: str
+    size: str
+    unit: str
+    items: int
+    times: list[float] = field(default_factory=list)
+    peak_memory: int = 0
+
+    @property
+    def best(self) -> float:
+        return min(self.times)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.times)
+
+    @property
+    def throughput(self) -> float:
+        """Units processed per second, in the median run."""
+        return self.items / self.median if self.median > 0 else float("inf")
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self) | {
+            "best": self.best,
+            "median": self.median,
+            "throughput": self.throughput,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> "BenchmarkResult":
+        return cls(
+            name=d["name"],
+            size=d["size"],
+            unit=d["unit"],
+            items=d["items"],
+            times=d["times"],
+            peak_memory=d["peak_memory"],
+        )
+
+
+def run_benchmark(bench: Benchmark, ws: Workspace, repeat: int) -> BenchmarkResult:
+    """Time `repeat` runs of the benchmark, after a warm-up run, and measure its peak
+    memory in another run. Memory tracing slows Python down, so it's never timed.
+    """
+    fn = bench.prepare(ws)
+    result = BenchmarkResult(
+        name=bench.name, size=ws.size.name, unit=bench.unit, items=bench.items(ws)
+    )
+
+    fn()  # warm-up: caches, imports, lazily initialised globals
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return replace(result, times=times, peak_memory=peak_memory)
+
+
+def environment() -> dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def save_results(results: list[BenchmarkResult], path: Path) -> None:
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "environment": environment(),
+                "results": [r.to_dict() for r in results],
+            },
+            f,
+            indent=2,
+        )
+
+
+def load_results(path: Path) -> list[BenchmarkResult]:
+    with open(path) as f:
+        return [BenchmarkResult.from_dict(r) for r in json.load(f)["results"]]
+
+
+def compare(
+    old: list[BenchmarkResult],
+    new: list[BenchmarkResult],
+    threshold: float = 0.1,
+) -> pd.DataFrame:
+    """Compare two sets of results of the same benchmarks.
+
+    Args:
+        old (list[BenchmarkResult]): Baseline results
+        new (list[BenchmarkResult]): New results
+        threshold (float, optional): Relative slowdown (or memory growth) above which
+            a benchmark is marked as a regression. Defaults to 0.1.
+
+    Returns:
+        pd.DataFrame: One row per (benchmark, size) present in both sets, with the
+            median times, speedup (old / new), memory ratio (new / old) and the verdict
+    """
+    old_by_key = {(r.name, r.size): r for r in old}
+    records = []
+    for r in new:
+        if (base := old_by_key.get((r.name, r.size))) is None:
+            continue
+        speedup = base.median / r.median if r.median > 0 else float("inf")
+        memory_ratio = r.peak_memory / base.peak_memory if base.peak_memory else 1.0
+        if speedup < 1 / (1 + threshold) or memory_ratio > 1 + threshold:
+            verdict = "REGRESSION"
+        elif speedup > 1 + threshold:
+            verdict = "faster"
+        else:
+            verdict = ""
+        records.append(
+            {
+                "Benchmark": r.name,
+                "Size": r.size,
+                "Old median": base.median,
+                "New median": r.median,
+                "Speedup": speedup,
+                "Memory ratio": memory_ratio,
+                "Verdict": verdict,
+            }
+        )
+    columns = [
+        "Benchmark",
+        "Size",
+        "Old median",
+        "New median",
+        "Speedup",
+        "Memory ratio",
+        "Verdict",
+    ]
+    return pd.DataFrame.from_records(records, columns=columns).set_index(
+        ["Benchmark", "Size"]
+    )
+
+
+def format_result(r: BenchmarkResult) -> str:
+    return (
+        f"{r.size:<8} {r.name:<24} median {r.median:9.4f}s  best {r.best:9.4f}s  "
+        f"{r.throughput:12.1f} {r.unit}/s  peak {r.peak_memory / 2**20:9.1f} MiB"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks")
+    run_parser.add_argument(
+        "--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"]
+    )
+    run_parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+        metavar="NAME",
+    )
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("-o", "--output", type=Path, default="bench_output.json")
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("old", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        results = []
+        for size in args.sizes:
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                ws = Workspace(SIZES[size], Path(tmp_dir))
+                for name in args.benchmarks:
+                    result = run_benchmark(BENCHMARKS[name], ws, args.repeat)
+                    print(format_result(result), flush=True)
+                    results.append(result)
+        save_results(results, args.output)
+        return 0
+    else:
+        comparison = compare(
+            load_results(args.old), load_results(args.new), args.threshold
+        )
+        print(comparison.to_string(float_format=lambda x: f"{x:.3f}"))
+        return int((comparison["Verdict"] == "REGRESSION").any())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
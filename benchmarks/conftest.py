@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pytest
+
+from .bench import SIZES, BenchmarkResult, Workspace, save_results
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--benchmark-sizes",
+        nargs="+",
+        default=["small"],
+        choices=list(SIZES),
+        help="Sizes of the benchmark inputs",
+    )
+    parser.addoption("--benchmark-repeat", type=int, default=1)
+    parser.addoption(
+        "--benchmark-json", type=Path, help="Save the benchmark results to a file"
+    )
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        metafunc.parametrize("size", metafunc.config.getoption("benchmark_sizes"))
+
+
+@pytest.fixture(scope="session")
+def workspaces(tmp_path_factory):
+    workspaces: dict[str, Workspace] = {}
+
+    def inner(size: str) -> Workspace:
+        if size not in workspaces:
+            workspaces[size] = Workspace(SIZES[size], tmp_path_factory.mktemp(size))
+        return workspaces[size]
+
+    return inner
+
+
+@pytest.fixture(scope="session")
+def benchmark_results(request):
+    results: list[BenchmarkResult] = []
+    yield results
+    if path := request.config.getoption("benchmark_json"):
+        save_results(results, path)
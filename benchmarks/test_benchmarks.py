@@ -0,0 +1,16 @@
+import pytest
+
+from .bench import BENCHMARKS, run_benchmark
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_benchmark(name, size, workspaces, benchmark_results, request):
+    result = run_benchmark(
+        BENCHMARKS[name],
+        workspaces(size),
+        request.config.getoption("benchmark_repeat"),
+    )
+    benchmark_results.append(result)
+
+    assert result.items > 0
+    assert all(t > 0 for t in result.times)
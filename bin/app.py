@@ -1,8 +1,12 @@
 import argparse
+from contextlib import nullcontext
 from pathlib import Path
 
 import mat_dp_pipeline.data_sources as ds
 from mat_dp_pipeline import App, create_sdf, pipeline
+from mat_dp_pipeline.pipeline import ProfilingReport
+from mat_dp_pipeline.sdf import ArrowBackend, SDFCache, SDFFormat, save_archive
+from mat_dp_pipeline.sdf.archive import is_archive
 
 
 def main():
@@ -25,7 +29,33 @@ def main():
     sdf_parser = subparsers.add_parser(
         "sdf", description="SDF target type", help="SDF target type"
     )
-    sdf_parser.add_argument("source", type=Path)
+    sdf_parser.add_argument(
+        "source", type=Path, help="SDF directory or a single-file archive (.sdfa)"
+    )
+    sdf_parser.add_argument(
+        "--subtree", help="Load only this node (e.g. /Africa) and its descendants"
+    )
+    sdf_parser.add_argument(
+        "--include",
+        action="append",
+        help="Load only the leaves matching this glob (e.g. /Europe/**), repeatable",
+    )
+    sdf_parser.add_argument(
+        "--exclude",
+        action="append",
+        help="Skip the leaves matching this glob, repeatable",
+    )
+    sdf_parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Cache the parsed files here, so that only changed ones are parsed again",
+    )
+    sdf_parser.add_argument(
+        "--csv-backend",
+        choices=["pandas", "arrow"],
+        default="pandas",
+        help="Parser of the CSV files (arrow requires pyarrow)",
+    )
 
     iam_parser.add_argument("materials", type=Path)
     iam_parser.add_argument("targets", type=Path)
@@ -35,11 +65,57 @@ def main():
     iamc_parser.add_argument("targets", type=Path)
     iamc_parser.add_argument("--sdf-output", type=Path)
 
+    for subparser in (iam_parser, iamc_parser):
+        subparser.add_argument(
+            "--country-cache",
+            type=Path,
+            help="JSON file keeping the country names resolved to ISO3 across runs",
+        )
+
     tmba_parser.add_argument("materials", type=Path)
     tmba_parser.add_argument("targets", type=Path)
     tmba_parser.add_argument("--sdf-output", type=Path)
+    tmba_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        help="Stream the targets file in chunks of this many rows",
+    )
+
+    for subparser in (iam_parser, iamc_parser, tmba_parser):
+        subparser.add_argument(
+            "--sdf-format",
+            choices=[f.value for f in SDFFormat],
+            default=SDFFormat.CSV.value,
+            help="Format of the files saved to --sdf-output (unless it's a single-file "
+            "archive, .sdfa)",
+        )
+        subparser.add_argument(
+            "--incremental-save",
+            action="store_true",
+            help="Rewrite only the files of --sdf-output which have changed",
+        )
+        subparser.add_argument(
+            "--excel-cache-dir",
+            type=Path,
+            help="Cache the parsed Excel sheets here, so that they're parsed again "
+            "only when the workbook changes",
+        )
+
+    for subparser in (iam_parser, iamc_parser, tmba_parser, sdf_parser):
+        subparser.add_argument(
+            "--profile",
+            action="store_true",
+            help="Profile the pipeline stages and print the report",
+        )
+        subparser.add_argument(
+            "--profile-trace",
+            type=Path,
+            help="Save the profile as Chrome trace JSON (implies --profile)",
+        )
 
     args = parser.parse_args()
+    report = ProfilingReport() if args.profile or args.profile_trace else None
+    load_stage = report.stage("sdf_load") if report else nullcontext()
 
     TMBA_TARGETS_PARAMETERS = [
         # "Power Generation (Aggregate)",
@@ -51,34 +127,72 @@ def main():
         # "Primary Energy",
         "Capacity Additions|Electricity"]
 
-    if args.target_type == "sdf":
-        sdf = create_sdf(args.source)
-    else:
-        if args.target_type == "tmba":
-            targets = ds.TMBATargetsSource.from_csv(
-                args.targets, TMBA_TARGETS_PARAMETERS, ds.MatDPDBIntensitiesSource
-            )
-        elif args.target_type == "iam":
-            targets = ds.IntegratedAssessmentModel.from_excel(
-                args.targets, IAM_TARGETS_PARAMETERS, ds.MatDPDBIntensitiesSource
-            )
-        elif args.target_type == "iamc":
-            targets = ds.IntegratedAssessmentModelc.from_csv(
-                args.targets, IAMc_TARGETS_PARAMETERS, ds.MatDPDBIntensitiesSource
+    with load_stage:
+        if args.target_type == "sdf":
+            sdf = create_sdf(
+                args.source,
+                subtree=args.subtree,
+                include=args.include,
+                exclude=args.exclude,
+                cache=SDFCache(args.cache_dir) if args.cache_dir else None,
+                backend=ArrowBackend() if args.csv_backend == "arrow" else None,
             )
         else:
-            assert False
+            excel_cache = (
+                ds.ExcelCache(args.excel_cache_dir) if args.excel_cache_dir else None
+            )
+            if args.target_type == "tmba":
+                targets = ds.TMBATargetsSource.from_csv(
+                    args.targets,
+                    TMBA_TARGETS_PARAMETERS,
+                    ds.MatDPDBIntensitiesSource,
+                    chunksize=args.chunk_size,
+                )
+            elif args.target_type == "iam":
+                targets = ds.IntegratedAssessmentModel.from_excel(
+                    args.targets,
+                    IAM_TARGETS_PARAMETERS,
+                    ds.MatDPDBIntensitiesSource,
+                    cache=excel_cache,
+                    country_cache=args.country_cache,
+                )
+            elif args.target_type == "iamc":
+                targets = ds.IntegratedAssessmentModelc.from_csv(
+                    args.targets,
+                    IAMc_TARGETS_PARAMETERS,
+                    ds.MatDPDBIntensitiesSource,
+                    country_cache=args.country_cache,
+                )
+            else:
+                assert False
 
-        sdf = create_sdf(
-            intensities=ds.MatDPDBIntensitiesSource.from_excel(args.materials),
-            indicators=ds.MatDPDBIndicatorsSource.from_excel(args.materials),
-            targets=targets,
-        )
+            sdf = create_sdf(
+                intensities=ds.MatDPDBIntensitiesSource.from_excel(
+                    args.materials, cache=excel_cache
+                ),
+                indicators=ds.MatDPDBIndicatorsSource.from_excel(
+                    args.materials, cache=excel_cache
+                ),
+                targets=targets,
+            )
 
-        if args.sdf_output:
-            sdf.save(args.sdf_output)
+    if args.target_type != "sdf" and args.sdf_output:
+        if is_archive(args.sdf_output):
+            save_archive(sdf, args.sdf_output)
+        else:
+            sdf.save(
+                args.sdf_output,
+                format=args.sdf_format,
+                incremental=args.incremental_save,
+            )
     
-    output = pipeline(sdf)
+    output = pipeline(sdf, profile=report or False)
+    if report:
+        print(report)
+        print("Slowest leaves:")
+        print(report.slowest_leaves().to_string(float_format=lambda x: f"{x:.3f}"))
+        if args.profile_trace:
+            report.save_chrome_trace(args.profile_trace)
     App(output).serve()
 
 
@@ -0,0 +1,24 @@
+import argparse
+from pathlib import Path
+
+from mat_dp_pipeline.sdf import SDFFormat, convert_sdf
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert the SDF directory between the CSV and binary formats"
+    )
+    parser.add_argument("source", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument(
+        "--format",
+        choices=[f.value for f in SDFFormat],
+        default=SDFFormat.BINARY.value,
+        help="Format of the converted SDF",
+    )
+    args = parser.parse_args()
+    convert_sdf(args.source, args.output, args.format)
+
+
+if __name__ == "__main__":
+    main()
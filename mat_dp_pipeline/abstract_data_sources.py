@@ -1,6 +1,54 @@
+import os
+import tempfile
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import ClassVar, Optional
+from typing import TYPE_CHECKING, ClassVar, Iterable, Optional
+
+import pandas as pd
+
+if TYPE_CHECKING:
+    from mat_dp_pipeline.sdf.builder import SDFBuilder
+
+# Node path, SDF file name and the file's contents (with the index among the columns)
+SourceFrame = tuple[Path, str, pd.DataFrame]
+
+
+def write_frames(
+    output_dir: Path, frames: Iterable[SourceFrame], workers: int | None = None
+) -> None:
+    """Save the frames as CSV files in the SDF rooted at `output_dir`. Each node's
+    directory is created once, and the files are written concurrently.
+
+    Args:
+        output_dir (Path): Root directory of the SDF
+        frames (Iterable[SourceFrame]): Frames of the source
+        workers (int | None, optional): Number of threads writing the files. 1 writes
+            them serially. Defaults to None - the number of CPUs.
+    """
+    created: set[Path] = set()
+
+    def files() -> Iterable[tuple[Path, pd.DataFrame]]:
+        for path, file_name, df in frames:
+            location_dir = output_dir / path.relative_to("/")
+            if location_dir not in created:
+                location_dir.mkdir(exist_ok=True, parents=True)
+                created.add(location_dir)
+            yield location_dir / file_name, df
+
+    def write_file(file: tuple[Path, pd.DataFrame]) -> None:
+        file_path, df = file
+        df.to_csv(file_path, index=False)
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for file in files():
+            write_file(file)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        # Consume the results, so that errors of the writes are raised
+        for _ in ex.map(write_file, files()):
+            pass
 
 
 class BaseSource(ABC):
@@ -12,6 +60,32 @@ class BaseSource(ABC):
         """
         ...
 
+    def emit(self, builder: "SDFBuilder") -> None:
+        """Prepare a Standard Data Format data and add it to the in-memory `builder`.
+        By default, the data is saved in a temporary directory and read back. Sources
+        override it to add their frames directly.
+        Args:
+            builder (SDFBuilder): SDF being built
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self(Path(tmp_dir))
+            builder.add_directory(Path(tmp_dir))
+
+    def save_archive(self, path: Path) -> None:
+        """Save the data in a single-file SDF archive (see `mat_dp_pipeline.sdf.archive`)
+        instead of a directory of CSV files. Its frames are stored in the binary,
+        columnar encoding and indexed by their node paths. StoredTargets,
+        StoredIntensities and StoredIndicators read such an archive too.
+        Args:
+            path (Path): Path of the archive, conventionally with the `.sdfa` extension
+        """
+        # Imported here, as the sdf package depends on this module
+        from mat_dp_pipeline.sdf import SDFBuilder, save_archive
+
+        builder = SDFBuilder()
+        self.emit(builder)
+        save_archive(builder.build(), path)
+
 
 class IntensitiesSource(BaseSource):
     base_file_name: str = "intensities.csv"
@@ -1,4 +1,6 @@
 import itertools
+import os
+import tempfile
 from pathlib import Path
 from typing import IO
 
@@ -20,3 +22,13 @@ def create_path_tree(paths: list[Path]) -> Tree:
         out_dict[str(key)] = create_path_tree(path_remainders)
     return out_dict
 
+
+def write_atomically(path: Path, data: bytes | str) -> None:
+    """Write the file through a temporary one in the same directory, which then
+    replaces it. Readers never see a partially written file, and concurrent writers
+    each write a temporary file of their own.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+    os.replace(tmp_name, path)
@@ -1,3 +1,4 @@
+from mat_dp_pipeline.data_sources.excel_cache import ExcelCache
 from mat_dp_pipeline.data_sources.iam import IntegratedAssessmentModel
 from mat_dp_pipeline.data_sources.iamc import IntegratedAssessmentModelc
 from mat_dp_pipeline.data_sources.mat_dp_db import (
@@ -5,8 +6,10 @@ from mat_dp_pipeline.data_sources.mat_dp_db import (
     MatDPDBIntensitiesSource,
 )
 from mat_dp_pipeline.data_sources.stored import (
+    LinkMode,
     StoredIndicators,
     StoredIntensities,
+    StoredSDF,
     StoredTargets,
 )
 from mat_dp_pipeline.data_sources.tech_map import TechMap, TechMapTypes, create_tech_map
@@ -1,13 +1,28 @@
+import json
 import logging
+from pathlib import Path
+from typing import Iterator
 
+import numpy as np
 import pandas as pd
 import country_converter as coco
 
+from mat_dp_pipeline.common import write_atomically
+
 from .tech_map import TechMap
 
 
+def warn_unmapped(unmapped_variables: set) -> None:
+    logging.warning(
+        f"The following variables don't have a corresponding mapping in the Tech Map: {unmapped_variables}. Ignoring them."
+    )
+
+
 def map_technologies(
-    targets: pd.DataFrame, variable_column: str, tech_map: TechMap
+    targets: pd.DataFrame,
+    variable_column: str,
+    tech_map: TechMap,
+    unmapped: set | None = None,
 ) -> pd.DataFrame:
     """Map `variable_column` of `targets` into technologies by using `tech_map`.
     Attach the resulting Category & Specific columns to `targets` in the result.
@@ -18,6 +33,9 @@ def map_technologies(
         targets (pd.DataFrame): Targets DataFrame
         variable_column (str): column in `targets` to be used as a key in `tech_map`
         tech_map (TechMap): Technology mapping
+        unmapped (set | None, optional): If given, unmapped values are added to it
+            instead of a warning, e.g. to warn once for all the chunks of a file.
+            Defaults to None.
 
     Returns:
         pd.DataFrame: `targets` with mapped Category & Specific columns.
@@ -26,30 +44,188 @@ def map_technologies(
     if unmapped_variables := set(
         targets.loc[tech_tuples[tech_tuples.isna()].index, variable_column]
     ):
-        logging.warning(
-            f"The following variables don't have a corresponding mapping in the Tech Map: {unmapped_variables}. Ignoring them."
-        )
+        if unmapped is None:
+            warn_unmapped(unmapped_variables)
+        else:
+            unmapped |= unmapped_variables
         tech_tuples = tech_tuples.dropna()
 
     targets.pop(variable_column)  # no longer needed
-    techs = pd.DataFrame.from_records(
+    techs = pd.DataFrame(
         tech_tuples.to_list(),
         index=tech_tuples.index,
         columns=["Category", "Specific"],
     )
     return targets.join(techs, how="inner")
 
-def match_countries(list_names: list[str]):
-    shorts = coco.convert(names = list_names, to = 'name_short', not_found = None)
-    iso3_codes = coco.convert(names = list_names, to = 'ISO3', not_found = None)
-    
-    tis_d = pd.DataFrame(list(zip(list_names,shorts)), columns = ['Country','aCountry'])
-    tis_d = tis_d.set_index('Country')['aCountry'].to_dict()
-
-    ti3_d = pd.DataFrame(list(zip(shorts,iso3_codes)), columns = ['Region','ISO3'])
-    ti3_d = ti3_d.set_index('Region')['ISO3'].to_dict()
-    
-    list_names_a = list_names.map(tis_d)
-    list_names_ISO3 = list_names_a.map(ti3_d)
-    
-    return list_names_ISO3
+
+def check_disjoint_parameters(parameters: list[str]) -> None:
+    """Raise ValueError if any of the parameters is a prefix of another one.
+
+    In sorted order, the parameters starting with a given one follow it directly, so
+    comparing the neighbours is enough.
+    """
+    ordered = sorted(parameters)
+    for p1, p2 in zip(ordered, ordered[1:]):
+        if p2.startswith(p1):
+            raise ValueError(f"Overlapping definition of parameters: {p1}, {p2}!")
+
+
+def split_parameters(
+    variables: pd.Series, parameters: list[str]
+) -> tuple[np.ndarray, np.ndarray]:
+    """Split the variables into their parameter (one of `parameters`) and the rest,
+    e.g. "Capacity|Electricity|Solar" into "Capacity|Electricity" and "Solar".
+
+    Each distinct variable is matched once: its prefixes ending before a "|" are
+    looked up among the parameters.
+
+    Args:
+        variables (pd.Series): Variables, e.g. the Variable column of IAM results
+        parameters (list[str]): Parameters, none of which is a prefix of another
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Parameter of each variable (None if it has
+            none of them) and the variable without the "parameter|" prefix
+    """
+    codes, uniques = pd.factorize(variables)
+    wanted = set(parameters)
+    # Missing variables (code -1) take the extra last element
+    matched = np.full(len(uniques) + 1, None, dtype=object)
+    rest = np.append(uniques.to_numpy(dtype=object), None)
+    for i, variable in enumerate(uniques):
+        if not isinstance(variable, str):
+            continue
+        separator = variable.find("|")
+        while separator != -1:
+            if (prefix := variable[:separator]) in wanted:
+                matched[i] = prefix
+                rest[i] = variable[separator + 1 :]
+                break
+            separator = variable.find("|", separator + 1)
+    return matched[codes], rest[codes]
+
+
+def scale_units(
+    targets: pd.DataFrame, conversion_table: dict[str, float]
+) -> pd.DataFrame:
+    """Multiply the values (columns after Unit) of the rows in the units of
+    `conversion_table` by their factors, and drop the Unit column.
+    """
+    values = targets.columns[targets.columns.get_loc("Unit") + 1 :]
+    factors = targets["Unit"].map(conversion_table)
+    targets = targets.drop(columns="Unit")
+    if factors.notna().any():
+        targets[values] = targets[values].mul(factors.fillna(1.0), axis="index")
+    return targets
+
+
+def partitions(
+    df: pd.DataFrame, columns: list[str]
+) -> Iterator[tuple[tuple, pd.DataFrame]]:
+    """Split the frame into the groups of rows with equal values of `columns`, like
+    `df.groupby(columns)`: the groups come in the order of their keys, the rows of
+    each group in their original order, and rows with a missing key are dropped.
+    Instead of a groupby, the rows are sorted once and sliced at the group boundaries.
+
+    Args:
+        df (pd.DataFrame): Frame to split
+        columns (list[str]): Columns to group by
+
+    Yields:
+        Iterator[tuple[tuple, pd.DataFrame]]: Key (the values of `columns`) and the
+            rows of each group, without the `columns`
+    """
+    factorized = [pd.factorize(df[column], sort=True) for column in columns]
+    codes = np.stack([column_codes for column_codes, _ in factorized])
+    # lexsort is stable, and its primary key is the last one
+    order = np.lexsort(codes[::-1])
+    order = order[(codes[:, order] >= 0).all(axis=0)]
+    if not len(order):
+        return
+
+    codes = codes[:, order]
+    boundaries = np.flatnonzero((codes[:, 1:] != codes[:, :-1]).any(axis=0)) + 1
+    values = df.drop(columns=columns).iloc[order]
+    for start, end in zip([0, *boundaries], [*boundaries, len(order)]):
+        key = tuple(
+            uniques[column_codes]
+            for (_, uniques), column_codes in zip(factorized, codes[:, start])
+        )
+        yield key, values.iloc[start:end]
+
+
+# (short name, ISO3) of the country names resolved so far in this process
+_resolved_countries: dict[str, tuple[str, str]] = {}
+
+
+def _resolve_country_names(names: list) -> list[tuple[str, str]]:
+    """(short name, ISO3) of each name, as given by country_converter. Names it doesn't
+    know are kept as they are.
+    """
+    shorts = coco.convert(names=names, to="name_short", not_found=None)
+    iso3_codes = coco.convert(names=names, to="ISO3", not_found=None)
+    if len(names) == 1:
+        # A single name gives a single result rather than a list
+        shorts, iso3_codes = [shorts], [iso3_codes]
+    return list(zip(shorts, iso3_codes))
+
+
+def _read_country_cache(cache_file: Path) -> dict[str, tuple[str, str]]:
+    """Names resolved in the earlier runs. Empty if there's no (readable) cache, or it
+    was made by another version of country_converter.
+    """
+    try:
+        cached = json.loads(cache_file.read_text())
+    except (FileNotFoundError, ValueError):
+        return {}
+    if not isinstance(cached, dict) or cached.get("version") != coco.__version__:
+        return {}
+    return {name: tuple(resolved) for name, resolved in cached["names"].items()}
+
+
+def _write_country_cache(cache_file: Path, names: dict[str, tuple[str, str]]) -> None:
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    write_atomically(
+        cache_file, json.dumps({"version": coco.__version__, "names": names})
+    )
+
+
+def match_countries(
+    list_names: pd.Series, cache_file: str | Path | None = None
+) -> pd.Series:
+    """Convert the country names to ISO3 codes. Names country_converter doesn't know
+    are kept as they are.
+
+    Each distinct name is resolved once per process, and the results are broadcast
+    to all of its rows.
+
+    Args:
+        list_names (pd.Series): Country names, e.g. the Region column of IAM results
+        cache_file (str | Path | None, optional): JSON file keeping the resolved names
+            across runs. Defaults to None.
+
+    Returns:
+        pd.Series: ISO3 codes
+    """
+    names = list_names.unique()
+    if cache_file is not None:
+        cache_file = Path(cache_file).expanduser()
+        for name, resolved in _read_country_cache(cache_file).items():
+            _resolved_countries.setdefault(name, resolved)
+
+    resolved = {n: _resolved_countries[n] for n in names if n in _resolved_countries}
+    if unresolved := [n for n in names if n not in resolved]:
+        newly_resolved = dict(zip(unresolved, _resolve_country_names(unresolved)))
+        resolved |= newly_resolved
+        # Only names (not e.g. NaN) are kept for later
+        _resolved_countries.update(
+            (n, r) for n, r in newly_resolved.items() if isinstance(n, str)
+        )
+        if cache_file is not None:
+            _write_country_cache(cache_file, _resolved_countries)
+
+    # Countries are identified by their short names, as in the row-by-row conversion
+    short_to_iso3 = {resolved[n][0]: resolved[n][1] for n in names}
+    iso3 = pd.Series([short_to_iso3[resolved[n][0]] for n in names], index=names)
+    return list_names.map(iso3)
@@ -1,4 +1,5 @@
 __all__ = [
+    "CountryIndex",
     "CountrySet",
     "CountrySets",
     "SourceWithCountries",
@@ -6,6 +7,7 @@ __all__ = [
     "Identifier",
 ]
 
+from .country_index import CountryIndex
 from .country_set import CountrySet, CustomCountry
 from .create_country_to_path import CountrySets
 from .identifier import Identifier
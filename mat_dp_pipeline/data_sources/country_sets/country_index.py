@@ -0,0 +1,63 @@
+__all__ = ["CountryIndex"]
+
+from collections import defaultdict
+
+import pandas as pd
+
+from .identifier import Identifier
+
+# Columns of the country code table which countries are looked up by
+INDEXED_COLUMNS = [
+    Identifier.country_name.value,
+    Identifier.alpha_2.value,
+    Identifier.alpha_3.value,
+    "region",
+    "sub-region",
+    "intermediate-region",
+]
+
+
+class CountryIndex:
+    """Hashed indexes over the country code table: rows of each value of the name,
+    alpha-2, alpha-3, region, sub-region and intermediate region columns. Built
+    once, so that resolving a country set takes time proportional to its members,
+    rather than scanning the table for each of them.
+    """
+
+    _values: dict[str, list[str]]
+    _rows: dict[str, dict[str, list[int]]]
+
+    def __init__(self, country_code_df: pd.DataFrame):
+        self._values = {
+            column: country_code_df[column].tolist() for column in INDEXED_COLUMNS
+        }
+        self._rows = {}
+        for column, values in self._values.items():
+            rows = defaultdict(list)
+            for row, value in enumerate(values):
+                rows[value].append(row)
+            self._rows[column] = dict(rows)
+
+    def contains(self, column: str, value: str) -> bool:
+        return value in self._rows[column]
+
+    def countries(
+        self, column: str, value: str, identifier: Identifier
+    ) -> list[tuple[str, str]]:
+        """Countries whose `column` equals `value`, e.g. all of "Western Africa" in
+        the sub-region column.
+
+        Args:
+            column (str): One of the indexed columns
+            value (str): Value of the column
+            identifier (Identifier): Identifier of the countries to return
+
+        Returns:
+            list[tuple[str, str]]: Identifier and name of each country, in the order
+                of the table
+        """
+        identifiers = self._values[identifier.value]
+        names = self._values[Identifier.country_name.value]
+        return [
+            (identifiers[row], names[row]) for row in self._rows[column].get(value, [])
+        ]
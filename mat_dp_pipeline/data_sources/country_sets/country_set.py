@@ -5,6 +5,7 @@ from typing import Optional
 
 import pandas as pd
 
+from .country_index import CountryIndex
 from .identifier import Identifier
 
 
@@ -18,26 +19,19 @@ class CustomCountry:
 def _append_with_regions(
     regions: list[str],
     region_key: str,
-    country_code_df: pd.DataFrame,
+    country_index: CountryIndex,
     identifier: Identifier,
     total_countries: list[str],
     country_names: list[str],
 ):
     for region in regions:
-        rel_countries = list(
-            country_code_df[country_code_df[region_key] == region][identifier.value]
-        )
+        rel_countries = country_index.countries(region_key, region, identifier)
 
         if len(rel_countries) == 0:
             raise ValueError(f"{region_key} {region} not found")
-        total_countries += rel_countries
-
-        rel_names = list(
-            country_code_df[country_code_df[region_key] == region][
-                Identifier.country_name.value
-            ]
-        )
-        country_names += rel_names
+        for country, name in rel_countries:
+            total_countries.append(country)
+            country_names.append(name)
 
 
 @dataclass
@@ -51,13 +45,21 @@ class CountrySet:
         default_factory=dict, init=False, repr=False
     )
 
-    def all_countries(self, country_code_df: pd.DataFrame, identifier: Identifier):
+    def all_countries(
+        self,
+        country_code_df: pd.DataFrame | CountryIndex,
+        identifier: Identifier,
+    ):
         if identifier not in self._all_countries:
+            country_index = (
+                CountryIndex(country_code_df)
+                if isinstance(country_code_df, pd.DataFrame)
+                else country_code_df
+            )
             total_countries = []
             country_names = []
-            available_countries = list(country_code_df[Identifier.country_name.value])
             for country in self.countries:
-                if country not in available_countries:
+                if not country_index.contains(Identifier.country_name.value, country):
                     raise ValueError(f"Country {country} not found")
                 total_countries.append(country)
                 country_names.append(country)
@@ -65,7 +67,7 @@ class CountrySet:
             _append_with_regions(
                 self.regions,
                 "region",
-                country_code_df,
+                country_index,
                 identifier,
                 total_countries,
                 country_names,
@@ -73,7 +75,7 @@ class CountrySet:
             _append_with_regions(
                 self.sub_regions,
                 "sub-region",
-                country_code_df,
+                country_index,
                 identifier,
                 total_countries,
                 country_names,
@@ -81,7 +83,7 @@ class CountrySet:
             _append_with_regions(
                 self.intermediate_regions,
                 "intermediate-region",
-                country_code_df,
+                country_index,
                 identifier,
                 total_countries,
                 country_names,
@@ -104,7 +106,8 @@ class CountrySet:
                     total_countries.append(custom_country.alpha_3)
                     country_names.append(custom_country.name)
 
+            # Unique, in the order of the set's definition
             self._all_countries[identifier] = list(
-                set(zip(total_countries, country_names))
+                dict.fromkeys(zip(total_countries, country_names))
             )
         return self._all_countries[identifier]
@@ -4,6 +4,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from .country_index import CountryIndex
 from .country_set import CountrySet
 from .identifier import Identifier
 
@@ -11,16 +12,22 @@ CountrySets = dict[str, "CountrySet | CountrySets"]
 
 
 def create_country_to_path(
-    country_sets: CountrySets, country_code_df: pd.DataFrame, identifier: Identifier
+    country_sets: CountrySets,
+    country_code_df: pd.DataFrame | CountryIndex,
+    identifier: Identifier,
 ) -> dict[str, Path]:
+    # Indexed once for all the country sets
+    country_index = (
+        CountryIndex(country_code_df)
+        if isinstance(country_code_df, pd.DataFrame)
+        else country_code_df
+    )
     final_dict: dict[str, list[str]] = {}
 
     def dfs(country_sets: CountrySets, prefix: list[str]):
         for k, v in country_sets.items():
             if isinstance(v, CountrySet):
-                for country, country_name in v.all_countries(
-                    country_code_df, identifier
-                ):
+                for country, country_name in v.all_countries(country_index, identifier):
                     if country in final_dict:
                         raise ValueError(
                             f"Overlapped disjoint set detected for {country} location is already {final_dict[country]}"
@@ -5,19 +5,47 @@ from typing import ClassVar, Optional
 
 import pandas as pd
 
+from .country_index import CountryIndex
 from .create_country_to_path import CountrySets, create_country_to_path
 from .identifier import Identifier
 
+COUNTRY_CODES_FILE = Path(__file__).parent / "country_codes.csv"
+
+
+class _CountryCodes:
+    """Class attribute holding country_codes.csv, read on the first access."""
+
+    _df: pd.DataFrame | None = None
+
+    def __get__(self, instance, owner) -> pd.DataFrame:
+        if self._df is None:
+            self._df = pd.read_csv(COUNTRY_CODES_FILE, keep_default_na=False)
+        return self._df
+
+
+class _CountryIndex:
+    """Class attribute holding the CountryIndex of the owner's country_code_df, built
+    on the first access.
+    """
+
+    _index: CountryIndex | None = None
+    _indexed_df: pd.DataFrame | None = None
+
+    def __get__(self, instance, owner) -> CountryIndex:
+        country_code_df = owner.country_code_df
+        if self._index is None or self._indexed_df is not country_code_df:
+            self._index = CountryIndex(country_code_df)
+            self._indexed_df = country_code_df
+        return self._index
+
 
 class SourceWithCountries:
-    _country_name_to_path: ClassVar[dict[str, Path]]
-    _alpha2_to_path: ClassVar[dict[str, Path]]
-    _alpha3_to_path: ClassVar[dict[str, Path]]
+    _country_sets: ClassVar[CountrySets]
+    _country_to_path: ClassVar[dict[Identifier, dict[str, Path]]]
     _names_to_paths: ClassVar[dict[str, Path]]
     _missing_countries: ClassVar[Optional[set[str]]] = None
-    country_code_df: ClassVar[pd.DataFrame] = pd.read_csv(
-        Path(__file__).parent / "country_codes.csv", keep_default_na=False
-    )
+    country_code_df: ClassVar[_CountryCodes] = _CountryCodes()
+    country_index: ClassVar[_CountryIndex] = _CountryIndex()
     main_label: ClassVar[str] = "Country"
 
     def __init_subclass__(
@@ -26,44 +54,34 @@ class SourceWithCountries:
         country_sets: CountrySets,
         names_to_paths: dict[str, Path] | dict[str, str] | dict[str, str | Path] = {},
     ) -> None:
-        cls._country_name_to_path = create_country_to_path(
-            country_sets, cls.country_code_df, Identifier.country_name
-        )
-        cls._alpha2_to_path = create_country_to_path(
-            country_sets, cls.country_code_df, Identifier.alpha_2
-        )
-        cls._alpha3_to_path = create_country_to_path(
-            country_sets, cls.country_code_df, Identifier.alpha_3
-        )
+        cls._country_sets = country_sets
+        # Filled in by country_to_path on the first use of each identifier
+        cls._country_to_path = {}
         cls._names_to_paths = {k: Path(v) for k, v in names_to_paths.items()}
 
     @classmethod
-    def country_to_path(cls, identifier: Identifier = Identifier.country_name):
-        if identifier == Identifier.country_name:
-            return cls._country_name_to_path
-        elif identifier == Identifier.alpha_2:
-            return cls._alpha2_to_path
-        elif identifier == Identifier.alpha_3:
-            return cls._alpha3_to_path
-        else:
-            assert False
+    def country_to_path(
+        cls, identifier: Identifier = Identifier.country_name
+    ) -> dict[str, Path]:
+        if identifier not in cls._country_to_path:
+            cls._country_to_path[identifier] = create_country_to_path(
+                cls._country_sets, cls.country_index, identifier
+            )
+        return cls._country_to_path[identifier]
 
     @classmethod
     def missing_countries(cls) -> set[str]:
         if cls._missing_countries is None:
             full_set = set(cls.country_code_df["name"])
-            new_set = set(cls.country_to_path.keys())
+            new_set = set(cls.country_to_path().keys())
             cls._missing_countries = full_set - new_set
         return cls._missing_countries
 
     def name_to_path(self, name: str) -> Path:
         if name in self._names_to_paths:
             return self._names_to_paths[name]
-        elif name in self._country_name_to_path:
-            return self._country_name_to_path[name]
-        elif name in self._alpha2_to_path:
-            return self._alpha2_to_path[name]
-        elif name in self._alpha3_to_path:
-            return self._alpha3_to_path[name]
-        else:
-            raise ValueError(f"Country {name} not found")
+        # Names first, then alpha-2 and alpha-3 codes
+        for identifier in Identifier:
+            if name in (country_to_path := self.country_to_path(identifier)):
+                return country_to_path[name]
+        raise ValueError(f"Country {name} not found")
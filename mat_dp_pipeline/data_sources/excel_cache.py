@@ -0,0 +1,89 @@
+"""Cache of parsed Excel sheets.
+
+Parsing the Mat-dp DB and IAM workbooks with openpyxl takes far longer than the rest
+of creating an SDF. Sheets read through an ExcelCache are pickled under a key of the
+workbook's contents hash, the sheet name and the reader's arguments, so parsing them
+again is skipped until the workbook changes. Entries of the workbook's previous
+contents are removed when the changed one is stored.
+
+The entries are pickles, so the cache directory must only be writable by its users.
+"""
+
+import json
+import os
+import pickle
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ClassVar
+
+import pandas as pd
+
+from mat_dp_pipeline.sdf.cache import FileCache, digest
+
+# Directory of the cache used when none is passed explicitly, e.g. by the tech map
+EXCEL_CACHE_DIR_ENV = "MAT_DP_EXCEL_CACHE_DIR"
+
+ParsedSheets = pd.DataFrame | dict[Any, pd.DataFrame]
+
+
+@dataclass(frozen=True)
+class ExcelCache(FileCache):
+    """Persistent cache of parsed Excel sheets.
+
+    Attributes:
+        directory (Path): Where the entries are stored. Created on the first write.
+        max_size (int): Size of all the entries (in bytes) above which the least
+            recently used ones are evicted after each write. Defaults to 1 GiB.
+    """
+
+    entry_suffix: ClassVar[str] = ".pkl"
+
+    @classmethod
+    def default(cls) -> "ExcelCache | None":
+        """Cache in the directory given by the MAT_DP_EXCEL_CACHE_DIR environment
+        variable, if it's set.
+        """
+        directory = os.environ.get(EXCEL_CACHE_DIR_ENV)
+        return cls(Path(directory)) if directory else None
+
+    def entry_path(self, workbook: Path, **read_kwargs) -> Path:
+        """Path of the entry of the workbook in its current state, read with the
+        `read_kwargs` (of `pd.read_excel`). Arguments without a stable repr (like
+        functions) give a different entry in each process.
+        """
+        arguments = json.dumps(read_kwargs, sort_keys=True, default=repr)
+        return self.directory / (
+            f"{self._path_key(workbook)}_{digest(workbook.read_bytes())}_"
+            f"{digest(arguments.encode())}{self.entry_suffix}"
+        )
+
+    def read(self, workbook: str | Path, **read_kwargs) -> ParsedSheets:
+        """`pd.read_excel(workbook, **read_kwargs)` through the cache: unpickle the
+        entry if there's one, otherwise parse the workbook and store the result.
+        """
+        workbook = Path(workbook)
+        entry = self.entry_path(workbook, **read_kwargs)
+        if (parsed := self._load(entry, pickle.loads)) is not None:
+            return parsed
+
+        parsed = pd.read_excel(workbook, **read_kwargs)
+        # Entries of the other sheets of the workbook's current contents are kept
+        self._store(
+            workbook,
+            entry,
+            pickle.dumps(parsed, protocol=pickle.HIGHEST_PROTOCOL),
+            current_prefix=entry.name.rsplit("_", 1)[0],
+        )
+        self.evict()
+        return parsed
+
+
+def read_excel(
+    workbook: str | Path, cache: ExcelCache | None = None, **read_kwargs
+) -> ParsedSheets:
+    """`pd.read_excel` through the `cache`, or the default one (see
+    `ExcelCache.default`). Without any, the workbook is just parsed.
+    """
+    if cache is None and (cache := ExcelCache.default()) is None:
+        return pd.read_excel(workbook, **read_kwargs)
+    return cache.read(workbook, **read_kwargs)
@@ -1,13 +1,25 @@
 import logging
 from pathlib import Path
-from typing import ClassVar, Final
+from typing import ClassVar, Final, Iterator
 import pandas as pd
 
-from mat_dp_pipeline.abstract_data_sources import TargetsSource
+from mat_dp_pipeline.abstract_data_sources import (
+    SourceFrame,
+    TargetsSource,
+    write_frames,
+)
 from mat_dp_pipeline.data_sources.country_sets import Identifier, SourceWithCountries
+from mat_dp_pipeline.sdf import SDFBuilder
 
-from .common import map_technologies, match_countries
-from .tech_map import TechMap, TechMapTypes, create_tech_map
+from .common import (
+    check_disjoint_parameters,
+    map_technologies,
+    match_countries,
+    partitions,
+    scale_units,
+    split_parameters,
+)
+from .tech_map import LazyTechMap, TechMapTypes
 
 
 class IntegratedAssessmentModelc(TargetsSource):
@@ -15,7 +27,7 @@ class IntegratedAssessmentModelc(TargetsSource):
     _parameters: list[str]
     _country_to_path: dict[str, Path]
     _grouping: Final[list[str]] = ["Region", "Model", "Scenario", "Parameter"]
-    _tech_map: ClassVar[TechMap] = create_tech_map(TechMapTypes.IAMc)
+    _tech_map: ClassVar[LazyTechMap] = LazyTechMap(TechMapTypes.IAMc)
     tail_labels: ClassVar[list[str]] = ["Model", "Scenario", "Parameter"]
     conversion_table: dict[str, float] = {
         "GW/yr": 1000,  # MW/year
@@ -48,12 +60,7 @@ class IntegratedAssessmentModelc(TargetsSource):
             identifier=Identifier.alpha_2
         ) | country_source.country_to_path(identifier=Identifier.alpha_3)
 
-        for i, p1 in enumerate(parameters):
-            for j, p2 in enumerate(parameters):
-                if i != j and (p1.startswith(p2) or p2.startswith(p1)):
-                    raise ValueError(
-                        f"Overlapping definition of parameters: {p1}, {p2}!"
-                    )
+        check_disjoint_parameters(parameters)
     
     
     @classmethod
@@ -62,12 +69,11 @@ class IntegratedAssessmentModelc(TargetsSource):
         csv: str | Path,
         parameters: list[str],
         country_source: type[SourceWithCountries],
+        country_cache: str | Path | None = None,
         **pandas_kwargs,
     ):
         source = pd.read_csv(csv, **pandas_kwargs)
-        print(source.head())
-        source['Region'] = match_countries(source['Region'])
-        print(source.head())
+        source['Region'] = match_countries(source['Region'], country_cache)
         return cls(
             source,
             country_source=country_source,
@@ -75,45 +81,35 @@ class IntegratedAssessmentModelc(TargetsSource):
         )
     
     def __call__(self, output_dir) -> None:
-        targets = self._targets
+        write_frames(output_dir, self.frames())
 
+    def emit(self, builder: SDFBuilder) -> None:
+        builder.add_frames(self.frames())
+
+    def frames(self) -> Iterator[SourceFrame]:
         # Scale the units as required and remove the Unit column
-        first_year_col_name = targets.columns[
-            targets.columns.to_list().index("Unit") + 1
-        ]
-        for unit, factor in self.conversion_table.items():
-            targets.loc[targets["Unit"] == unit, first_year_col_name:] *= factor
-        targets.pop("Unit")
+        targets = scale_units(self._targets, self.conversion_table)
 
         # targets = targets.iloc[:, 1:]  # drop the first columns
         targets.dropna(subset=["Region", "Scenario", "Model"], inplace=True)
         targets.fillna(0, inplace=True)
 
-        # Create an empty Parameter column. We'll be adding the prefixes
-        # of the Variable column defined in self._parameters
-        targets["Parameter"] = None
-
-        mask = pd.Series(False, index=targets.index)
-        # Select only the variables requested by self._parameters
-        for parameter in self._parameters:
-            param_mask = targets["Variable"].str.startswith(parameter + "|")
-            targets.loc[param_mask, "Parameter"] = parameter
-            # Remove the Parameter| prefix from the Variable
-            targets.loc[param_mask, "Variable"] = targets.loc[
-                param_mask, "Variable"
-            ].apply(lambda v: v[len(parameter) + 1:])
-            mask |= param_mask
+        # The Parameter column holds the prefixes of the Variable column defined
+        # in self._parameters, which are removed from the Variable
+        parameters, variables = split_parameters(targets["Variable"], self._parameters)
+        mask = pd.notna(parameters)
 
         # Narrow down targets to the requested parameters
-        targets = targets[mask]
-        assert not any(targets["Parameter"].isna())
+        targets = targets[mask].assign(
+            Variable=variables[mask], Parameter=parameters[mask]
+        )
         if targets.empty:
             logging.warning("Targets for selected parameters are empty!")
             return
 
-        targets = map_technologies(targets[mask], "Variable", self._tech_map)
+        targets = map_technologies(targets, "Variable", self._tech_map)
 
-        for key, targets_frame in targets.groupby(self._grouping):
+        for key, targets_frame in partitions(targets, self._grouping):
             # The first element of grouping is Region!
             try:
                 path = (self._country_to_path[key[0]],) + key[1:]
@@ -123,8 +119,4 @@ class IntegratedAssessmentModelc(TargetsSource):
                 )
                 continue
             path = Path(*path)
-            location_dir = output_dir / path.relative_to("/")
-            location_dir.mkdir(exist_ok=True, parents=True)
-            targets_frame.drop(columns=self._grouping).to_csv(
-                location_dir / self.file_name, index=False
-            )
+            yield path, self.file_name, targets_frame
@@ -1,15 +1,22 @@
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Iterator, Literal, Optional
 
 import pandas as pd
 
-from mat_dp_pipeline.abstract_data_sources import IndicatorsSource, IntensitiesSource
+from mat_dp_pipeline.abstract_data_sources import (
+    IndicatorsSource,
+    IntensitiesSource,
+    SourceFrame,
+    write_frames,
+)
 from mat_dp_pipeline.data_sources.country_sets import (
     CountrySet,
     CountrySets,
     CustomCountry,
     SourceWithCountries,
 )
+from mat_dp_pipeline.data_sources.excel_cache import ExcelCache, read_excel
+from mat_dp_pipeline.sdf import SDFBuilder
 
 mat_dp_names_to_paths = {
     "General": "/",
@@ -87,10 +94,15 @@ class MatDPDBIntensitiesSource(
         spreadsheet: str | Path,
         sheet_name: str = "Material intensities",
         header=1,
+        cache: ExcelCache | None = None,
         **pandas_kwargs
     ):
-        source = pd.read_excel(
-            Path(spreadsheet), sheet_name=sheet_name, header=header, **pandas_kwargs
+        source = read_excel(
+            Path(spreadsheet),
+            cache=cache,
+            sheet_name=sheet_name,
+            header=header,
+            **pandas_kwargs
         )
         return cls(source)
 
@@ -138,14 +150,18 @@ class MatDPDBIntensitiesSource(
         return df
 
     def __call__(self, output_dir: Path) -> None:
+        write_frames(output_dir, self.frames())
+
+    def emit(self, builder: SDFBuilder) -> None:
+        builder.add_frames(self.frames())
+
+    def frames(self) -> Iterator[SourceFrame]:
         ## Drop NaN based on resource value columns only
         # df = df.dropna(subset=df.columns[6:])
         for location, intensities in self._raw().groupby("Location"):
             path = self.name_to_path(str(location))
             df = intensities.drop(columns=["Location"])
-            location_dir = output_dir / path.relative_to("/")
-            location_dir.mkdir(exist_ok=True, parents=True)
-            df.to_csv(location_dir / self.base_file_name, index=False)
+            yield path, self.base_file_name, df
 
 
 class MatDPDBIndicatorsSource(IndicatorsSource):
@@ -161,9 +177,14 @@ class MatDPDBIndicatorsSource(IndicatorsSource):
         sheet_name: str = "Material emissions",
         engine: Literal["xlrd", "openpyxl", "odf", "pyxlsb"] | None = None,
         header: int = 0,
+        cache: ExcelCache | None = None,
     ):
-        source = pd.read_excel(
-            Path(spreadsheet), sheet_name=sheet_name, header=header, engine=engine
+        source = read_excel(
+            Path(spreadsheet),
+            cache=cache,
+            sheet_name=sheet_name,
+            header=header,
+            engine=engine,
         )
         return cls(source)
 
@@ -178,8 +199,13 @@ class MatDPDBIndicatorsSource(IndicatorsSource):
         return cls(source)
 
     def __call__(self, output_dir: Path) -> None:
-        output_dir.mkdir(exist_ok=True, parents=True)
-        (
+        write_frames(output_dir, self.frames())
+
+    def emit(self, builder: SDFBuilder) -> None:
+        builder.add_frames(self.frames())
+
+    def frames(self) -> Iterator[SourceFrame]:
+        indicators = (
             self._indicators.drop(
                 columns=[
                     "Material description",
@@ -190,5 +216,5 @@ class MatDPDBIndicatorsSource(IndicatorsSource):
             )
             .rename(columns={"Material code": "Resource"})
             .dropna()
-            .to_csv(output_dir / self.base_file_name, index=False)
         )
+        yield Path("/"), self.base_file_name, indicators
@@ -1,52 +1,203 @@
+import os
 import re
 import shutil
+from dataclasses import dataclass, field
+from enum import Enum
 from pathlib import Path
+from typing import NamedTuple
 
 from mat_dp_pipeline.abstract_data_sources import (
     IndicatorsSource,
     IntensitiesSource,
     TargetsSource,
 )
-from mat_dp_pipeline.sdf import IndicatorsReader, IntensitiesReader, TargetsReader
+from mat_dp_pipeline.sdf import (
+    IndicatorsReader,
+    IntensitiesReader,
+    SDFBuilder,
+    TargetsReader,
+    load_archive,
+)
+from mat_dp_pipeline.sdf.archive import is_archive
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl cloning a whole file (linux/fs.h)
+_FICLONE = 0x40049409
+
+
+class LinkMode(Enum):
+    """How the stored files are placed in the output directory. Links take no extra
+    space, but the linked files must not be modified afterwards: a hard link shares
+    the contents with the stored file, and a symbolic link points at it. A reflink
+    (a copy-on-write clone, e.g. on Btrfs or XFS) is safe to modify. If the link
+    can't be made (e.g. across file systems), the file is copied.
+    """
+
+    COPY = "copy"
+    HARDLINK = "hardlink"
+    SYMLINK = "symlink"
+    REFLINK = "reflink"
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if fcntl is None:
+        raise OSError("Reflinks aren't supported on this platform")
+    with open(src, "rb") as s, open(dst, "wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        except OSError:
+            dst.unlink()
+            raise
+
+
+def _place_file(src: Path, dst: Path, link: LinkMode) -> None:
+    if link != LinkMode.COPY:
+        try:
+            if link == LinkMode.HARDLINK:
+                os.link(src, dst)
+            elif link == LinkMode.SYMLINK:
+                dst.symlink_to(src.resolve())
+            else:
+                _reflink(src, dst)
+            return
+        except OSError:
+            pass
+    shutil.copy(src, dst)
+
+
+@dataclass
+class DirectoryScan:
+    """Files of a directory tree, listed once, as the scan is created. Stored sources
+    of the same SDF directory can share it (see StoredSDF), so that the tree is
+    walked only once, even when the sources are run concurrently by `create_sdf`:
+    threads find the listing ready, and processes receive it along with the sources.
+    """
+
+    directory: Path
+    files: list[Path] = field(init=False)
+
+    def __post_init__(self):
+        self.files = sorted(f for f in self.directory.rglob("*") if f.is_file())
 
+    def matching(self, file_pattern: re.Pattern) -> list[Path]:
+        return [f for f in self.files if file_pattern.match(f.name)]
 
-def copy_files(src: Path, dst: Path, file_pattern: re.Pattern) -> None:
+
+def copy_files(
+    src: Path,
+    dst: Path,
+    file_pattern: re.Pattern,
+    link: LinkMode = LinkMode.COPY,
+    scan: DirectoryScan | None = None,
+) -> None:
     """Copy files from `src` to `dst` matching `file_pattern`. The operation
     preserves relative paths of the copied files.
-    """
 
-    source_files = filter(
-        lambda f: f.is_file() and file_pattern.match(f.name), src.rglob("*")
-    )
-    for f in source_files:
+    Args:
+        src (Path): Source directory
+        dst (Path): Destination directory
+        file_pattern (re.Pattern): Pattern of the names of the files to copy
+        link (LinkMode, optional): Link the files instead of copying them.
+            Defaults to LinkMode.COPY.
+        scan (DirectoryScan | None, optional): Files of `src`, if they've been
+            listed already. Defaults to None - `src` is walked.
+    """
+    scan = scan or DirectoryScan(src)
+    for f in scan.matching(file_pattern):
         relative = f.relative_to(src)
         dst_file = dst / relative
         if dst_file.exists():
             raise ValueError(f"File {dst_file} already exists!")
         dst_file.parent.mkdir(exist_ok=True, parents=True)
-        shutil.copy(f, dst_file)
+        _place_file(f, dst_file, link)
 
 
 class _StoredSource:
+    """Files of an SDF directory, or of a single-file SDF archive (.sdfa)."""
+
     path: Path
+    link: LinkMode
+    _scan: DirectoryScan | None
+    _kind: str
+    _file_pattern: re.Pattern
 
-    def __init__(self, path: Path):
+    def __init__(
+        self,
+        path: Path,
+        link: LinkMode = LinkMode.COPY,
+        scan: DirectoryScan | None = None,
+    ):
+        """
+        Args:
+            path (Path): SDF directory or archive
+            link (LinkMode, optional): How the files are placed in the output
+                directory. Defaults to LinkMode.COPY.
+            scan (DirectoryScan | None, optional): Listing of the files of `path`
+                shared with other sources. Defaults to None - `path` is walked each
+                time the source is used.
+        """
         self.path = path
+        self.link = LinkMode(link)
+        self._scan = scan
 
+    def _files(self) -> DirectoryScan:
+        return self._scan or DirectoryScan(Path(self.path))
 
-class StoredTargets(_StoredSource, TargetsSource):
     def __call__(self, output_dir: Path) -> None:
-        pattern = TargetsReader().file_pattern
-        copy_files(self.path, output_dir, pattern)
+        if is_archive(self.path):
+            sdf = load_archive(self.path)
+            # e.g. save_targets
+            getattr(sdf, f"save_{self._kind}")(output_dir)
+        else:
+            copy_files(
+                self.path, output_dir, self._file_pattern, self.link, self._files()
+            )
+
+    def emit(self, builder: SDFBuilder) -> None:
+        if is_archive(self.path):
+            builder.add_archive(self.path, self._file_pattern)
+        else:
+            builder.add_directory(
+                self.path,
+                self._file_pattern,
+                self._files().matching(self._file_pattern),
+            )
+
+
+class StoredTargets(_StoredSource, TargetsSource):
+    _kind = "targets"
+    _file_pattern = TargetsReader().file_pattern
 
 
 class StoredIntensities(_StoredSource, IntensitiesSource):
-    def __call__(self, output_dir: Path) -> None:
-        pattern = IntensitiesReader().file_pattern
-        copy_files(self.path, output_dir, pattern)
+    _kind = "intensities"
+    _file_pattern = IntensitiesReader().file_pattern
 
 
 class StoredIndicators(_StoredSource, IndicatorsSource):
-    def __call__(self, output_dir: Path) -> None:
-        pattern = IndicatorsReader().file_pattern
-        copy_files(self.path, output_dir, pattern)
+    _kind = "indicators"
+    _file_pattern = IndicatorsReader().file_pattern
+
+
+class StoredSDF(NamedTuple):
+    """Stored sources of all the inputs of an SDF directory."""
+
+    intensities: StoredIntensities
+    indicators: StoredIndicators
+    targets: StoredTargets
+
+    @classmethod
+    def scan(cls, path: Path, link: LinkMode = LinkMode.COPY) -> "StoredSDF":
+        """Sources of the SDF directory, which share a single walk of its tree. The
+        tree is walked here, before the sources are used.
+        """
+        scan = None if is_archive(path) else DirectoryScan(Path(path))
+        return cls(
+            StoredIntensities(path, link, scan),
+            StoredIndicators(path, link, scan),
+            StoredTargets(path, link, scan),
+        )
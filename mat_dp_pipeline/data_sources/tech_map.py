@@ -1,10 +1,19 @@
+import hashlib
+import json
+import logging
 from enum import Enum
 from functools import cache
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from .excel_cache import read_excel
+
 TECH_MAP_FILE = Path(__file__).parent / "Technology_Codes.xlsx"
+# Contents of TECH_MAP_FILE, so that it isn't parsed at runtime. Rebuild it with
+# `build_tech_map_artifact()` after changing the workbook.
+TECH_MAP_ARTIFACT = Path(__file__).parent / "Technology_Codes.json"
 
 
 TechMap = dict[str, tuple[str, str]]
@@ -18,9 +27,39 @@ class TechMapTypes(Enum):
     IAMc = "Variable"
 
 
+def _workbook_digest() -> str:
+    return hashlib.blake2b(TECH_MAP_FILE.read_bytes(), digest_size=16).hexdigest()
+
+
+def build_tech_map_artifact() -> None:
+    """Save the contents of TECH_MAP_FILE to TECH_MAP_ARTIFACT."""
+    df = read_excel(TECH_MAP_FILE, header=1)
+    artifact = {
+        "workbook_digest": _workbook_digest(),
+        "columns": df.columns.to_list(),
+        "rows": df.astype(object).where(df.notna(), None).values.tolist(),
+    }
+    TECH_MAP_ARTIFACT.write_text(json.dumps(artifact, ensure_ascii=False) + "\n")
+
+
 @cache
 def tech_map_frame() -> pd.DataFrame:
-    return pd.read_excel(TECH_MAP_FILE, header=1)
+    """Contents of TECH_MAP_FILE, from TECH_MAP_ARTIFACT unless the workbook has
+    changed since the artifact was built.
+    """
+    try:
+        artifact = json.loads(TECH_MAP_ARTIFACT.read_text())
+    except FileNotFoundError:
+        artifact = None
+    if artifact is None or artifact["workbook_digest"] != _workbook_digest():
+        logging.warning(
+            f"{TECH_MAP_ARTIFACT.name} is out of date, parsing {TECH_MAP_FILE.name}. "
+            "Rebuild it with `build_tech_map_artifact()`."
+        )
+        return read_excel(TECH_MAP_FILE, header=1)
+
+    df = pd.DataFrame(artifact["rows"], columns=artifact["columns"], dtype=object)
+    return df.where(df.notna(), np.nan)
 
 
 def create_tech_map(
@@ -45,3 +84,21 @@ def create_tech_map(
         .apply(tuple, axis=1)
         .to_dict()
     )
+
+
+class LazyTechMap:
+    """Class attribute holding the tech map from `from_type` (to MATDB), which is
+    created on the first access rather than at import.
+    """
+
+    _from_type: TechMapTypes
+    _tech_map: TechMap | None
+
+    def __init__(self, from_type: TechMapTypes):
+        self._from_type = from_type
+        self._tech_map = None
+
+    def __get__(self, instance, owner) -> TechMap:
+        if self._tech_map is None:
+            self._tech_map = create_tech_map(self._from_type)
+        return self._tech_map
@@ -1,22 +1,51 @@
 import logging
+from collections import defaultdict
 from pathlib import Path
-from typing import ClassVar, Final
+from typing import ClassVar, Final, Iterable, Iterator
 
 import pandas as pd
 
-from mat_dp_pipeline.abstract_data_sources import TargetsSource
+from mat_dp_pipeline.abstract_data_sources import (
+    SourceFrame,
+    TargetsSource,
+    write_frames,
+)
 from mat_dp_pipeline.data_sources.country_sets import Identifier, SourceWithCountries
+from mat_dp_pipeline.sdf import SDFBuilder
 
-from .common import map_technologies
-from .tech_map import TechMap, TechMapTypes, create_tech_map
+from .common import map_technologies, partitions, warn_unmapped
+from .excel_cache import ExcelCache, read_excel
+from .tech_map import LazyTechMap, TechMapTypes
+
+
+class _CSVChunks:
+    """Chunks of a TEMBA results file, with only the columns the targets need (no
+    index column and no scenario). Each iteration reads the file anew.
+    """
+
+    def __init__(self, csv: str | Path, chunksize: int, **pandas_kwargs):
+        self._csv = csv
+        self._chunksize = chunksize
+        self._pandas_kwargs = pandas_kwargs
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        header = pd.read_csv(self._csv, nrows=0, **self._pandas_kwargs).columns
+        usecols = [c for c in header[1:] if c != "scenario"]
+        with pd.read_csv(
+            self._csv,
+            usecols=usecols,
+            chunksize=self._chunksize,
+            **self._pandas_kwargs,
+        ) as reader:
+            yield from reader
 
 
 class TMBATargetsSource(TargetsSource):
-    _targets_csv: Path
+    _targets: pd.DataFrame | Iterable[pd.DataFrame]
     _targets_parameters: list[str]
     _country_to_path: dict[str, Path]
     _grouping: Final[list[str]] = ["country", "parameter"]
-    _tech_map: ClassVar[TechMap] = create_tech_map(TechMapTypes.TMBA)
+    _tech_map: ClassVar[LazyTechMap] = LazyTechMap(TechMapTypes.TMBA)
     # Dictionary for fixing country names like NM -> NA (Namibia)
     _country_patching: ClassVar[dict[str, str]] = {"NM": "NA"}
 
@@ -24,10 +53,18 @@ class TMBATargetsSource(TargetsSource):
 
     def __init__(
         self,
-        targets: pd.DataFrame,
+        targets: pd.DataFrame | Iterable[pd.DataFrame],
         parameters: list[str],
         country_source: type[SourceWithCountries],
     ):
+        """
+        Args:
+            targets (pd.DataFrame | Iterable[pd.DataFrame]): TEMBA results, or their
+                chunks without the index and scenario columns (see `from_csv`), which
+                are filtered and mapped one by one.
+            parameters (list[str]): Parameters to take the targets of
+            country_source (type[SourceWithCountries]): Source of the country paths
+        """
         if not parameters:
             raise ValueError("You must specify parameters.")
 
@@ -44,10 +81,11 @@ class TMBATargetsSource(TargetsSource):
         parameters: list[str],
         country_source: type[SourceWithCountries],
         sheet_name: str = "DATA_TIAM",
+        cache: ExcelCache | None = None,
         **pandas_kwargs
     ):
-        source = pd.read_excel(
-            Path(spreadsheet), sheet_name=sheet_name, **pandas_kwargs
+        source = read_excel(
+            Path(spreadsheet), cache=cache, sheet_name=sheet_name, **pandas_kwargs
         )
         return cls(source, country_source=country_source, parameters=parameters)
 
@@ -57,9 +95,26 @@ class TMBATargetsSource(TargetsSource):
         csv: str | Path,
         parameters: list[str],
         country_source: type[SourceWithCountries],
+        chunksize: int | None = None,
         **pandas_kwargs
     ):
-        source = pd.read_csv(csv, **pandas_kwargs)
+        """Targets from a TEMBA results CSV file.
+
+        Args:
+            csv (str | Path): Results file
+            parameters (list[str]): Parameters to take the targets of
+            country_source (type[SourceWithCountries]): Source of the country paths
+            chunksize (int | None, optional): Stream the file in chunks of this many
+                rows, keeping only the rows of the `parameters`. The file is read when
+                the SDF is created, and memory use is proportional to the selected
+                targets rather than the file. Defaults to None - read the whole file
+                upfront.
+        """
+        source = (
+            pd.read_csv(csv, **pandas_kwargs)
+            if chunksize is None
+            else _CSVChunks(csv, chunksize, **pandas_kwargs)
+        )
         return cls(
             source,
             country_source=country_source,
@@ -67,23 +122,48 @@ class TMBATargetsSource(TargetsSource):
         )
 
     def __call__(self, output_dir: Path) -> None:
-        targets = self._targets
+        write_frames(output_dir, self.frames())
+
+    def emit(self, builder: SDFBuilder) -> None:
+        builder.add_frames(self.frames())
+
+    def _select(self, targets: pd.DataFrame, unmapped: set) -> pd.DataFrame:
+        """Rows of the requested parameters, with the technologies mapped. Unmapped
+        variables are added to `unmapped`.
+        """
         # Pick targets which parameter's value is in requested parameters (self._targets_parameters)
         targets = targets[targets["parameter"].isin(self._targets_parameters)]
-
         if targets.empty:
+            return targets
+        return map_technologies(targets.dropna(), "variable", self._tech_map, unmapped)
+
+    def frames(self) -> Iterator[SourceFrame]:
+        if isinstance(self._targets, pd.DataFrame):
+            chunks: Iterable[pd.DataFrame] = [
+                self._targets.drop(columns=[self._targets.columns[0], "scenario"])
+            ]
+        else:
+            chunks = self._targets
+
+        # Targets of each (country, parameter), in the order of the rows
+        groups: dict[tuple, list[pd.DataFrame]] = defaultdict(list)
+        selected = False
+        unmapped: set = set()
+        for chunk in chunks:
+            targets = self._select(chunk, unmapped)
+            selected = selected or not targets.empty
+            for key, targets_frame in partitions(targets, self._grouping):
+                groups[key].append(targets_frame)
+
+        if unmapped:
+            warn_unmapped(unmapped)
+        if not selected:
             logging.warning("Targets for selected parameters are empty!")
             return
 
-        targets = targets.drop(columns=[targets.columns[0], "scenario"]).dropna()
-        targets = map_technologies(targets, "variable", self._tech_map)
-
-        for key, targets_frame in targets.groupby(self._grouping):
+        for key in sorted(groups):
+            targets_frame = pd.concat(groups[key])
             country = self._country_patching.get(key[0]) or key[0]
             path = (self._country_to_path[country],) + key[1:]
             path = Path(*path)
-            location_dir = output_dir / path.relative_to("/")
-            location_dir.mkdir(exist_ok=True, parents=True)
-            targets_frame.drop(columns=self._grouping).to_csv(
-                location_dir / self.file_name, index=False
-            )
+            yield path, self.file_name, targets_frame
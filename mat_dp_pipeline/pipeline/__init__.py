@@ -1 +1,2 @@
 from mat_dp_pipeline.pipeline.pipeline import PipelineOutput, pipeline
+from mat_dp_pipeline.pipeline.profiling import ProfilingReport
@@ -1,10 +1,10 @@
-import itertools
 from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
 
 from .common import ProcessableInput
+from .registry import Registry
 
 
 @dataclass(frozen=True, order=False, eq=False)
@@ -25,27 +25,111 @@ class ProcessedOutput:
         return self.emissions.loc[indicator]
 
 
-def calculate(inpt: ProcessableInput) -> ProcessedOutput:
-    required_resources = inpt.intensities.mul(inpt.targets, axis="index").rename_axis(
-        index=["Category", "Specific"], columns=["Resource"]
+def _product_index(indicators: pd.Index, techs: pd.MultiIndex) -> pd.MultiIndex:
+    """(Indicator, Category, Specific) index of every indicator with every tech, in the
+    order of `itertools.product(indicators, techs)`.
+    """
+    indicator_codes, indicator_levels = pd.factorize(indicators)
+    return pd.MultiIndex(
+        levels=[pd.Index(indicator_levels), *techs.levels],
+        codes=[
+            np.repeat(indicator_codes, len(techs)),
+            *(np.tile(codes, len(indicators)) for codes in techs.codes),
+        ],
+        names=["Indicator", "Category", "Specific"],
+        verify_integrity=False,
     )
 
-    index = pd.MultiIndex.from_tuples(
-        (
-            (ind, *tech)
-            for ind, tech in itertools.product(
-                inpt.indicators.columns, inpt.intensities.index
-            )
+
+# Axes of the outputs: techs, resources and the emissions' index
+OutputAxes = tuple[pd.Index, pd.Index, pd.MultiIndex]
+# Labelled axes by the codes of the techs, resources and indicators
+LabelsMemo = dict[tuple[bytes, bytes, bytes], OutputAxes]
+
+
+def _labelled_axes(
+    techs: pd.Index,
+    resources: pd.Index,
+    indicators: pd.Index,
+    registry: Registry | None,
+) -> OutputAxes:
+    if registry is not None:
+        techs = registry.tech_labels(techs)
+        resources = registry.resource_labels(resources)
+        indicators = registry.indicator_labels(indicators)
+    techs = techs.set_names(["Category", "Specific"])
+    return techs, resources.rename("Resource"), _product_index(indicators, techs)
+
+
+def _output(
+    required_resources: pd.DataFrame, emissions: np.ndarray, axes: OutputAxes
+) -> ProcessedOutput:
+    techs, resources, emissions_index = axes
+    return ProcessedOutput(
+        required_resources=required_resources.set_axis(techs, axis="index").set_axis(
+            resources, axis="columns"
         ),
-        names=["Indicator", "Category", "Specific"],
+        emissions=pd.DataFrame(emissions, index=emissions_index, columns=resources),
+    )
+
+
+def label_output(
+    output: ProcessedOutput,
+    registry: Registry | None = None,
+    memo: LabelsMemo | None = None,
+) -> ProcessedOutput:
+    """The output of `calculate(..., labelled=False)` with the labels of the
+    `registry` in place of its codes, and the names of the axes set.
+
+    Args:
+        output (ProcessedOutput): Output indexed by the codes of the `registry`
+        registry (Registry | None, optional): Labels of the codes. Defaults to None -
+            the output is indexed by the labels already.
+        memo (LabelsMemo | None, optional): Axes labelled before, e.g. of the other
+            years of a leaf. Outputs with the same codes share their axes then.
+            Defaults to None.
+    """
+    techs, resources = output.required_resources.axes
+    # Each indicator's rows are the techs' ones
+    indicators = output.emissions.index[:: max(len(techs), 1)]
+    if memo is None or registry is None:
+        axes = _labelled_axes(techs, resources, indicators, registry)
+    else:
+        key = tuple(
+            axis.to_numpy(np.intp).tobytes() for axis in (techs, resources, indicators)
+        )
+        if key not in memo:
+            memo[key] = _labelled_axes(techs, resources, indicators, registry)
+        axes = memo[key]
+    return _output(output.required_resources, output.emissions.to_numpy(), axes)
+
+
+def calculate(inpt: ProcessableInput, labelled: bool = True) -> ProcessedOutput:
+    """Required resources and emissions of the input.
+
+    Args:
+        inpt (ProcessableInput): Input
+        labelled (bool, optional): Whether to label the outputs. Otherwise, they
+            keep the axes of the input's frames (e.g. the codes of a registry), to be
+            labelled by `label_output`. Defaults to True.
+    """
+    required_resources = inpt.intensities.mul(inpt.targets, axis="index")
+    emissions = np.einsum(
+        "ij,jk->kij", required_resources.values, inpt.indicators.values
+    ).reshape(len(inpt.indicators.columns) * len(inpt.intensities.index), -1)
+
+    techs, resources, indicators = (
+        inpt.intensities.index,
+        inpt.intensities.columns,
+        inpt.indicators.columns,
+    )
+    if labelled:
+        # Labels are attached only to the outputs
+        axes = _labelled_axes(techs, resources, indicators, inpt.registry)
+        return _output(required_resources, emissions, axes)
+    # Only the indicators label the rows of the emissions, in the order of the product
+    indicator_rows = pd.Index(np.repeat(indicators.to_numpy(), len(techs)))
+    return ProcessedOutput(
+        required_resources=required_resources,
+        emissions=pd.DataFrame(emissions, index=indicator_rows, columns=resources),
     )
-    emissions = pd.DataFrame(
-        np.einsum(
-            "ij,jk->kij", required_resources.values, inpt.indicators.values
-        ).reshape(len(index), -1),
-        index=index,
-        columns=inpt.intensities.columns,
-    ).rename_axis(columns="Resource")
-
-    assert isinstance(emissions, pd.DataFrame)
-    return ProcessedOutput(required_resources=required_resources, emissions=emissions)
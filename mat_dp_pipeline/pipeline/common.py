@@ -1,8 +1,10 @@
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+from mat_dp_pipeline.pipeline.registry import Registry
 from mat_dp_pipeline.sdf import validate_tech_units
 
 
@@ -14,7 +16,7 @@ class SparseYearsInput:
     of this class.
 
     Year is another dimension here -- level 0 index in intensities & indicators,
-    year columns in targets.
+    year columns in targets. Techs, resources and indicators are the codes of the `registry`.
 
     Attributes:
         intensities (DataFrame): (Year, Tech) x (Resource1, Resource2, ..., ResourceN)
@@ -23,12 +25,23 @@ class SparseYearsInput:
         indicators (DataFrame): (Year, Resource) x (Indicator1, Indicator2, ..., IndicatorM)
             There should be exactly N resources, matching columns in intensities frame
         tech_metadata (DataFrame): Technologies metadata
+        registry (Registry): Labels of the codes in the frames
+        digest (str | None): Content digest of the target-independent inputs (intensities,
+            indicators and tech metadata) this input was flattened from. Inputs with the same
+            digest and the same target techs hold identical intensities & indicators, so
+            anything derived from them only needs computing once. None when unknown.
+        indicators_source (Path | None): Path of the SDF node which defined the indicators
+            last (i.e. the deepest one on the way to the leaf). Descendants of a node
+            which don't override its indicators share it. None when unknown.
     """
 
     intensities: pd.DataFrame
     targets: pd.DataFrame
     indicators: pd.DataFrame
     tech_metadata: pd.DataFrame
+    registry: Registry
+    digest: str | None = None
+    indicators_source: Path | None = None
 
     def copy(self) -> "SparseYearsInput":
         return SparseYearsInput(
@@ -36,6 +49,9 @@ class SparseYearsInput:
             targets=self.targets.copy(),
             indicators=self.indicators.copy(),
             tech_metadata=self.tech_metadata.copy(),
+            registry=self.registry,
+            digest=self.digest,
+            indicators_source=self.indicators_source,
         )
 
     def validate(self) -> set[str]:
@@ -51,22 +67,26 @@ class SparseYearsInput:
             whether it's an error or not. No exception is thrown here if this set
             isn't empty.
         """
-        validate_tech_units(self.tech_metadata)
-        intensities_techs = self.intensities.index.droplevel(0).unique()
-        targets_techs = self.targets.index
+        validate_tech_units(self.registry.decode_techs(self.tech_metadata))
+        years = self.intensities.index.get_level_values(0).to_numpy()
+        techs = self.intensities.index.get_level_values(1).to_numpy()
+        targets_techs = self.targets.index.to_numpy()
 
-        if not set(targets_techs) <= set(intensities_techs):
+        if not np.isin(targets_techs, techs).all():
             raise ValueError("Target's techs must be a subset of intensities' techs!")
 
-        # move years to columns, reindex techs, bring the years back
-        intensities = self.intensities.unstack(level=0).reindex(targets_techs).stack()
-        assert isinstance(intensities, pd.DataFrame)
-        self.intensities = intensities.reorder_levels(
-            ["Year", "Category", "Specific"]
-        ).sort_index()
-
-        # unstack/stack messes with types
-        assert isinstance(self.intensities, pd.DataFrame)
+        # Keep the target techs' rows with any values, sorted by year and tech
+        values = self.intensities.to_numpy()
+        keep = np.isin(techs, targets_techs) & ~np.isnan(values).all(axis=1)
+        order = np.lexsort((techs[keep], years[keep]))
+        self.intensities = pd.DataFrame(
+            values[keep][order],
+            index=pd.MultiIndex.from_arrays(
+                [years[keep][order], techs[keep][order]],
+                names=self.intensities.index.names,
+            ),
+            columns=self.intensities.columns,
+        )
 
         intensities_resources = set(self.intensities.columns)
         indicators_resources = set(self.indicators.index.get_level_values("Resource"))
@@ -77,10 +97,12 @@ class SparseYearsInput:
         if mismatched_resources:
             sorted_resources = sorted(common_resources)
             self.intensities = self.intensities.reindex(columns=sorted_resources)
-            self.indicators = self.indicators.reindex(
-                sorted_resources, level="Resource"
-            )
-        return mismatched_resources
+            self.indicators = self.indicators[
+                self.indicators.index.get_level_values("Resource").isin(
+                    sorted_resources
+                )
+            ]
+        return set(self.registry.resource_labels(sorted(mismatched_resources)))
 
 
 @dataclass(eq=False, order=False)
@@ -93,17 +115,42 @@ class ProcessableInput:
         targets (Series): Tech -> float. Tech keys must be a subset of intensities' keys
         indicators (DataFrame): Resource x (Indicator1, Indicator2, ..., IndicatorM)
             There should be exactly N resources, matching columns in intensities frame
+        registry (Registry | None): Labels of the codes in the frames. None if the frames
+            are indexed by the labels themselves.
     """
 
     intensities: pd.DataFrame
     targets: pd.Series
     indicators: pd.DataFrame
+    registry: Registry | None = None
 
     def copy(self) -> "ProcessableInput":
         return ProcessableInput(
             intensities=self.intensities.copy(),
             targets=self.targets.copy(),
             indicators=self.indicators.copy(),
+            registry=self.registry,
+        )
+
+    def labelled(self) -> "ProcessableInput":
+        """The input with the labels in place of the registry's codes."""
+        if self.registry is None:
+            return self
+        registry = self.registry
+        return ProcessableInput(
+            intensities=self.intensities.set_axis(
+                registry.tech_labels(self.intensities.index), axis="index"
+            ).set_axis(
+                registry.resource_labels(self.intensities.columns).rename(None),
+                axis="columns",
+            ),
+            targets=self.targets.set_axis(registry.tech_labels(self.targets.index)),
+            indicators=self.indicators.set_axis(
+                registry.resource_labels(self.indicators.index), axis="index"
+            ).set_axis(
+                registry.indicator_labels(self.indicators.columns).rename(None),
+                axis="columns",
+            ),
         )
 
     def save(self, directory: Path, exist_ok: bool = False) -> None:
@@ -127,6 +174,7 @@ class ProcessableInput:
                 and not indicators_file.exists()
             )
 
-        self.intensities.to_csv(intensities_file)
-        self.targets.to_csv(targets_file)
-        self.indicators.to_csv(indicators_file)
+        labelled = self.labelled()
+        labelled.intensities.to_csv(intensities_file)
+        labelled.targets.to_csv(targets_file)
+        labelled.indicators.to_csv(indicators_file)
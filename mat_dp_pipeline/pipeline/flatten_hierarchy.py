@@ -1,13 +1,21 @@
+import dataclasses
+import hashlib
 import logging
 from collections import defaultdict
+from functools import partial
+from multiprocessing import cpu_count
+from multiprocessing.pool import Pool
 from pathlib import Path
-from typing import Iterator
+from typing import Callable, Iterator
 
+import numpy as np
 import pandas as pd
 
 from mat_dp_pipeline.common import Tree, create_path_tree
 from mat_dp_pipeline.pipeline.common import SparseYearsInput
-from mat_dp_pipeline.sdf import StandardDataFormat, Year
+from mat_dp_pipeline.pipeline.profiling import TaskUsage, run_measured
+from mat_dp_pipeline.pipeline.registry import Recoding, Registry
+from mat_dp_pipeline.sdf import PathFilter, StandardDataFormat, Year
 
 
 def stringify_tree(tree: Tree, collapse_limit: int | None = None) -> list[str]:
@@ -41,85 +49,375 @@ def overlay_in_order(
     base_overlay: pd.DataFrame,
     yearly_overlays: dict[Year, pd.DataFrame],
 ) -> pd.DataFrame:
-    overlaid = df
+    """Overlay a node's frames on the ones flattened from its ancestors. All the frames
+    are indexed by codes (see Registry): the node's ones by techs (or resources), the
+    flattened one by (Year, Tech) (or (Year, Resource)).
 
+    The result has the union of the rows and the columns. Overlays of later years
+    take precedence, with the base overlay being year 0, and `df` coming before all of
+    them. Missing values never replace the existing ones.
+    """
     # Overlays sorted by year, first one being base_overlay (year 0)
-    sorted_overlays = sorted(({Year(0): base_overlay} | yearly_overlays).items())
+    sorted_overlays = [
+        (year, overlay)
+        for year, overlay in sorted(({Year(0): base_overlay} | yearly_overlays).items())
+        if not overlay.empty
+    ]
+    if not sorted_overlays:
+        return df
 
+    # (year, code) rows are keyed by single integers: year in the upper 32 bits
+    layers: list[tuple[np.ndarray, pd.Index, np.ndarray]] = []
+    if not df.empty:
+        years = df.index.get_level_values(0).to_numpy(np.int64)
+        codes = df.index.get_level_values(1).to_numpy(np.int64)
+        layers.append(((years << 32) | codes, df.columns, df.to_numpy()))
     for year, overlay in sorted_overlays:
-        if overlay.empty:
-            continue
+        keys = (np.int64(year) << 32) | overlay.index.to_numpy(np.int64)
+        layers.append((keys, overlay.columns, overlay.to_numpy()))
+
+    keys = np.unique(np.concatenate([layer[0] for layer in layers]))
+    columns = np.unique(np.concatenate([layer[1] for layer in layers]))
+    values = np.full((len(keys), len(columns)), np.nan)
+    for layer_keys, layer_columns, layer_values in layers:
+        cells = np.ix_(
+            np.searchsorted(keys, layer_keys), np.searchsorted(columns, layer_columns)
+        )
+        values[cells] = np.where(np.isnan(layer_values), values[cells], layer_values)
+
+    first_overlay = sorted_overlays[0][1]
+    return pd.DataFrame(
+        values,
+        index=pd.MultiIndex.from_arrays(
+            [keys >> 32, keys & 0xFFFFFFFF], names=["Year", first_overlay.index.name]
+        ),
+        columns=pd.Index(columns, name=first_overlay.columns.name),
+    )
+
+
+def _node_digest(parent_digest: str, frames: list[tuple[str, pd.DataFrame]]) -> str:
+    """Digest of the inputs overlaid down to the node with the `frames`.
+    Nodes that don't define any intensities, indicators or tech metadata inherit the
+    digest of their parent.
+    """
+    frames = [(name, df) for name, df in frames if not df.empty]
+    if not frames:
+        return parent_digest
+
+    h = hashlib.blake2b(parent_digest.encode(), digest_size=16)
+    for name, df in frames:
+        h.update(repr((name, df.index.names, df.columns.to_list())).encode())
+        h.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    return h.hexdigest()
 
-        # Add "Year" level to the index. Concat is idiomatic way of doing it
-        update_df = pd.concat({year: overlay}, names=["Year"])
 
-        if overlaid.empty:
-            overlaid = update_df.copy()
-        else:
-            overlaid = update_df.combine_first(overlaid)
+# Validated leaf inputs, keyed by (digest, target techs)
+_ValidatedLeaves = dict[tuple, tuple[SparseYearsInput, set[str]]]
+FlattenedLeaf = tuple[Path, SparseYearsInput, set[str]]
 
+
+def _overlay_node(
+    sdf: StandardDataFormat, sparse_years: SparseYearsInput, label: Path
+) -> SparseYearsInput:
+    registry = sparse_years.registry
+    base_intensities = registry.encode_intensities(sdf.base_intensities)
+    intensities_yearly = {
+        year: registry.encode_intensities(df)
+        for year, df in sdf.intensities_yearly.items()
+    }
+    base_indicators = registry.encode_indicators(sdf.base_indicators)
+    indicators_yearly = {
+        year: registry.encode_indicators(df)
+        for year, df in sdf.indicators_yearly.items()
+    }
+    tech_metadata = registry.encode_techs(sdf.tech_metadata)
+
+    if not (
+        base_indicators.empty
+        or sparse_years.indicators.empty
+        or list(sparse_years.indicators.columns) == list(base_indicators.columns)
+    ):
+        raise ValueError(
+            f"{label}: Indicators' names on each level have to be the same!"
+        )
+
+    # The digest is taken of the labelled frames, so that it doesn't depend on the
+    # registry, which may differ between the subtrees flattened separately
+    frames = [
+        ("intensities", sdf.base_intensities),
+        ("indicators", sdf.base_indicators),
+        ("tech_metadata", sdf.tech_metadata),
+    ]
+    frames += [(f"intensities_{y}", df) for y, df in sdf.intensities_yearly.items()]
+    frames += [(f"indicators_{y}", df) for y, df in sdf.indicators_yearly.items()]
+
+    # Overlays never modify frames in place, so there's no need to copy the
+    # parent's ones. Nodes without own data simply pass them down.
+    overlaid = SparseYearsInput(
+        intensities=overlay_in_order(
+            sparse_years.intensities, base_intensities, intensities_yearly
+        ),
+        targets=sparse_years.targets,
+        indicators=overlay_in_order(
+            sparse_years.indicators, base_indicators, indicators_yearly
+        ),
+        tech_metadata=sparse_years.tech_metadata,
+        registry=registry,
+        digest=_node_digest(sparse_years.digest or "", frames),
+        indicators_source=sparse_years.indicators_source,
+    )
+    own_indicators = [base_indicators, *indicators_yearly.values()]
+    if any(not df.empty for df in own_indicators):
+        overlaid.indicators_source = label
+    if overlaid.tech_metadata.empty:
+        overlaid.tech_metadata = tech_metadata
+    elif not tech_metadata.empty:
+        overlaid.tech_metadata = (
+            pd.concat([overlaid.tech_metadata, tech_metadata]).groupby(level=0).last()
+        )
     return overlaid
 
 
+def _validate_leaf(
+    overlaid: SparseYearsInput, targets: pd.DataFrame, validated: _ValidatedLeaves
+) -> tuple[SparseYearsInput, set[str]]:
+    # Leaves that inherit identical inputs and target the same techs share the
+    # validated frames.
+    key = (overlaid.digest, tuple(targets.index))
+    if key not in validated:
+        leaf = SparseYearsInput(
+            intensities=overlaid.intensities,
+            targets=targets,
+            indicators=overlaid.indicators,
+            # Trim tech_meta to the techs specified in targets
+            tech_metadata=overlaid.tech_metadata.reindex(targets.index),
+            registry=overlaid.registry,
+            digest=overlaid.digest,
+        )
+        mismatched_resources = leaf.validate()
+        validated[key] = leaf, mismatched_resources
+
+    leaf, mismatched_resources = validated[key]
+    return (
+        SparseYearsInput(
+            intensities=leaf.intensities,
+            targets=targets,
+            indicators=leaf.indicators,
+            tech_metadata=leaf.tech_metadata,
+            registry=leaf.registry,
+            digest=leaf.digest,
+            indicators_source=overlaid.indicators_source,
+        ),
+        mismatched_resources,
+    )
+
+
+def _dfs(
+    sdf: StandardDataFormat,
+    sparse_years: SparseYearsInput,
+    label: Path,
+    validated: _ValidatedLeaves,
+    path_filter: PathFilter | None = None,
+) -> Iterator[FlattenedLeaf]:
+    overlaid = _overlay_node(sdf, sparse_years, label)
+
+    # Go down in the hierarchy, skipping subtrees without selected leaves
+    for name in _selected_children(sdf, label, path_filter):
+        yield from _dfs(
+            sdf.children[name], overlaid, label / name, validated, path_filter
+        )
+
+    # Yield only leaves with targets
+    if (
+        not sdf.children
+        and sdf.targets is not None
+        and (path_filter is None or path_filter.matches(label))
+    ):
+        targets = overlaid.registry.encode_techs(sdf.targets)
+        leaf, mismatched_resources = _validate_leaf(overlaid, targets, validated)
+        yield label, leaf, mismatched_resources
+
+
+def _selected_children(
+    sdf: StandardDataFormat, label: Path, path_filter: PathFilter | None
+) -> list[str]:
+    # Iterating over the names doesn't load lazy children
+    if path_filter is None:
+        return list(sdf.children)
+    return [name for name in sdf.children if path_filter.may_contain(label / name)]
+
+
+def _recode(
+    sparse_years: SparseYearsInput, registry: Registry, memo: dict[int, pd.DataFrame]
+) -> SparseYearsInput:
+    """The input in the codes of `registry`, which has all the labels of the input's
+    own one. Frames shared by several inputs are translated once: `memo` holds the
+    translations by the ids of the frames.
+    """
+    if sparse_years.registry.same_labels(registry):
+        return dataclasses.replace(sparse_years, registry=registry)
+
+    recoding = Recoding.between(sparse_years.registry, registry)
+
+    def recoded(df: pd.DataFrame, recode: Callable[[pd.DataFrame], pd.DataFrame]):
+        if id(df) not in memo:
+            memo[id(df)] = recode(df)
+        return memo[id(df)]
+
+    return dataclasses.replace(
+        sparse_years,
+        intensities=recoded(sparse_years.intensities, recoding.recode_intensities),
+        targets=recoded(sparse_years.targets, recoding.recode_techs),
+        indicators=recoded(sparse_years.indicators, recoding.recode_indicators),
+        tech_metadata=recoded(sparse_years.tech_metadata, recoding.recode_techs),
+        registry=registry,
+    )
+
+
+def _with_labels_of(
+    sdf: StandardDataFormat,
+    sparse_years: SparseYearsInput,
+    label: Path,
+    path_filter: PathFilter | None = None,
+    recursive: bool = True,
+) -> SparseYearsInput:
+    """The input in the codes of a registry extended with the labels of `sdf` (and
+    its selected descendants, if `recursive`).
+    """
+    registry = Registry.merge(
+        [
+            sparse_years.registry,
+            Registry.from_sdf(sdf, path_filter, label, recursive=recursive),
+        ]
+    )
+    return _recode(sparse_years, registry, {})
+
+
+def _flatten_subtree(
+    task: tuple[StandardDataFormat, SparseYearsInput, Path],
+    path_filter: PathFilter | None = None,
+    collect_labels: bool = False,
+) -> tuple[list[FlattenedLeaf], Registry]:
+    sdf, sparse_years, label = task
+    if collect_labels:
+        # The subtree's labels are collected by the worker reading its nodes
+        sparse_years = _with_labels_of(sdf, sparse_years, label, path_filter)
+    return list(_dfs(sdf, sparse_years, label, {}, path_filter)), sparse_years.registry
+
+
+def _merge_subtrees(
+    subtrees: list[tuple[list[FlattenedLeaf], Registry]]
+) -> list[FlattenedLeaf]:
+    """Leaves of the subtrees, all in the codes of the merged registries."""
+    if not subtrees:
+        return []
+    registry = Registry.merge([subtree_registry for _, subtree_registry in subtrees])
+    leaves = []
+    for subtree_leaves, _ in subtrees:
+        memo: dict[int, pd.DataFrame] = {}
+        leaves += [
+            (label, _recode(sparse_years, registry, memo), mismatched_resources)
+            for label, sparse_years, mismatched_resources in subtree_leaves
+        ]
+    return leaves
+
+
+def _split_into_subtrees(
+    root_sdf: StandardDataFormat,
+    initial: SparseYearsInput,
+    min_subtrees: int,
+    path_filter: PathFilter | None = None,
+    collect_labels: bool = False,
+) -> list[tuple[StandardDataFormat, SparseYearsInput, Path]]:
+    """Split the hierarchy into independent subtrees, starting with the top-level ones
+    (e.g. continents). Subtrees are split further, level by level, until there are
+    at least `min_subtrees` of them. Each subtree comes with the inputs overlaid
+    by its ancestors. The order of subtrees follows the depth-first order of leaves.
+    With `collect_labels`, the registry of the inputs is extended with the labels of
+    each ancestor overlaid.
+    """
+    subtrees = [(root_sdf, initial, Path(root_sdf.name))]
+    while len(subtrees) < min_subtrees and any(sdf.children for sdf, *_ in subtrees):
+        split = []
+        for sdf, sparse_years, label in subtrees:
+            if sdf.children:
+                if collect_labels:
+                    sparse_years = _with_labels_of(
+                        sdf, sparse_years, label, recursive=False
+                    )
+                overlaid = _overlay_node(sdf, sparse_years, label)
+                split += [
+                    (sdf.children[name], overlaid, label / name)
+                    for name in _selected_children(sdf, label, path_filter)
+                ]
+            else:
+                split.append((sdf, sparse_years, label))
+        subtrees = split
+    return subtrees
+
+
 def flatten_hierarchy(
     root_sdf: StandardDataFormat,
+    pool: Pool | None = None,
+    task_usage: list[TaskUsage] | None = None,
+    path_filter: PathFilter | None = None,
+    registry: Registry | None = None,
 ) -> list[tuple[Path, SparseYearsInput]]:
-    def dfs(
-        sdf: StandardDataFormat, sparse_years: SparseYearsInput, label: Path
-    ) -> Iterator[tuple[Path, SparseYearsInput, set[str]]]:
-        if not (
-            sdf.base_indicators.empty
-            or sparse_years.indicators.empty
-            or list(sparse_years.indicators.columns)
-            == list(sdf.base_indicators.columns)
-        ):
-            raise ValueError(
-                f"{label}: Indicators' names on each level have to be the same!"
-            )
-
-        overlaid = sparse_years.copy()
-        overlaid.intensities = overlay_in_order(
-            overlaid.intensities, sdf.base_intensities, sdf.intensities_yearly
-        )
-        overlaid.indicators = overlay_in_order(
-            overlaid.indicators, sdf.base_indicators, sdf.indicators_yearly
-        )
-        if overlaid.tech_metadata.empty:
-            overlaid.tech_metadata = sdf.tech_metadata
-        else:
-            overlaid.tech_metadata = (
-                pd.concat([overlaid.tech_metadata, sdf.tech_metadata])
-                .groupby(level=(0, 1))
-                .last()
-            )
-
-        # Go down in the hierarchy
-        for name, directory in sdf.children.items():
-            yield from dfs(directory, overlaid, label / name)
-
-        # Yield only leaves with targets
-        if not sdf.children and sdf.targets is not None:
-            overlaid.targets = sdf.targets
-            # Trim tech_meta to the techs specified in targets
-            overlaid.tech_metadata = overlaid.tech_metadata.reindex(
-                overlaid.targets.index
-            )
+    """Flatten the SDF hierarchy into leaves' inputs with all the ancestors'
+    intensities and indicators overlaid. Techs, resources and indicators of the inputs
+    are the codes of the `registry`.
 
-            mismatched_resources = overlaid.validate()
-            yield label, overlaid, mismatched_resources
+    Args:
+        root_sdf (StandardDataFormat): SDF to flatten
+        pool (Pool | None, optional): When given, independent subtrees are flattened
+            in the pool's workers. Defaults to None.
+        task_usage (list[TaskUsage] | None, optional): When given, resource usage of
+            flattening each subtree in the pool is appended to it. Defaults to None.
+        path_filter (PathFilter | None, optional): Flatten only the leaves it selects.
+            Other subtrees aren't visited at all, so lazily loaded ones are never read.
+            Defaults to None.
+        registry (Registry | None, optional): Codes of the SDF's labels. Defaults to
+            None - a registry created while flattening. With a pool, each worker
+            collects the labels of the subtree it reads, and the leaves are translated
+            to the codes of the merged registry at the end. Nodes of a lazily loaded
+            SDF are then read only by the workers.
 
+    Returns:
+        list[tuple[Path, SparseYearsInput]]: Leaves' paths and their inputs, in the
+            depth-first order. All of them share a registry.
+    """
+    collect_labels = registry is None and pool is not None
+    if registry is None and pool is None:
+        registry = Registry.from_sdf(root_sdf, path_filter)
     initial = SparseYearsInput(
         intensities=pd.DataFrame(),
         targets=pd.DataFrame(),
         indicators=pd.DataFrame(),
         tech_metadata=pd.DataFrame(),
+        # Without any labels, when they're collected by the workers
+        registry=registry or Registry.merge([]),
     )
 
+    root_label = Path(root_sdf.name)
+    if path_filter is not None and not path_filter.may_contain(root_label):
+        leaves = []
+    elif pool is None:
+        leaves = list(_dfs(root_sdf, initial, root_label, {}, path_filter))
+    else:
+        subtrees = _split_into_subtrees(
+            root_sdf, initial, 4 * cpu_count(), path_filter, collect_labels
+        )
+        flatten = partial(
+            _flatten_subtree, path_filter=path_filter, collect_labels=collect_labels
+        )
+        measured = pool.map(partial(run_measured, flatten), subtrees, chunksize=1)
+        leaves = _merge_subtrees([subtree for subtree, _ in measured])
+        if task_usage is not None:
+            task_usage += [usage for _, usage in measured]
+
     flattened = []
     all_mismatched_resources: dict[tuple[str, ...], list[Path]] = defaultdict(list)
-    for label, sparse_years, mismatched_resources in dfs(
-        root_sdf, initial, Path(root_sdf.name)
-    ):
+    for label, sparse_years, mismatched_resources in leaves:
         flattened.append((label, sparse_years))
         if mismatched_resources:
             all_mismatched_resources[tuple(sorted(mismatched_resources))].append(label)
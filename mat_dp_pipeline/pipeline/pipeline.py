@@ -1,16 +1,30 @@
+import dataclasses
+import pickle
+import time
 from collections import defaultdict
+from contextlib import nullcontext
 from dataclasses import dataclass
 from multiprocessing import Pool, cpu_count
 from pathlib import Path
-from typing import Iterator, overload
+from typing import ContextManager, Iterator, overload
 
 import pandas as pd
 
-from mat_dp_pipeline.pipeline.calculation import ProcessedOutput, calculate
+from mat_dp_pipeline.pipeline.calculation import (
+    LabelsMemo,
+    ProcessedOutput,
+    calculate,
+    label_output,
+)
 from mat_dp_pipeline.pipeline.common import ProcessableInput, SparseYearsInput
 from mat_dp_pipeline.pipeline.flatten_hierarchy import flatten_hierarchy
-from mat_dp_pipeline.pipeline.sparse_to_processable_input import to_processable_input
-from mat_dp_pipeline.sdf import SDFMetadata, StandardDataFormat, Year
+from mat_dp_pipeline.pipeline.profiling import ProfilingReport, TaskUsage, run_measured
+from mat_dp_pipeline.pipeline.registry import Registry
+from mat_dp_pipeline.pipeline.sparse_to_processable_input import (
+    InterpolationCache,
+    to_processable_input,
+)
+from mat_dp_pipeline.sdf import PathFilter, SDFMetadata, StandardDataFormat, Year
 
 
 @dataclass(frozen=True)
@@ -29,6 +43,7 @@ class PipelineOutput:
     _tech_metadata: pd.DataFrame
 
     metadata: SDFMetadata
+    profile: ProfilingReport | None
 
     def __init__(
         self,
@@ -40,6 +55,7 @@ class PipelineOutput:
         self._by_path = defaultdict(dict)
         self._tech_metadata = tech_metadata
         self.metadata = metadata
+        self.profile = None
 
         if data:
             # We know from the computation that each LabelledOutput has the same set of indicators
@@ -132,8 +148,11 @@ class PipelineOutput:
 def _to_labelled_output(
     full_inpt: tuple[Path, Year, ProcessableInput]
 ) -> LabelledOutput:
+    """Output of the input, in the codes of its frames. They're labelled in the main
+    process (see `_with_labels`), so the registry isn't sent with every input.
+    """
     path, year, inpt = full_inpt
-    result = calculate(inpt)
+    result = calculate(inpt, labelled=False)
     return LabelledOutput(
         required_resources=result.required_resources,
         emissions=result.emissions,
@@ -142,30 +161,134 @@ def _to_labelled_output(
     )
 
 
-def pipeline(sdf: StandardDataFormat) -> PipelineOutput:
+def _with_labels(
+    output: LabelledOutput, registry: Registry | None, memo: LabelsMemo
+) -> LabelledOutput:
+    labelled = label_output(output, registry, memo)
+    return LabelledOutput(
+        required_resources=labelled.required_resources,
+        emissions=labelled.emissions,
+        year=output.year,
+        path=output.path,
+    )
+
+
+def _to_measured_labelled_output(
+    full_inpt: tuple[Path, Year, ProcessableInput]
+) -> tuple[bytes, TaskUsage, float]:
+    """`_to_labelled_output` with the resource usage measured. The output is pickled
+    here, so that the time of its transfer to the main process can be measured too.
+    """
+    output, usage = run_measured(_to_labelled_output, full_inpt)
+    start = time.perf_counter()
+    pickled = pickle.dumps(output, protocol=pickle.HIGHEST_PROTOCOL)
+    return pickled, usage, time.perf_counter() - start
+
+
+def _interpolate(
+    path: Path, sparse_years: SparseYearsInput, cache: InterpolationCache
+) -> list[tuple[Path, Year, ProcessableInput]]:
+    return list(to_processable_input(path, sparse_years, cache))
+
+
+def pipeline(
+    sdf: StandardDataFormat,
+    profile: bool | ProfilingReport = False,
+    paths: list[str] | PathFilter | None = None,
+) -> PipelineOutput:
     """Converts the input data to the PipelineOutput format.
 
+    Args:
+        sdf (StandardDataFormat): Input data
+        profile (bool | ProfilingReport, optional): Whether to profile the pipeline stages.
+            If a ProfilingReport is given, the stages are recorded in it (e.g. after
+            the SDF load recorded by the caller). The report is available as
+            `PipelineOutput.profile`. Defaults to False.
+        paths (list[str] | PathFilter | None, optional): Globs of the leaves to compute
+            (e.g. ["/Europe/**"]), or a PathFilter for excluding some too. The other
+            subtrees are skipped altogether. Defaults to None - all the leaves.
+
     Returns:
         PipelineOutput: The fully converted output of the pipeline
     """
+    report = ProfilingReport() if profile is True else profile or None
+    path_filter = paths if isinstance(paths, PathFilter) else PathFilter.create(paths)
 
-    def _make_iterator(
-        flattened: list[tuple[Path, SparseYearsInput]]
-    ) -> Iterator[tuple[Path, Year, ProcessableInput]]:
-        for path, sparse_years in flattened:
-            for path, year, inpt in to_processable_input(path, sparse_years):
-                yield (path, year, inpt)
+    def stage(name: str) -> ContextManager[list[TaskUsage]]:
+        return report.stage(name) if report else nullcontext([])
 
-    flattened = flatten_hierarchy(sdf)
     with Pool(cpu_count()) as p:
-        processed = p.map(_to_labelled_output, _make_iterator(flattened))
-
-    tech_metadata = pd.DataFrame()
-    for _, sparse_years in flattened:
-        tech_metadata = (
-            pd.concat([sparse_years.tech_metadata, tech_metadata])
-            .groupby(level=(0, 1))
-            .last()
+        with stage("flatten_hierarchy") as tasks:
+            # The workers collect the codes of the subtrees they flatten
+            flattened = flatten_hierarchy(
+                sdf,
+                pool=p,
+                task_usage=tasks if report else None,
+                path_filter=path_filter,
+            )
+
+        with stage("interpolation"):
+            # Leaves inheriting identical inputs are interpolated only once
+            cache: InterpolationCache = {}
+            inputs: list[tuple[Path, Year, ProcessableInput]] = []
+            for path, sparse_years in flattened:
+                if report:
+                    leaf_inputs, usage = run_measured(
+                        _interpolate, path, sparse_years, cache
+                    )
+                    report.add_leaf(path, None, "interpolation", usage)
+                else:
+                    leaf_inputs = _interpolate(path, sparse_years, cache)
+                inputs += leaf_inputs
+            # All the inputs share the registry of the flattened leaves. Only their
+            # coded frames are sent to the workers.
+            registry = inputs[0][2].registry if inputs else None
+            coded_inputs = [
+                (path, year, dataclasses.replace(inpt, registry=None))
+                for path, year, inpt in inputs
+            ]
+
+        if report:
+            with stage("calculate") as tasks:
+                measured = p.map(_to_measured_labelled_output, coded_inputs)
+                tasks += [usage for _, usage, _ in measured]
+            with stage("result_transfer"):
+                processed = []
+                for (path, year, _), (pickled, usage, dump_time) in zip(
+                    inputs, measured
+                ):
+                    report.add_leaf(path, year, "calculate", usage)
+                    output, load_usage = run_measured(pickle.loads, pickled)
+                    transfer_usage = dataclasses.replace(
+                        load_usage, wall_time=load_usage.wall_time + dump_time
+                    )
+                    report.add_leaf(path, year, "result_transfer", transfer_usage)
+                    processed.append(output)
+        else:
+            processed = p.map(_to_labelled_output, coded_inputs)
+
+    with stage("output_assembly"):
+        # Outputs of the same techs (e.g. the years of a leaf) share their labels
+        labels_memo: LabelsMemo = {}
+        processed = [
+            _with_labels(output, registry, labels_memo) for output in processed
+        ]
+        # Deduplicated leaves share their tech metadata frames, so merge each one once.
+        # The first leaf defining a value wins, as the frames are merged in reverse.
+        distinct_tech_metadata = list(
+            {id(s.tech_metadata): s.tech_metadata for _, s in flattened}.values()
+        )
+        if distinct_tech_metadata:
+            registry = flattened[0][1].registry
+            tech_metadata = registry.decode_techs(
+                pd.concat(distinct_tech_metadata[::-1]).groupby(level=0).last()
+            )
+        else:
+            tech_metadata = pd.DataFrame()
+
+        output = PipelineOutput(
+            processed, tech_metadata=tech_metadata, metadata=sdf.metadata
         )
 
-    return PipelineOutput(processed, tech_metadata=tech_metadata, metadata=sdf.metadata)
+    output.profile = report
+    return output
@@ -0,0 +1,259 @@
+import gc
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator, TypeVar
+
+import pandas as pd
+
+from mat_dp_pipeline.sdf import Year
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+T = TypeVar("T")
+
+
+def peak_rss() -> int:
+    """Peak resident set size of the current process in bytes (0 if unknown)."""
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS - bytes
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+@dataclass(frozen=True)
+class TaskUsage:
+    """Resources used by a single task, usually run by a worker of a process pool.
+
+    Attributes:
+        pid (int): Process which ran the task
+        start (float): Start time, in seconds since the epoch
+        wall_time (float): Wall time in seconds
+        cpu_time (float): CPU time in seconds
+        peak_rss (int): Peak RSS of the process (so far) in bytes
+    """
+
+    pid: int
+    start: float
+    wall_time: float
+    cpu_time: float
+    peak_rss: int
+
+
+def run_measured(fn: Callable[..., T], *args) -> tuple[T, TaskUsage]:
+    """Run `fn(*args)` and measure its resource usage."""
+    start = time.time()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    result = fn(*args)
+    usage = TaskUsage(
+        pid=os.getpid(),
+        start=start,
+        wall_time=time.perf_counter() - wall_start,
+        cpu_time=time.process_time() - cpu_start,
+        peak_rss=peak_rss(),
+    )
+    return result, usage
+
+
+@dataclass(frozen=True)
+class StageProfile:
+    """Profile of a single pipeline stage.
+
+    Attributes:
+        name (str): Name of the stage
+        start (float): Start time, in seconds since the epoch
+        wall_time (float): Wall time in seconds
+        cpu_time (float): CPU time of the main process in seconds
+        peak_rss (int): Peak RSS of the main process at the end of the stage, in bytes
+        objects (int): Number of objects tracked by the garbage collector at the end of the stage
+        tasks (list[TaskUsage]): Tasks run by the workers during the stage
+    """
+
+    name: str
+    start: float
+    wall_time: float
+    cpu_time: float
+    peak_rss: int
+    objects: int
+    tasks: list[TaskUsage] = field(default_factory=list)
+
+    @property
+    def workers_cpu_time(self) -> float:
+        return sum(t.cpu_time for t in self.tasks)
+
+    @property
+    def workers_peak_rss(self) -> int:
+        return max((t.peak_rss for t in self.tasks), default=0)
+
+
+@dataclass(frozen=True)
+class LeafTiming:
+    """Time spent on a single leaf of the SDF in one of the stages.
+
+    Attributes:
+        path (Path): Path of the leaf
+        year (Year | None): Year of the processed input, None if it covers all the years
+        stage (str): Name of the stage
+        usage (TaskUsage): Resources used
+    """
+
+    path: Path
+    year: Year | None
+    stage: str
+    usage: TaskUsage
+
+
+class ProfilingReport:
+    """Wall time, CPU time, peak RSS and object counts of the pipeline stages, together
+    with the timings of individual leaves.
+
+    Stages are recorded with the `stage` context manager, in order. Besides the
+    structured data, the report can be exported to the Chrome trace event format,
+    which can be opened in chrome://tracing, Perfetto or speedscope.
+    """
+
+    stages: list[StageProfile]
+    leaves: list[LeafTiming]
+
+    def __init__(self):
+        self.stages = []
+        self.leaves = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[list[TaskUsage]]:
+        """Record a stage. Yields a list, to which the usage of tasks run by
+        the workers during the stage can be appended.
+        """
+        tasks: list[TaskUsage] = []
+        start = time.time()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        yield tasks
+        self.stages.append(
+            StageProfile(
+                name=name,
+                start=start,
+                wall_time=time.perf_counter() - wall_start,
+                cpu_time=time.process_time() - cpu_start,
+                peak_rss=peak_rss(),
+                objects=len(gc.get_objects()),
+                tasks=tasks,
+            )
+        )
+
+    def add_leaf(
+        self, path: Path, year: Year | None, stage: str, usage: TaskUsage
+    ) -> None:
+        self.leaves.append(LeafTiming(path=path, year=year, stage=stage, usage=usage))
+
+    def summary(self) -> pd.DataFrame:
+        """Stages' profiles as a frame (one row per stage). Times in seconds, memory in MiB."""
+        return pd.DataFrame.from_records(
+            [
+                {
+                    "Stage": s.name,
+                    "Wall time": s.wall_time,
+                    "CPU time": s.cpu_time,
+                    "Workers' CPU time": s.workers_cpu_time,
+                    "Peak RSS": s.peak_rss / 2**20,
+                    "Workers' peak RSS": s.workers_peak_rss / 2**20,
+                    "Objects": s.objects,
+                }
+                for s in self.stages
+            ],
+            columns=[
+                "Stage",
+                "Wall time",
+                "CPU time",
+                "Workers' CPU time",
+                "Peak RSS",
+                "Workers' peak RSS",
+                "Objects",
+            ],
+        ).set_index("Stage")
+
+    def leaf_timings(self) -> pd.DataFrame:
+        """Wall time spent on each leaf in each stage: Path x Stage.
+        Use `.describe()` on it to get the distributions.
+        """
+        records = [
+            {"Path": str(t.path), "Stage": t.stage, "Wall time": t.usage.wall_time}
+            for t in self.leaves
+        ]
+        df = pd.DataFrame.from_records(records, columns=["Path", "Stage", "Wall time"])
+        return df.pivot_table(
+            index="Path", columns="Stage", values="Wall time", aggfunc="sum"
+        )
+
+    def slowest_leaves(self, n: int = 10) -> pd.DataFrame:
+        timings = self.leaf_timings()
+        return timings.loc[timings.sum(axis=1).nlargest(n).index]
+
+    def to_chrome_trace(self) -> dict[str, Any]:
+        """Convert the report to the Chrome trace event format."""
+        origin = min((s.start for s in self.stages), default=0.0)
+        main_pid = os.getpid()
+
+        def micros(seconds: float) -> float:
+            return round(seconds * 1e6, 3)
+
+        def complete(name: str, category: str, usage: TaskUsage, args: dict):
+            return {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": micros(usage.start - origin),
+                "dur": micros(usage.wall_time),
+                "pid": usage.pid,
+                "tid": usage.pid,
+                "args": args,
+            }
+
+        events = []
+        for s in self.stages:
+            stage_usage = TaskUsage(
+                main_pid, s.start, s.wall_time, s.cpu_time, s.peak_rss
+            )
+            events.append(
+                complete(
+                    s.name,
+                    "stage",
+                    stage_usage,
+                    {"cpu_time": s.cpu_time, "objects": s.objects},
+                )
+            )
+            events.append(
+                {
+                    "name": "Peak RSS",
+                    "ph": "C",
+                    "ts": micros(s.start + s.wall_time - origin),
+                    "pid": main_pid,
+                    "args": {"MiB": s.peak_rss / 2**20},
+                }
+            )
+            for task in s.tasks:
+                events.append(
+                    complete(s.name, "task", task, {"cpu_time": task.cpu_time})
+                )
+        for leaf in self.leaves:
+            name = str(leaf.path) if leaf.year is None else f"{leaf.path} {leaf.year}"
+            events.append(
+                complete(
+                    name, leaf.stage, leaf.usage, {"cpu_time": leaf.usage.cpu_time}
+                )
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, path: Path | str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome_trace(), f)
+
+    def __str__(self) -> str:
+        return self.summary().to_string(float_format=lambda x: f"{x:.3f}")
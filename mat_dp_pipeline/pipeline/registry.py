@@ -0,0 +1,234 @@
+"""Integer codes of the techs, resources and indicators of an SDF.
+
+Flattening, interpolation and calculation align the frames of many leaves on the same
+techs and resources over and over. Within the pipeline, the frames are indexed by the
+codes of a Registry instead of the labels: integers which are cheap to hash, compare
+and sort. The codes are the positions of the labels in the sorted registry, so frames
+sorted by the codes are sorted by the labels too. Labels are attached back to the
+outputs of the calculation.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mat_dp_pipeline.sdf import PathFilter, StandardDataFormat
+
+TECH_NAMES = ["Category", "Specific"]
+
+
+def _sorted_union(indexes: list[pd.Index], empty: pd.Index) -> pd.Index:
+    indexes = [index for index in indexes if len(index)]
+    if not indexes:
+        return empty
+    return indexes[0].append(indexes[1:]).unique().sort_values()
+
+
+def _is_placeholder(df: pd.DataFrame) -> bool:
+    """Whether it's the `pd.DataFrame()` standing in for a missing frame."""
+    return df.index.empty and df.columns.empty
+
+
+@dataclass(frozen=True, eq=False)
+class Registry:
+    """Sorted labels of everything the pipeline aligns on. A label's code is its
+    position.
+
+    Attributes:
+        techs (pd.MultiIndex): (Category, Specific) of the techs
+        resources (pd.Index): Resources
+        indicators (pd.Index): Indicators
+    """
+
+    techs: pd.MultiIndex
+    resources: pd.Index
+    indicators: pd.Index
+
+    @classmethod
+    def from_sdf(
+        cls,
+        sdf: StandardDataFormat,
+        path_filter: PathFilter | None = None,
+        label: Path | None = None,
+        recursive: bool = True,
+    ) -> "Registry":
+        """Registry of the labels found in the SDF, in a single traversal.
+
+        Args:
+            sdf (StandardDataFormat): Root of the SDF, or of its subtree
+            path_filter (PathFilter | None, optional): Skip the subtrees without any
+                leaf it selects. Defaults to None.
+            label (Path | None, optional): Path of `sdf` in the whole SDF, which the
+                `path_filter` is matched against. Defaults to None - the root.
+            recursive (bool, optional): Whether to include the labels of the
+                descendants, or of `sdf` only. Defaults to True.
+        """
+        techs: list[pd.Index] = []
+        resources: list[pd.Index] = []
+        indicators: list[pd.Index] = []
+
+        def visit(node: StandardDataFormat, label: Path) -> None:
+            for df in [node.base_intensities, *node.intensities_yearly.values()]:
+                techs.append(df.index)
+                resources.append(df.columns)
+            for df in [node.base_indicators, *node.indicators_yearly.values()]:
+                resources.append(df.index)
+                indicators.append(df.columns)
+            techs.append(node.tech_metadata.index)
+            if node.targets is not None:
+                techs.append(node.targets.index)
+            if not recursive:
+                return
+            # Iterating over the names doesn't load lazy children
+            for name in node.children:
+                if path_filter is None or path_filter.may_contain(label / name):
+                    visit(node.children[name], label / name)
+
+        visit(sdf, label or Path(sdf.name))
+        return cls(
+            techs=_sorted_union(
+                techs, pd.MultiIndex.from_tuples([], names=TECH_NAMES)
+            ).set_names(TECH_NAMES),
+            resources=_sorted_union(resources, pd.Index([])).rename("Resource"),
+            indicators=_sorted_union(indicators, pd.Index([])).rename("Indicator"),
+        )
+
+    @classmethod
+    def merge(cls, registries: list["Registry"]) -> "Registry":
+        """Registry of the labels of all the `registries`, e.g. of the subtrees
+        flattened separately.
+        """
+        if len(registries) == 1:
+            return registries[0]
+        return cls(
+            techs=_sorted_union(
+                [r.techs for r in registries],
+                pd.MultiIndex.from_tuples([], names=TECH_NAMES),
+            ).set_names(TECH_NAMES),
+            resources=_sorted_union(
+                [r.resources for r in registries], pd.Index([])
+            ).rename("Resource"),
+            indicators=_sorted_union(
+                [r.indicators for r in registries], pd.Index([])
+            ).rename("Indicator"),
+        )
+
+    def same_labels(self, other: "Registry") -> bool:
+        return (
+            self is other
+            or self.techs.equals(other.techs)
+            and self.resources.equals(other.resources)
+            and self.indicators.equals(other.indicators)
+        )
+
+    @staticmethod
+    def _codes(registered: pd.Index, labels: pd.Index, name: str) -> pd.Index:
+        codes = registered.get_indexer(labels)
+        if (codes < 0).any():
+            raise ValueError(
+                f"{name}s missing from the registry: {list(labels[codes < 0])}!"
+            )
+        return pd.Index(codes, name=name)
+
+    def tech_codes(self, labels: pd.Index) -> pd.Index:
+        return self._codes(self.techs, labels, "Tech")
+
+    def resource_codes(self, labels: pd.Index) -> pd.Index:
+        return self._codes(self.resources, labels, "Resource")
+
+    def indicator_codes(self, labels: pd.Index) -> pd.Index:
+        return self._codes(self.indicators, labels, "Indicator")
+
+    def tech_labels(self, codes: pd.Index | np.ndarray) -> pd.MultiIndex:
+        return self.techs[np.asarray(codes, dtype=np.intp)]
+
+    def resource_labels(self, codes: pd.Index | np.ndarray) -> pd.Index:
+        return self.resources[np.asarray(codes, dtype=np.intp)]
+
+    def indicator_labels(self, codes: pd.Index | np.ndarray) -> pd.Index:
+        return self.indicators[np.asarray(codes, dtype=np.intp)]
+
+    def encode_intensities(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Tech x Resource frame, with the codes in place of the labels."""
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(
+            self.tech_codes(df.index), axis="index", copy=False
+        ).set_axis(self.resource_codes(df.columns), axis="columns", copy=False)
+
+    def encode_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Resource x Indicator frame, with the codes in place of the labels."""
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(
+            self.resource_codes(df.index), axis="index", copy=False
+        ).set_axis(self.indicator_codes(df.columns), axis="columns", copy=False)
+
+    def encode_techs(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Frame indexed by techs (targets, tech metadata), with the codes in place of
+        the labels.
+        """
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(self.tech_codes(df.index), axis="index", copy=False)
+
+    def decode_techs(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Inverse of `encode_techs`."""
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(self.tech_labels(df.index), axis="index", copy=False)
+
+
+def _recode_axis(index: pd.Index, codes: np.ndarray) -> pd.Index:
+    if isinstance(index, pd.MultiIndex):
+        # (Year, code)
+        return index.set_levels(codes[index.levels[-1].to_numpy(np.intp)], level=-1)
+    return pd.Index(codes[index.to_numpy(np.intp)], name=index.name)
+
+
+@dataclass(frozen=True, eq=False)
+class Recoding:
+    """Translation of the codes of one registry into the codes of another one, which
+    has all of its labels. Both are sorted, so the translation keeps the order of the
+    codes, and frames sorted by them stay sorted.
+    """
+
+    techs: np.ndarray
+    resources: np.ndarray
+    indicators: np.ndarray
+
+    @classmethod
+    def between(cls, source: Registry, target: Registry) -> "Recoding":
+        return cls(
+            techs=target.tech_codes(source.techs).to_numpy(),
+            resources=target.resource_codes(source.resources).to_numpy(),
+            indicators=target.indicator_codes(source.indicators).to_numpy(),
+        )
+
+    def recode_intensities(self, df: pd.DataFrame) -> pd.DataFrame:
+        """(Year, Tech) x Resource, or Tech x Resource frame in the target codes."""
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(
+            _recode_axis(df.index, self.techs), axis="index", copy=False
+        ).set_axis(_recode_axis(df.columns, self.resources), axis="columns", copy=False)
+
+    def recode_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
+        """(Year, Resource) x Indicator, or Resource x Indicator frame in the target
+        codes.
+        """
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(
+            _recode_axis(df.index, self.resources), axis="index", copy=False
+        ).set_axis(
+            _recode_axis(df.columns, self.indicators), axis="columns", copy=False
+        )
+
+    def recode_techs(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Frame indexed by techs (targets, tech metadata) in the target codes."""
+        if _is_placeholder(df):
+            return df
+        return df.set_axis(_recode_axis(df.index, self.techs), axis="index", copy=False)
@@ -1,4 +1,3 @@
-import itertools
 from pathlib import Path
 from typing import Iterator
 
@@ -9,129 +8,170 @@ from mat_dp_pipeline.pipeline.common import ProcessableInput, SparseYearsInput
 from mat_dp_pipeline.sdf import Year
 
 
-def _interpolate_intensities(
-    df: pd.DataFrame, years: list[Year], techs: list[tuple[str, str]]
-) -> pd.DataFrame:
-    df_index_names = df.index.names  # to restore later
-
-    idx = pd.MultiIndex.from_tuples(
-        ((year, *tech) for year, tech in itertools.product(years, techs))
-    ).sort_values()
-
-    df = df.sort_index(axis=0).sort_index(axis=1).reindex(idx)
-    interpolated_array = df.unstack((1, 2)).interpolate(method="index")
-    assert isinstance(interpolated_array, pd.DataFrame)
-    interpolated_array = interpolated_array.values.flatten()
-
-    def get_permutation():
-        """Creates a permutation of indexes for conversion of `interpolated_array` to
-        the flatten format of the initial `df` array. It's a bit complicated, so... you'll
-        just have to trust me on this.
-        """
-        n_techs = len(techs)
-        n_resources = len(df.columns)
-        n_years = len(years)
-
-        x, y = np.divmod(np.arange(n_techs * n_years), n_techs)
-        n = (
-            np.remainder(np.arange(n_techs * n_resources * n_years), n_resources)
-            * n_techs
-        )
-        r = np.repeat(n_techs * n_resources * x + y, n_resources)
-        final = n + r
-        return final.astype(int)
-
-    df = pd.DataFrame(
-        interpolated_array[get_permutation()].reshape(-1, len(df.columns)),
-        index=df.index,
-        columns=df.columns,
+def _interpolate_years(values: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """Fill the gaps along the first axis (years) of `values` the way
+    `DataFrame.interpolate(method="index")` does: linearly between the known values, and
+    with the last known value after them. Gaps before the first known value are kept.
+    """
+    shape = values.shape
+    y = values.reshape(len(years), -1)
+    x = years.astype(np.float64)
+    known = ~np.isnan(y)
+    positions = np.arange(len(years))[:, None]
+    previous = np.maximum.accumulate(np.where(known, positions, -1), axis=0)
+    following = np.minimum.accumulate(
+        np.where(known, positions, len(years))[::-1], axis=0
+    )[::-1]
+
+    rows, series = np.nonzero(~known & (previous >= 0))
+    before, after = previous[rows, series], following[rows, series]
+    is_inner = after < len(years)
+    after = np.where(is_inner, after, before)
+    y0, y1 = y[before, series], y[after, series]
+    x0, x1 = x[before], x[after]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # The arithmetic of np.interp, which pandas uses
+        slope = (y1 - y0) / (x1 - x0)
+        interpolated = slope * (x[rows] - x0) + y0
+        retry = np.isnan(interpolated)
+        interpolated[retry] = (slope * (x[rows] - x1) + y1)[retry]
+        flat = np.isnan(interpolated) & (y0 == y1)
+        interpolated[flat] = y0[flat]
+
+    result = y.copy()
+    result[rows, series] = np.where(is_inner, interpolated, y0)
+    return result.reshape(shape)
+
+
+def _interpolate(
+    df: pd.DataFrame, years: list[Year], codes: np.ndarray
+) -> dict[Year, pd.DataFrame]:
+    """Interpolate the (Year, Code) x Column frame (e.g. (Year, Tech) x Resource) over
+    the `years`, for the given (sorted) codes. The initial values (year 0) are the ones
+    of the first year. Returns Code x Column frame of each year, with the columns sorted.
+    """
+    target_years = np.asarray(years)
+    row_years = df.index.get_level_values(0).to_numpy()
+    row_years = np.where(row_years == Year(0), target_years[0], row_years)
+    row_codes = df.index.get_level_values(1).to_numpy()
+
+    # Rows of other years and codes are dropped
+    year_positions = np.searchsorted(target_years, row_years)
+    code_positions = np.searchsorted(codes, row_codes)
+    rows = (
+        (year_positions < len(target_years))
+        & (code_positions < len(codes))
+        & (target_years[np.minimum(year_positions, len(target_years) - 1)] == row_years)
+        & (codes[np.minimum(code_positions, len(codes) - 1)] == row_codes)
     )
+    year_positions, code_positions = year_positions[rows], code_positions[rows]
+    cells = year_positions * len(codes) + code_positions
+    if len(np.unique(cells)) != len(cells):
+        raise ValueError(
+            f"Values of {years[0]} given both as the initial and the yearly ones!"
+        )
 
-    # index names were lost, restoring it
-    df.index.names = df_index_names
-    return df
-
-
-def _interpolate_indicators(
-    df: pd.DataFrame, years: list[Year], resources: list[str]
-) -> pd.DataFrame:
-    df_index_names = df.index.names  # to restore later
-
-    idx = pd.MultiIndex.from_product([years, resources]).sort_values()
-
-    df = df.sort_index(axis=0).sort_index(axis=1).reindex(idx)
-    interpolated_array = df.unstack().interpolate(method="index")
-    assert isinstance(interpolated_array, pd.DataFrame)
-    interpolated_array = interpolated_array.values.flatten()
-
-    def get_permutation():
-        """Creates a permutation of indexes for conversion of `interpolated_array` to
-        the flatten format of the initial `df` array. It's a bit complicated, so... you'll
-        just have to trust me on this.
-        """
+    column_order = np.argsort(df.columns.to_numpy(), kind="stable")
+    columns = df.columns[column_order]
+    values = np.full((len(target_years), len(codes), len(columns)), np.nan)
+    values[year_positions, code_positions] = df.to_numpy()[rows][:, column_order]
+    values = _interpolate_years(values, target_years)
 
-        n_resources = len(resources)
-        n_indicators = len(df.columns)
-        n_years = len(years)
+    index = pd.Index(codes, name=df.index.names[1])
+    return {
+        year: pd.DataFrame(values[i], index=index, columns=columns)
+        for i, year in enumerate(years)
+    }
 
-        x, y = np.divmod(np.arange(n_resources * n_years), n_resources)
-        n = (
-            np.remainder(np.arange(n_resources * n_indicators * n_years), n_indicators)
-            * n_resources
-        )
-        r = np.repeat(n_resources * n_indicators * x + y, n_indicators)
-        final = n + r
-        return final.astype(int)
-
-    df = pd.DataFrame(
-        interpolated_array[get_permutation()].reshape(-1, len(df.columns)),
-        index=df.index,
-        columns=df.columns,
-    )
 
-    # index names were lost, restoring it
-    df.index.names = df_index_names
-    return df
+InterpolationCache = dict[tuple, dict[Year, pd.DataFrame]]
 
 
 def to_processable_input(
-    path: Path, sparse_years_input: SparseYearsInput
+    path: Path,
+    sparse_years_input: SparseYearsInput,
+    cache: InterpolationCache | None = None,
 ) -> Iterator[tuple[Path, Year, ProcessableInput]]:
+    """Interpolate sparse input over the target years and split it into a
+    ProcessableInput per year.
+
+    Args:
+        path (Path): path of the input in the SDF
+        sparse_years_input (SparseYearsInput): flattened input
+        cache (InterpolationCache | None, optional): Interpolated frames of inputs processed
+            so far. When given, inputs with a known digest reuse intensities interpolated
+            for earlier inputs with the same digest, target techs and years, and indicators
+            interpolated for inputs with the same indicators source, resources and years.
+            Only the targets are split per input then. Defaults to None.
+    """
     intensities = sparse_years_input.intensities
     targets = sparse_years_input.targets
     indicators = sparse_years_input.indicators
 
-    intensities_years = list(intensities.index.get_level_values(0).unique())
-    indicator_years = list(indicators.index.get_level_values(0).unique())
     target_years: list[Year] = sorted(targets.columns.astype(Year).unique().to_list())
-
-    assert intensities_years[0] == Year(0), "No initial intensities provided!"
-    assert indicator_years[0] == Year(0), "No initial indicators provided!"
+    target_techs = targets.index.to_list()
     assert target_years, "No years in targets!"
 
-    intensities_techs = intensities.droplevel(0).index.to_list()
-    target_techs = targets.index.to_list()
-    indicators_resources = indicators.droplevel(0).index.to_list()
-    assert set(target_techs) <= set(
-        intensities_techs
-    ), f"Target's technologies are not a subset of intensities' techs! ({target_techs})"
+    indicators_resources = sorted(set(indicators.index.get_level_values(1)))
+    digest = sparse_years_input.digest
+    indicators_source = sparse_years_input.indicators_source
+    if cache is None:
+        cache = {}
+
+    # Without a digest, the input can't be matched with any other one
+    intensities_key = (
+        ("intensities", digest, tuple(target_techs), tuple(target_years))
+        if digest is not None
+        else None
+    )
+    # Indicators are defined rarely (usually in the root only), so they're shared between
+    # all the inputs whose indicators come from the same node. The set of resources may
+    # still differ, as it's narrowed down to the ones in the intensities.
+    if indicators_source is not None:
+        indicators_key = (
+            "indicators",
+            indicators_source,
+            tuple(indicators_resources),
+            tuple(target_years),
+        )
+    elif digest is not None:
+        indicators_key = ("indicators", digest, tuple(target_years))
+    else:
+        indicators_key = None
+
+    interpolated_intensities = cache.get(intensities_key) if intensities_key else None
+    if interpolated_intensities is None:
+        intensities_years = list(intensities.index.get_level_values(0).unique())
+        assert intensities_years[0] == Year(0), "No initial intensities provided!"
+
+        intensities_techs = intensities.index.get_level_values(1)
+        assert set(target_techs) <= set(
+            intensities_techs
+        ), f"Target's technologies are not a subset of intensities' techs! ({target_techs})"
+
+        interpolated_intensities = _interpolate(
+            intensities, target_years, np.unique(target_techs)
+        )
+        if intensities_key is not None:
+            cache[intensities_key] = interpolated_intensities
 
-    # Swap Year(0) with the first year from targets
-    first_year = Year(target_years[0])
-    intensities = intensities.rename({Year(0): first_year})
-    indicators = indicators.rename({Year(0): first_year})
+    interpolated_indicators = cache.get(indicators_key) if indicators_key else None
+    if interpolated_indicators is None:
+        indicator_years = list(indicators.index.get_level_values(0).unique())
+        assert indicator_years[0] == Year(0), "No initial indicators provided!"
 
-    intensities = _interpolate_intensities(intensities, target_years, target_techs)
-    indicators = _interpolate_indicators(indicators, target_years, indicators_resources)
+        interpolated_indicators = _interpolate(
+            indicators, target_years, np.asarray(indicators_resources)
+        )
+        if indicators_key is not None:
+            cache[indicators_key] = interpolated_indicators
 
     # ProcessableInput is for a given year, so we have to proces year by year in a loop
-    # We only consider target years, starting from the second one.
-    assert isinstance(intensities, pd.DataFrame)
-    assert isinstance(indicators, pd.DataFrame)
     for year in target_years:
         inpt = ProcessableInput(
-            intensities=intensities.loc[year, :],
+            intensities=interpolated_intensities[year],
             targets=targets.loc[:, str(year)],
-            indicators=indicators.loc[year, :],
+            indicators=interpolated_indicators[year],
+            registry=sparse_years_input.registry,
         )
         yield path, year, inpt
@@ -3,13 +3,31 @@ from mat_dp_pipeline.abstract_data_sources import (
     IntensitiesSource,
     TargetsSource,
 )
+from mat_dp_pipeline.sdf.archive import SDFArchive, load_archive, save_archive
+from mat_dp_pipeline.sdf.builder import SDFBuilder
+from mat_dp_pipeline.sdf.cache import CacheStats, SDFCache
+from mat_dp_pipeline.sdf.convert import convert_sdf
 from mat_dp_pipeline.sdf.create_sdf import create_sdf
+from mat_dp_pipeline.sdf.file_format import SDFFormat
+from mat_dp_pipeline.sdf.path_filter import PathFilter
+from mat_dp_pipeline.sdf.reader_backends import (
+    ArrowBackend,
+    CSVSchema,
+    PandasBackend,
+    ReaderBackend,
+)
 from mat_dp_pipeline.sdf.standard_data_format import (
     IndicatorsReader,
     IntensitiesReader,
+    LazyChildren,
     SDFMetadata,
     StandardDataFormat,
     TargetsReader,
     Year,
     validate_tech_units,
 )
+from mat_dp_pipeline.sdf.synthetic import (
+    SyntheticSDFSpec,
+    generate_sdf,
+    write_synthetic_sdf,
+)
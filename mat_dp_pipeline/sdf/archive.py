@@ -0,0 +1,205 @@
+"""Single-file SDF archive (`.sdfa`).
+
+The archive consists of:
+
+- magic bytes `SDFA` followed by the offset and the length of the index (uint64, little endian)
+- frames of the nodes' files, in the binary frame encoding (see `file_format`),
+  each aligned to 8 bytes
+- JSON index: the SDF metadata and, for each node path, the byte ranges of its
+  files' frames and the names of its children
+
+Frames are decoded straight from a memory map of the archive, so loading a subtree
+reads only the byte ranges of its nodes (and of its ancestors).
+"""
+
+import json
+import mmap
+import re
+import struct
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Iterator
+
+import pandas as pd
+
+from .file_format import SDFFormat, decode_frame, encode_frame
+from .path_filter import PathFilter
+from .standard_data_format import SDFMetadata, StandardDataFormat, subtree_parts
+
+ARCHIVE_SUFFIX = ".sdfa"
+
+_MAGIC = b"SDFA"
+_PREFIX = struct.Struct("<4sQQ")
+_ALIGNMENT = 8
+_FRAME_SUFFIX = SDFFormat.BINARY.suffix
+
+
+def is_archive(path: Path | str) -> bool:
+    return Path(path).suffix == ARCHIVE_SUFFIX
+
+
+def _write_frames(f: BinaryIO, sdf: StandardDataFormat) -> dict[str, list[int]]:
+    byte_ranges = {}
+    for stem, df in sdf.file_frames().items():
+        f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+        data = encode_frame(df)
+        byte_ranges[stem] = [f.tell(), len(data)]
+        f.write(data)
+    return byte_ranges
+
+
+def save_archive(sdf: StandardDataFormat, path: Path | str) -> None:
+    """Save the SDF as a single-file archive.
+
+    Args:
+        sdf (StandardDataFormat): SDF to save
+        path (Path | str): Path of the archive, conventionally with the `.sdfa` extension
+    """
+    nodes: dict[str, dict[str, Any]] = {}
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(_MAGIC, 0, 0))
+
+        def dfs(node: StandardDataFormat, node_path: PurePosixPath):
+            nodes[str(node_path)] = {
+                "files": _write_frames(f, node),
+                "children": list(node.children),
+            }
+            for name, child in node.children.items():
+                dfs(child, node_path / name)
+
+        dfs(sdf, PurePosixPath("/"))
+
+        index = json.dumps(
+            {"metadata": json.loads(sdf.metadata.json()), "nodes": nodes}
+        ).encode()
+        index_offset = f.tell()
+        f.write(index)
+        f.seek(0)
+        f.write(_PREFIX.pack(_MAGIC, index_offset, len(index)))
+
+
+class SDFArchive:
+    """Memory-mapped, read-only SDF archive. Use it as a context manager, or close it
+    after use. The loaded SDFs don't reference the archive and stay valid after that.
+    """
+
+    path: Path
+    metadata: SDFMetadata
+    _nodes: dict[str, dict[str, Any]]
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, index_offset, index_length = _PREFIX.unpack_from(self._map)
+        if magic != _MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not an SDF archive!")
+        index = json.loads(self._map[index_offset : index_offset + index_length])
+        self.metadata = SDFMetadata.parse_obj(index["metadata"])
+        self._nodes = index["nodes"]
+
+    @property
+    def nodes(self) -> list[str]:
+        """Paths of all the nodes, depth-first."""
+        return list(self._nodes)
+
+    def frames(
+        self, file_pattern: re.Pattern | None = None
+    ) -> Iterator[tuple[str, str, pd.DataFrame]]:
+        """Frames of all the nodes' files, as they're saved.
+
+        Args:
+            file_pattern (re.Pattern | None, optional): Decode only the files whose
+                names (in the binary format, e.g. "targets.sdfb") match it. Defaults
+                to None - all the files.
+
+        Yields:
+            Iterator[tuple[str, str, pd.DataFrame]]: Node path, file name without the
+                extension and the frame
+        """
+        for node_path, node in self._nodes.items():
+            for stem, (offset, _) in node["files"].items():
+                if file_pattern is None or file_pattern.match(stem + _FRAME_SUFFIX):
+                    yield node_path, stem, decode_frame(self._map, offset)
+
+    def load(
+        self,
+        subtree: Path | str | None = None,
+        path_filter: PathFilter | None = None,
+    ) -> StandardDataFormat:
+        """Load the SDF or its part.
+
+        Args:
+            subtree (Path | str | None, optional): Path of the node to load (e.g. "/Africa"),
+                together with all its descendants. Out of the other nodes, only its ancestors
+                are loaded (without their other children), so that the subtree still inherits
+                their inputs. Defaults to None - the whole SDF.
+            path_filter (PathFilter | None, optional): Load only the leaves it selects,
+                and their ancestors. Frames of other nodes are never decoded.
+                Defaults to None.
+
+        Returns:
+            StandardDataFormat: Loaded SDF
+        """
+
+        def dfs(
+            node_path: PurePosixPath, path_to_subtree: list[str]
+        ) -> StandardDataFormat | None:
+            if (node := self._nodes.get(str(node_path))) is None:
+                raise ValueError(f"{node_path} not found in {self.path}!")
+
+            child_names = path_to_subtree[:1] or node["children"]
+            if path_filter is not None:
+                child_names = [
+                    name
+                    for name in child_names
+                    if path_filter.may_contain(node_path / name)
+                ]
+            children = {
+                name: dfs(node_path / name, path_to_subtree[1:]) for name in child_names
+            }
+            children = {
+                name: child for name, child in children.items() if child is not None
+            }
+            if (
+                not children
+                and path_filter is not None
+                and not path_filter.matches(node_path)
+            ):
+                return None
+
+            is_root = node_path == PurePosixPath("/")
+            return StandardDataFormat.from_files(
+                name="/" if is_root else node_path.name,
+                files={
+                    stem: decode_frame(self._map, offset)
+                    for stem, (offset, _) in node["files"].items()
+                },
+                children=children,
+                metadata=self.metadata if is_root else SDFMetadata(),
+            )
+
+        if (root := dfs(PurePosixPath("/"), subtree_parts(subtree))) is None:
+            raise ValueError(f"{self.path}: No SDF node matches {path_filter}!")
+        return root
+
+    def close(self) -> None:
+        self._map.close()
+
+    def __enter__(self) -> "SDFArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def load_archive(
+    path: Path | str,
+    subtree: Path | str | None = None,
+    path_filter: PathFilter | None = None,
+) -> StandardDataFormat:
+    """Load the SDF (or its part, see `SDFArchive.load`) from the archive."""
+    with SDFArchive(path) as archive:
+        return archive.load(subtree, path_filter)
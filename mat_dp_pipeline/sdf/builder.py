@@ -0,0 +1,159 @@
+import re
+from collections import defaultdict
+from pathlib import Path, PurePosixPath
+from typing import Iterable
+
+import pandas as pd
+
+from .archive import SDFArchive
+from .path_filter import PathFilter
+from .reader_backends import conform_frame
+from .standard_data_format import SDFMetadata, StandardDataFormat, _reader_for
+
+_ROOT = PurePosixPath("/")
+
+
+class SDFBuilder:
+    """In-memory counterpart of an SDF directory, which the data sources emit their
+    frames into. The SDF is assembled out of them with no files written or parsed.
+
+    Frames are added in the layout of the CSV files the sources would save (with the
+    index among the columns), and are converted to the form the InputReaders return,
+    so the SDF is the same as if it was saved and loaded.
+    """
+
+    _nodes: dict[PurePosixPath, dict[str, pd.DataFrame]]
+
+    def __init__(self):
+        self._nodes = {_ROOT: {}}
+
+    def _node(self, path: Path | str) -> dict[str, pd.DataFrame]:
+        path = _ROOT / path
+        # Ancestors first, in the order the nodes are added
+        for node_path in [*reversed(path.parents), path]:
+            self._nodes.setdefault(node_path, {})
+        return self._nodes[path]
+
+    def add(self, path: Path | str, file_name: str, df: pd.DataFrame) -> None:
+        """Add the frame of the node's file. A frame added for the same file again
+        replaces the previous one.
+
+        Args:
+            path (Path | str): Path of the node, e.g. "/Europe/UK"
+            file_name (str): SDF file name, e.g. "targets.csv" or "intensities_2030.csv"
+            df (pd.DataFrame): Contents of the file, with the index among the columns
+        """
+        reader = _reader_for(file_name)
+        if reader is None:
+            raise ValueError(f"{file_name} isn't a name of an SDF file!")
+        self._node(path)[Path(file_name).stem] = conform_frame(df, reader.schema)
+
+    def add_frames(self, frames: Iterable[tuple[Path, str, pd.DataFrame]]) -> None:
+        """Add the (path, file name, frame) triples. See `add`."""
+        for path, file_name, df in frames:
+            self.add(path, file_name, df)
+
+    def merge(self, other: "SDFBuilder") -> list[str]:
+        """Add the frames of another builder. Like with `add`, they replace the frames
+        of the same files added before.
+
+        Args:
+            other (SDFBuilder): Builder to take the frames from
+
+        Returns:
+            list[str]: Files which both builders have, e.g. "/Africa/Kenya/targets"
+        """
+        conflicts = []
+        for path, files in other._nodes.items():
+            node = self._node(path)
+            conflicts += [str(path / stem) for stem in files if stem in node]
+            node.update(files)
+        return conflicts
+
+    def add_directory(
+        self,
+        directory: Path,
+        file_pattern: re.Pattern | None = None,
+        files: Iterable[Path] | None = None,
+    ) -> None:
+        """Read the SDF files of the directory tree (in any of the SDF formats) and add
+        them at the same relative paths.
+
+        Args:
+            directory (Path): Root of the directory tree
+            file_pattern (re.Pattern | None, optional): Add only the files whose names
+                match it. Defaults to None - all the SDF files.
+            files (Iterable[Path] | None, optional): Files of the tree, if they've been
+                listed already (in order). Defaults to None - the tree is walked.
+        """
+        for file in sorted(directory.rglob("*")) if files is None else files:
+            reader = _reader_for(file.name)
+            if not file.is_file() or reader is None:
+                continue
+            if file_pattern is not None and not file_pattern.match(file.name):
+                continue
+            relative = file.parent.relative_to(directory)
+            self._node(relative)[file.stem] = reader.read(file)
+
+    def add_archive(
+        self, archive: Path | str, file_pattern: re.Pattern | None = None
+    ) -> None:
+        """Add the files of a single-file SDF archive (.sdfa) at their node paths.
+
+        Args:
+            archive (Path | str): Path of the archive
+            file_pattern (re.Pattern | None, optional): Add only the files whose names
+                match it. Defaults to None - all the SDF files.
+        """
+        with SDFArchive(archive) as a:
+            for node_path, stem, df in a.frames(file_pattern):
+                self._node(node_path)[stem] = df
+
+    def build(
+        self,
+        metadata: SDFMetadata | None = None,
+        path_filter: PathFilter | None = None,
+    ) -> StandardDataFormat:
+        """Assemble (and validate) the SDF.
+
+        Args:
+            metadata (SDFMetadata | None, optional): Metadata of the root.
+                Defaults to None - the default metadata.
+            path_filter (PathFilter | None, optional): Keep only the leaves it selects,
+                and their ancestors. Defaults to None.
+
+        Returns:
+            StandardDataFormat: Assembled SDF
+        """
+        children_of: dict[PurePosixPath, list[PurePosixPath]] = defaultdict(list)
+        for path in self._nodes:
+            if path != _ROOT:
+                children_of[path.parent].append(path)
+
+        def build_node(path: PurePosixPath) -> StandardDataFormat | None:
+            children = {
+                child.name: build_node(child)
+                for child in children_of[path]
+                if path_filter is None or path_filter.may_contain(child)
+            }
+            children = {name: c for name, c in children.items() if c is not None}
+            if (
+                not children
+                and path_filter is not None
+                and not path_filter.matches(path)
+            ):
+                return None
+
+            is_root = path == _ROOT
+            return StandardDataFormat.from_files(
+                name="/" if is_root else path.name,
+                # from_frames moves columns out of the frames, so build() can be
+                # called again only on copies
+                files={s: df.copy() for s, df in self._nodes[path].items()},
+                children=children,
+                metadata=(metadata or SDFMetadata()) if is_root else SDFMetadata(),
+            )
+
+        if (root := build_node(_ROOT)) is None:
+            raise ValueError(f"No SDF node matches {path_filter}!")
+        return root
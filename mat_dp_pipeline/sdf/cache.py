@@ -0,0 +1,183 @@
+"""Cache of parsed SDF files.
+
+Every SDF file read through the cache is stored in the binary frame layout (see
+`file_format`), under a name derived from its fingerprint: the resolved path, the
+modification time, the size and (optionally) a hash of the contents. Loading an
+unchanged file again only decodes the stored frame. A changed file gets a new
+fingerprint, so it's parsed again, and its stale entry is replaced.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, ClassVar
+
+import pandas as pd
+
+from mat_dp_pipeline.common import write_atomically
+
+from .file_format import SDFFormat, decode_frame, encode_frame
+
+
+def digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    entries: int
+    size: int
+
+
+@dataclass(frozen=True)
+class FileCache:
+    """Persistent cache of the results of parsing files, shared by any number of
+    processes. Each entry is a file named after the key of the parsed file's path
+    and its state (e.g. `<path key>_<fingerprint>.sdfb`), so that the entries of a
+    file can be found by the path alone. Subclasses define the rest of the name and
+    the encoding of the entries.
+
+    Attributes:
+        directory (Path): Where the entries are stored. Created on the first write.
+        max_size (int): Size of all the entries (in bytes) above which the least
+            recently used ones are evicted. Defaults to 1 GiB.
+    """
+
+    directory: Path
+    max_size: int = 2**30
+
+    entry_suffix: ClassVar[str]
+
+    def __post_init__(self):
+        object.__setattr__(self, "directory", Path(self.directory).expanduser())
+
+    def _path_key(self, path: Path) -> str:
+        return digest(str(path.resolve()).encode())
+
+    def _entries(self, pattern: str = "*") -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return list(self.directory.glob(pattern + self.entry_suffix))
+
+    def _load(self, entry: Path, decode: Callable[[bytes], Any]) -> Any | None:
+        """Decoded entry, or None if there's no such entry."""
+        try:
+            with open(entry, "rb") as f:
+                value = decode(f.read())
+        except FileNotFoundError:
+            return None
+        # Modification time of an entry marks its last use
+        os.utime(entry)
+        return value
+
+    def _store(
+        self, path: Path, entry: Path, data: bytes, current_prefix: str | None = None
+    ) -> None:
+        """Store the `entry` of the file, replacing the file's stale entries: the ones
+        whose names don't start with `current_prefix` (by default the entry's name).
+        """
+        current_prefix = current_prefix or entry.name
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self._entries(f"{self._path_key(path)}_*"):
+            if not stale.name.startswith(current_prefix):
+                stale.unlink(missing_ok=True)
+        # Concurrent loads may store the same entry
+        write_atomically(entry, data)
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until they fit into `max_size`."""
+        entries = []
+        for entry in self._entries():
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, entry))
+
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, entry in sorted(entries):
+            if size <= self.max_size:
+                break
+            entry.unlink(missing_ok=True)
+            size -= entry_size
+
+    def invalidate(self, path: Path | str | None = None) -> None:
+        """Remove the entries of a file, or of all the files of a directory.
+
+        Args:
+            path (Path | str | None, optional): File or directory. Defaults to None -
+                the whole cache.
+        """
+        if path is None:
+            entries = self._entries()
+        else:
+            path = Path(path)
+            files = path.rglob("*") if path.is_dir() else [path]
+            keys = {self._path_key(file) for file in files}
+            entries = [e for e in self._entries() if e.name.split("_")[0] in keys]
+        for entry in entries:
+            entry.unlink(missing_ok=True)
+
+    def stats(self) -> CacheStats:
+        sizes = [entry.stat().st_size for entry in self._entries()]
+        return CacheStats(entries=len(sizes), size=sum(sizes))
+
+
+@dataclass(frozen=True)
+class SDFCache(FileCache):
+    """Persistent cache of parsed SDF files, shared by any number of loads (and
+    processes).
+
+    Attributes:
+        directory (Path): Where the entries are stored. Created on the first write.
+        max_size (int): Size of all the entries (in bytes) above which the least
+            recently used ones are evicted after each load. Defaults to 1 GiB.
+        hash_contents (bool): Add a hash of the file's contents to its fingerprint.
+            Costs a read of the file, but catches changes that keep both its size and
+            modification time. Defaults to False.
+    """
+
+    hash_contents: bool = False
+
+    entry_suffix: ClassVar[str] = SDFFormat.BINARY.suffix
+
+    @staticmethod
+    def is_cacheable(path: Path) -> bool:
+        # Binary files are as fast to read as the cache entries themselves
+        return path.suffix != SDFFormat.BINARY.suffix
+
+    def _fingerprint(self, path: Path) -> str:
+        stat = path.stat()
+        fingerprint = [str(path.resolve()), str(stat.st_mtime_ns), str(stat.st_size)]
+        if self.hash_contents:
+            fingerprint.append(digest(path.read_bytes()))
+        return digest("\0".join(fingerprint).encode())
+
+    def entry_path(self, path: Path) -> Path:
+        """Path of the cache entry of the file in its current state."""
+        return self.directory / (
+            f"{self._path_key(path)}_{self._fingerprint(path)}{self.entry_suffix}"
+        )
+
+    def get(self, path: Path) -> pd.DataFrame | None:
+        """Cached frame of the file, if it hasn't changed since it was stored."""
+        return self._load(self.entry_path(path), decode_frame)
+
+    def put(self, path: Path, df: pd.DataFrame) -> None:
+        """Store the frame parsed from the file, replacing the file's stale entries."""
+        self._store(path, self.entry_path(path), encode_frame(df))
+
+    def read(
+        self, path: Path, read_file: Callable[[Path], pd.DataFrame]
+    ) -> pd.DataFrame:
+        """Read the file through the cache: decode its entry if there's one, otherwise
+        parse it with `read_file` and store the result.
+        """
+        if not self.is_cacheable(path):
+            return read_file(path)
+        if (df := self.get(path)) is not None:
+            return df
+        df = read_file(path)
+        self.put(path, df)
+        return df
@@ -0,0 +1,63 @@
+import shutil
+from pathlib import Path
+
+from .archive import is_archive, load_archive, save_archive
+from .file_format import SDFFormat, write_frame
+from .standard_data_format import (
+    SDF_METADATA_FILE_NAME,
+    IndicatorsReader,
+    InputReader,
+    IntensitiesReader,
+    TargetsReader,
+    load,
+)
+
+
+def convert_sdf(
+    source: Path, output: Path, format: SDFFormat | str = SDFFormat.BINARY
+) -> Path:
+    """Convert the SDF to another format. The directory structure and the metadata are kept.
+
+    Between the directory layouts (CSV and binary) the SDF is converted file by file,
+    without loading it whole into memory. Single-file archives (`.sdfa`) can be
+    either the source or the output.
+
+    Args:
+        source (Path): SDF root directory, in any format, or an archive
+        output (Path): Root directory of the converted SDF, created if it doesn't exist.
+            If it has the `.sdfa` extension, an archive is created instead.
+        format (SDFFormat | str, optional): Format of the output directory.
+            Defaults to SDFFormat.BINARY.
+
+    Returns:
+        Path: `output`
+    """
+    format = SDFFormat(format)
+    if is_archive(source) or is_archive(output):
+        sdf = load_archive(source) if is_archive(source) else load(source)
+        if is_archive(output):
+            save_archive(sdf, output)
+        else:
+            sdf.save(output, format)
+        return output
+
+    readers: list[InputReader] = [
+        IntensitiesReader(),
+        IndicatorsReader(),
+        TargetsReader(),
+    ]
+
+    output.mkdir(parents=True, exist_ok=True)
+    for path in sorted(source.rglob("*")):
+        output_path = output / path.relative_to(source)
+        if path.is_dir():
+            output_path.mkdir(exist_ok=True)
+        elif reader := next(
+            (r for r in readers if r.file_pattern.match(path.name)), None
+        ):
+            write_frame(reader.read(path), output_path, format)
+
+    metadata_file = source / SDF_METADATA_FILE_NAME
+    if metadata_file.exists():
+        shutil.copy(metadata_file, output / SDF_METADATA_FILE_NAME)
+    return output
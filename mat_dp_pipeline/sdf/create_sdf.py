@@ -1,20 +1,43 @@
-import tempfile
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import overload
+from typing import Iterable, overload
 
 import mat_dp_pipeline.abstract_data_sources as ds
 
-from .standard_data_format import (
-    SDF_METADATA_FILE_NAME,
-    SDFMetadata,
-    StandardDataFormat,
-    load,
-)
+from .archive import is_archive, load_archive
+from .builder import SDFBuilder
+from .cache import SDFCache
+from .path_filter import PathFilter
+from .reader_backends import ReaderBackend
+from .standard_data_format import SDFMetadata, StandardDataFormat, load
 
 TailLabels = list[str] | type[ds.TargetsSource] | None
 MainLabels = str | type[ds.IntensitiesSource] | type[ds.IndicatorsSource] | None
 
 
+def _emit(source: ds.BaseSource) -> SDFBuilder:
+    builder = SDFBuilder()
+    source.emit(builder)
+    return builder
+
+
+def _emit_all(
+    sources: list[ds.BaseSource], workers: int | None, processes: bool
+) -> Iterable[SDFBuilder]:
+    """Builder of each source, with the frames it emitted. The sources are independent,
+    so they're run concurrently.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(sources) < 2:
+        return map(_emit, sources)
+
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=min(workers, len(sources))) as ex:
+        return list(ex.map(_emit, sources))
+
+
 @overload
 def create_sdf(
     *,
@@ -23,6 +46,10 @@ def create_sdf(
     targets: ds.TargetsSource | list[ds.TargetsSource],
     main_label: MainLabels = None,
     tail_labels: TailLabels = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    workers: int | None = None,
+    processes: bool = True,
 ) -> StandardDataFormat:
     ...
 
@@ -33,6 +60,14 @@ def create_sdf(
     *,
     main_label: MainLabels = None,
     tail_labels: TailLabels = None,
+    subtree: Path | str | None = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    workers: int | None = None,
+    processes: bool = False,
+    lazy: bool = False,
+    cache: SDFCache | None = None,
+    backend: ReaderBackend | None = None,
 ) -> StandardDataFormat:
     ...
 
@@ -45,54 +80,79 @@ def create_sdf(
     targets: ds.TargetsSource | list[ds.TargetsSource] | None = None,
     main_label: MainLabels = None,
     tail_labels: TailLabels = None,
+    subtree: Path | str | None = None,
+    include: list[str] | None = None,
+    exclude: list[str] | None = None,
+    workers: int | None = None,
+    processes: bool | None = None,
+    lazy: bool = False,
+    cache: SDFCache | None = None,
+    backend: ReaderBackend | None = None,
 ) -> StandardDataFormat:
+    # Leaves matching any of the `include` globs (all by default), and none of the
+    # `exclude` ones, are loaded together with their ancestors. See PathFilter.
+    path_filter = PathFilter.create(include, exclude)
     if source:
-        return load(Path(source))
+        # Either an SDF directory or a single-file archive (.sdfa)
+        if is_archive(source):
+            if lazy:
+                raise ValueError("Only SDF directories can be loaded lazily!")
+            return load_archive(source, subtree, path_filter)
+        return load(
+            Path(source),
+            subtree,
+            workers=workers,
+            processes=bool(processes),
+            lazy=lazy,
+            path_filter=path_filter,
+            cache=cache,
+            backend=backend,
+        )
     else:
         assert intensities and indicators and targets
-        with tempfile.TemporaryDirectory() as tmp_dir:
-            path = Path(tmp_dir)
-
-            targets_list = targets if isinstance(targets, list) else [targets]
-            for t in targets_list:
-                t(path)
-            intensities(path)
-            indicators(path)
-
-            # We'll construct SDFMetadata and save it to the `path` location
-            # so that it can be loaded as part of the sdf load
-            metadata = SDFMetadata()
-            if main_label is not None:
-                if isinstance(main_label, str):
-                    metadata.main_label = main_label
-                elif main_label.main_label is not None:
-                    metadata.main_label = main_label.main_label
-            else:
-                if intensities.main_label is not None:
-                    metadata.main_label = intensities.main_label
-                elif indicators.main_label is not None:
-                    metadata.main_label = indicators.main_label
-
-            if tail_labels is not None:
-                metadata.tail_labels = (
-                    tail_labels
-                    if isinstance(tail_labels, list)
-                    else tail_labels.tail_labels
+        # Sources hand over their frames directly, nothing is written to disk. Each
+        # one fills a builder of its own (concurrently, in `workers` processes, or
+        # threads if not `processes`), and they're merged in the order of the
+        # sources. Parsing by pandas holds the GIL, so processes are the default.
+        targets_list = targets if isinstance(targets, list) else [targets]
+        sources = [*targets_list, intensities, indicators]
+        processes = processes is None or processes
+        builder = SDFBuilder()
+        for src, emitted in zip(sources, _emit_all(sources, workers, processes)):
+            if conflicts := builder.merge(emitted):
+                logging.warning(
+                    f"{type(src).__name__} replaced files of the sources before it: "
+                    f"{', '.join(conflicts)}"
                 )
-            elif isinstance(targets, ds.TargetsSource):
-                metadata.tail_labels = targets.tail_labels
-            elif isinstance(targets, list):
-                # Use tail labels from targets only when all are the same. Otherwise - empty list
-                tail_labels = targets[0].tail_labels
-                if all(t.tail_labels == tail_labels for t in targets):
-                    metadata.tail_labels = tail_labels
-                else:
-                    metadata.tail_labels = []
-            else:
-                assert False
 
-            metadata_file = Path(path / SDF_METADATA_FILE_NAME)
-            with open(metadata_file, "w") as f:
-                f.write(metadata.json())
+        metadata = SDFMetadata()
+        if main_label is not None:
+            if isinstance(main_label, str):
+                metadata.main_label = main_label
+            elif main_label.main_label is not None:
+                metadata.main_label = main_label.main_label
+        else:
+            if intensities.main_label is not None:
+                metadata.main_label = intensities.main_label
+            elif indicators.main_label is not None:
+                metadata.main_label = indicators.main_label
+
+        if tail_labels is not None:
+            metadata.tail_labels = (
+                tail_labels
+                if isinstance(tail_labels, list)
+                else tail_labels.tail_labels
+            )
+        elif isinstance(targets, ds.TargetsSource):
+            metadata.tail_labels = targets.tail_labels
+        elif isinstance(targets, list):
+            # Use tail labels from targets only when all are the same. Otherwise - empty list
+            tail_labels = targets[0].tail_labels
+            if all(t.tail_labels == tail_labels for t in targets):
+                metadata.tail_labels = tail_labels
+            else:
+                metadata.tail_labels = []
+        else:
+            assert False
 
-            return load(path)
+        return builder.build(metadata, path_filter)
@@ -0,0 +1,166 @@
+"""Encodings of the SDF files.
+
+Besides the CSV layout, frames can be stored in a binary, columnar layout (`.sdfb`):
+
+- magic bytes `SDFB` followed by the length of the header (uint32, little endian)
+- JSON header: number of rows, index names, dtypes and levels, column names and
+  their dtype, a float flag of each column and the values of the string columns
+- padding to a multiple of 8 bytes
+- index codes: int32, one row of codes per index level (-1 marks a missing value)
+- values of the float columns: float64, column by column
+
+Numbers are never converted to text, so loading them takes a single copy. Strings
+(tech names, units, descriptions) are few, and they're parsed as JSON.
+"""
+
+import json
+import struct
+from enum import Enum
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+_MAGIC = b"SDFB"
+_PREFIX = struct.Struct("<4sI")
+_ALIGNMENT = 8
+
+
+class SDFFormat(Enum):
+    CSV = "csv"
+    BINARY = "binary"
+
+    @property
+    def suffix(self) -> str:
+        return ".csv" if self == SDFFormat.CSV else ".sdfb"
+
+
+def _strings(values: np.ndarray, name: str) -> list[str | None]:
+    strings = [None if pd.isna(v) else v for v in values]
+    if not all(s is None or isinstance(s, str) for s in strings):
+        raise TypeError(f"{name}: Only strings can be stored in a non-float column!")
+    return strings
+
+
+def _from_strings(strings: list[str | None]) -> np.ndarray:
+    return np.array([np.nan if s is None else s for s in strings], dtype=object)
+
+
+def _index_dtypes(index: pd.Index) -> list[np.dtype]:
+    if isinstance(index, pd.MultiIndex):
+        return [level.dtype for level in index.levels]
+    return [index.dtype]
+
+
+def encode_frame(df: pd.DataFrame) -> bytes:
+    """Encode the frame in the binary layout. Columns have to be either float64 or
+    strings (with missing values), index levels - strings.
+    """
+    if isinstance(df.index, pd.MultiIndex):
+        levels = [level.to_numpy() for level in df.index.levels]
+        codes = [level_codes for level_codes in df.index.codes]
+    else:
+        level_codes, uniques = pd.factorize(df.index)
+        levels, codes = [np.asarray(uniques, dtype=object)], [level_codes]
+
+    is_float = (df.dtypes == np.float64).to_numpy()
+    header = {
+        "rows": len(df),
+        "index_names": list(df.index.names),
+        # Keeps the dtypes of empty frames, whose index has no strings to tell them
+        "index_dtypes": [str(dtype) for dtype in _index_dtypes(df.index)],
+        "levels": [_strings(level, "Index") for level in levels],
+        "columns": _strings(df.columns.to_numpy(), "Columns"),
+        "columns_dtype": str(df.columns.dtype),
+        "float_columns": is_float.tolist(),
+        "string_columns": {
+            str(j): _strings(df.iloc[:, j].to_numpy(), str(df.columns[j]))
+            for j in np.flatnonzero(~is_float)
+        },
+    }
+    header_bytes = json.dumps(header).encode()
+    padding = -(_PREFIX.size + len(header_bytes)) % _ALIGNMENT
+
+    codes_block = np.array(codes, dtype=np.int32).reshape(len(codes), len(df))
+    # Columns are contiguous, which is how pandas keeps them in memory too
+    values_block = df.loc[:, is_float].to_numpy(dtype=np.float64).T
+    return b"".join(
+        [
+            _PREFIX.pack(_MAGIC, len(header_bytes)),
+            header_bytes,
+            b"\0" * padding,
+            codes_block.tobytes(),
+            b"\0" * (-codes_block.nbytes % _ALIGNMENT),
+            np.ascontiguousarray(values_block).tobytes(),
+        ]
+    )
+
+
+def decode_frame(buffer: bytes | memoryview, offset: int = 0) -> pd.DataFrame:
+    """Decode the frame encoded by `encode_frame`, starting at `offset` of the buffer."""
+    magic, header_length = _PREFIX.unpack_from(buffer, offset)
+    if magic != _MAGIC:
+        raise ValueError("Not a binary SDF frame!")
+    start = offset + _PREFIX.size
+    header = json.loads(bytes(buffer[start : start + header_length]))
+    start += header_length
+    start += -(start - offset) % _ALIGNMENT
+
+    n_rows = header["rows"]
+    n_levels = len(header["levels"])
+    # Nothing may keep referencing the buffer, which can be a memory map
+    codes = np.frombuffer(buffer, np.int32, n_levels * n_rows, start)
+    codes = codes.reshape(n_levels, n_rows).copy()
+    start += codes.nbytes + (-codes.nbytes % _ALIGNMENT)
+
+    is_float = np.array(header["float_columns"], dtype=bool)
+    n_float = int(is_float.sum())
+    values = np.frombuffer(buffer, np.float64, n_float * n_rows, start)
+    values = values.reshape(n_float, n_rows).T.copy(order="F")
+
+    levels = [_from_strings(level) for level in header["levels"]]
+    dtypes = header.get("index_dtypes", ["object"] * n_levels)
+    if n_levels == 1:
+        # Missing values (code -1) take the NaN appended at the end
+        index = pd.Index(
+            np.append(levels[0], np.nan)[codes[0]],
+            dtype=dtypes[0],
+            name=header["index_names"][0],
+        )
+    else:
+        index = pd.MultiIndex(
+            levels=[
+                pd.Index(level, dtype=dtype) for level, dtype in zip(levels, dtypes)
+            ],
+            codes=list(codes),
+            names=header["index_names"],
+            verify_integrity=False,
+        )
+
+    columns = pd.Index(header["columns"], dtype=header.get("columns_dtype", "object"))
+    df = pd.DataFrame(values, index=index, columns=columns[is_float])
+    for j, strings in header["string_columns"].items():
+        j = int(j)
+        df.insert(j, columns[j], _from_strings(strings))
+    return df
+
+
+def write_binary(df: pd.DataFrame, path: Path | str) -> None:
+    with open(path, "wb") as f:
+        f.write(encode_frame(df))
+
+
+def read_binary(path: Path | str) -> pd.DataFrame:
+    with open(path, "rb") as f:
+        return decode_frame(f.read())
+
+
+def write_frame(df: pd.DataFrame, path: Path, format: SDFFormat) -> None:
+    """Write the frame to `path` (with the extension of the `format`)."""
+    path = path.with_suffix(format.suffix)
+    if format == SDFFormat.CSV:
+        df.to_csv(path)
+    elif format == SDFFormat.BINARY:
+        write_binary(df, path)
+    else:
+        assert False
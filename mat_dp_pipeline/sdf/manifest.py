@@ -0,0 +1,95 @@
+"""Manifest of a saved SDF directory.
+
+`StandardDataFormat.save` records the digest of every frame it writes, along with the
+size and modification time of the file. An incremental save skips the frames whose
+digest hasn't changed, as long as their files are still the ones it wrote.
+"""
+
+import hashlib
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mat_dp_pipeline.common import write_atomically
+
+MANIFEST_FILE_NAME = ".sdf_manifest.json"
+
+
+def _index_values(index: pd.Index) -> list:
+    if isinstance(index, pd.MultiIndex):
+        return [level.to_list() for level in index.levels] + [
+            codes.tolist() for codes in index.codes
+        ]
+    return index.to_list()
+
+
+def frame_digest(df: pd.DataFrame) -> str:
+    """Digest of the frame's contents: its index, columns, types and values."""
+    is_float = np.array([dtype == np.float64 for dtype in df.dtypes], dtype=bool)
+    # Strings are few (tech names, units, descriptions), numbers are hashed as
+    # they're stored
+    strings = {str(c): df[c].to_list() for c in df.columns[~is_float]}
+    layout = [
+        df.index.names,
+        _index_values(df.index),
+        df.columns.to_list(),
+        is_float.tolist(),
+        strings,
+    ]
+    floats = df if is_float.all() else df.iloc[:, np.flatnonzero(is_float)]
+
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps(layout, default=str).encode())
+    h.update(np.ascontiguousarray(floats.to_numpy(np.float64)).tobytes())
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    digest: str
+    size: int
+    mtime_ns: int
+
+    @classmethod
+    def of(cls, path: Path, digest: str) -> "ManifestEntry":
+        """Entry of the file just written from the frame with the `digest`."""
+        stat = path.stat()
+        return cls(digest=digest, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+    def is_current(self, path: Path, digest: str) -> bool:
+        """Whether the file still holds the frame with the `digest`."""
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return False
+        return (
+            self.digest == digest
+            and self.size == stat.st_size
+            and self.mtime_ns == stat.st_mtime_ns
+        )
+
+
+Manifest = dict[str, ManifestEntry]
+
+
+def read_manifest(root_dir: Path) -> Manifest:
+    """Entries keyed by the paths relative to `root_dir`. Empty if there's no
+    (readable) manifest.
+    """
+    try:
+        with open(root_dir / MANIFEST_FILE_NAME) as f:
+            return {
+                path: ManifestEntry(**entry) for path, entry in json.load(f).items()
+            }
+    except (FileNotFoundError, ValueError, TypeError):
+        return {}
+
+
+def write_manifest(root_dir: Path, manifest: Manifest) -> None:
+    write_atomically(
+        root_dir / MANIFEST_FILE_NAME,
+        json.dumps({path: asdict(entry) for path, entry in manifest.items()}),
+    )
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from pathlib import PurePath
+
+Parts = tuple[str, ...]
+
+
+def _parts(path: PurePath | str) -> Parts:
+    return tuple(p for p in PurePath(path).parts if p != "/")
+
+
+def _matches(pattern: Parts, path: Parts) -> bool:
+    """Whether the glob `pattern` matches the whole `path`."""
+    if not pattern:
+        return not path
+    if pattern[0] == "**":
+        return _matches(pattern[1:], path) or (
+            bool(path) and _matches(pattern, path[1:])
+        )
+    return (
+        bool(path)
+        and fnmatchcase(path[0], pattern[0])
+        and _matches(pattern[1:], path[1:])
+    )
+
+
+def _may_match_below(pattern: Parts, path: Parts) -> bool:
+    """Whether the glob `pattern` can match any descendant of the `path`."""
+    if not path:
+        return bool(pattern)
+    if not pattern:
+        return False
+    if pattern[0] == "**":
+        return _may_match_below(pattern[1:], path) or _may_match_below(
+            pattern, path[1:]
+        )
+    return fnmatchcase(path[0], pattern[0]) and _may_match_below(pattern[1:], path[1:])
+
+
+@dataclass(frozen=True)
+class PathFilter:
+    """Selection of SDF leaves by glob patterns of their paths, e.g. "/Europe/**/SSP2*".
+
+    Patterns are matched against whole paths, segment by segment, and are anchored at
+    the root (the leading "/" is optional). Within a segment, `*`, `?` and `[...]` work
+    like in `fnmatch`, while a `**` segment matches any number of segments. A pattern
+    matching a node matches the whole subtree of the node.
+
+    A leaf is selected when it matches any of the `include` patterns (or there are none),
+    and none of the `exclude` patterns.
+
+    Attributes:
+        include (tuple[str, ...]): Patterns of the selected paths
+        exclude (tuple[str, ...]): Patterns of the rejected paths
+    """
+
+    include: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+    @classmethod
+    def create(
+        cls, include: list[str] | None = None, exclude: list[str] | None = None
+    ) -> "PathFilter | None":
+        """Filter with the given patterns, or None if there are none."""
+        if not include and not exclude:
+            return None
+        return cls(include=tuple(include or ()), exclude=tuple(exclude or ()))
+
+    def _any_prefix_matches(self, patterns: tuple[str, ...], path: Parts) -> bool:
+        return any(
+            _matches(_parts(pattern), path[:i])
+            for pattern in patterns
+            for i in range(len(path) + 1)
+        )
+
+    def is_excluded(self, path: PurePath | str) -> bool:
+        """Whether the node and its whole subtree are rejected."""
+        return self._any_prefix_matches(self.exclude, _parts(path))
+
+    def is_included(self, path: PurePath | str) -> bool:
+        """Whether the node and its whole subtree are selected (unless excluded)."""
+        return not self.include or self._any_prefix_matches(self.include, _parts(path))
+
+    def matches(self, path: PurePath | str) -> bool:
+        """Whether the leaf is selected."""
+        return self.is_included(path) and not self.is_excluded(path)
+
+    def may_contain(self, path: PurePath | str) -> bool:
+        """Whether the node or any of its descendants can be selected. Subtrees for
+        which it's False can be skipped altogether.
+        """
+        if self.is_excluded(path):
+            return False
+        parts = _parts(path)
+        return self.is_included(path) or any(
+            _may_match_below(_parts(pattern), parts) for pattern in self.include
+        )
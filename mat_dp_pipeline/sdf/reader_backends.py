@@ -0,0 +1,175 @@
+"""Backends parsing the CSV files of the SDF.
+
+All of them return the same frames: the index columns and the metadata columns as
+strings (with missing values as NaN), every other column as float64.
+"""
+
+import csv
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas._libs.parsers import STR_NA_VALUES
+
+from mat_dp_pipeline.common import FileOrPath
+
+
+@dataclass(frozen=True)
+class CSVSchema:
+    """Layout of an SDF CSV file, known before it's read.
+
+    Attributes:
+        index_columns (tuple[str, ...]): Columns of the index (strings)
+        string_columns (tuple[str, ...]): Other string columns. The rest are floats.
+    """
+
+    index_columns: tuple[str, ...]
+    string_columns: tuple[str, ...] = ()
+
+    @property
+    def all_string_columns(self) -> tuple[str, ...]:
+        return self.index_columns + self.string_columns
+
+
+class ReaderBackend(ABC):
+    @abstractmethod
+    def read_csv(self, path: FileOrPath, schema: CSVSchema) -> pd.DataFrame:
+        ...
+
+
+class PandasBackend(ReaderBackend):
+    """Reference backend, pandas' C parser."""
+
+    def read_csv(self, path: FileOrPath, schema: CSVSchema) -> pd.DataFrame:
+        string_columns = schema.all_string_columns
+        return pd.read_csv(
+            path,
+            index_col=list(schema.index_columns),
+            dtype=defaultdict(np.float64, {c: str for c in string_columns}),
+            na_values={c: "" for c in string_columns},
+        )
+
+
+class ArrowBackend(ReaderBackend):
+    """Multi-threaded backend built on pyarrow's CSV reader (an optional dependency).
+
+    Types of all the columns are given to the reader upfront, so nothing is inferred.
+    Index columns are dictionary encoded while they're read, and the dictionaries
+    become the levels of the index with no further factorization.
+
+    Attributes:
+        use_threads (bool): Parse each file with multiple threads. Defaults to True.
+    """
+
+    use_threads: bool
+
+    def __init__(self, use_threads: bool = True):
+        try:
+            import pyarrow.csv  # noqa: F401
+        except ImportError as e:
+            raise ImportError(
+                "ArrowBackend requires pyarrow. Install it with `pip install pyarrow`."
+            ) from e
+        self.use_threads = use_threads
+
+    @staticmethod
+    def _strings(values: np.ndarray) -> np.ndarray:
+        values = values.astype(object)
+        values[pd.isna(values)] = np.nan
+        return values
+
+    def read_csv(self, path: FileOrPath, schema: CSVSchema) -> pd.DataFrame:
+        if not isinstance(path, (str, Path)):
+            # Column types come from the header, which can't be peeked at in a stream
+            return PandasBackend().read_csv(path, schema)
+
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+
+        with open(path, newline="") as f:
+            header = next(csv.reader(f))
+        string_columns = set(schema.all_string_columns)
+        column_types = {
+            c: pa.dictionary(pa.int32(), pa.string())
+            if c in schema.index_columns
+            else pa.string()
+            if c in string_columns
+            else pa.float64()
+            for c in header
+        }
+        table = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(use_threads=self.use_threads),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=column_types,
+                null_values=sorted(STR_NA_VALUES),
+                strings_can_be_null=True,
+            ),
+        )
+
+        # Chunks parsed by different threads have their own dictionaries
+        table = table.unify_dictionaries()
+        levels, codes = [], []
+        for name in schema.index_columns:
+            column = table.column(name).combine_chunks()
+            levels.append(
+                self._strings(column.dictionary.to_numpy(zero_copy_only=False))
+            )
+            codes.append(column.indices.fill_null(-1).to_numpy())
+        if len(levels) == 1:
+            # Missing values (code -1) take the NaN appended at the end
+            index = pd.Index(
+                np.append(levels[0], np.nan)[codes[0]], name=schema.index_columns[0]
+            )
+        else:
+            index = pd.MultiIndex(
+                levels=[pd.Index(level, dtype=object) for level in levels],
+                codes=codes,
+                names=list(schema.index_columns),
+            )
+
+        columns = [c for c in header if c not in schema.index_columns]
+        return pd.DataFrame(
+            {
+                c: self._strings(table.column(c).to_numpy())
+                if c in string_columns
+                else table.column(c).to_numpy()
+                for c in columns
+            },
+            index=index,
+            columns=pd.Index(columns, dtype=object),
+        )
+
+
+def _csv_text(value) -> str:
+    """Text of the value in a CSV file written by `DataFrame.to_csv`."""
+    if pd.isna(value):
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def conform_frame(df: pd.DataFrame, schema: CSVSchema) -> pd.DataFrame:
+    """Convert the frame, with the index columns among the columns, to the form it
+    would be parsed in after saving it with `to_csv(index=False)`: column names as
+    strings, the schema's string columns as strings (values read as missing by pandas,
+    like "" or "NA", become NaN), the rest as float64.
+    """
+    df = df.set_axis([_csv_text(c) for c in df.columns], axis="columns")
+    string_columns = set(schema.all_string_columns)
+    columns = {}
+    for c in df.columns:
+        values = df[c].to_numpy()
+        if c in string_columns or values.dtype == object:
+            texts = np.array([_csv_text(v) for v in values], dtype=object)
+            is_na = np.isin(texts, list(STR_NA_VALUES))
+            texts[is_na] = np.nan
+            values = texts if c in string_columns else texts.astype(np.float64)
+        else:
+            values = values.astype(np.float64)
+        columns[c] = values
+    return pd.DataFrame(columns, columns=df.columns).set_index(
+        list(schema.index_columns)
+    )
@@ -1,9 +1,13 @@
 import logging
+import os
 import re
 from abc import ABC, abstractmethod
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass
-from pathlib import Path
+from functools import partial
+from pathlib import Path, PurePosixPath
+from typing import Callable, Iterator, Mapping
 
 import numpy as np
 import pandas as pd
@@ -11,10 +15,25 @@ import pydantic
 
 from mat_dp_pipeline.common import FileOrPath
 
+from .cache import SDFCache
+from .file_format import SDFFormat, read_binary, write_frame
+from .manifest import (
+    Manifest,
+    ManifestEntry,
+    frame_digest,
+    read_manifest,
+    write_manifest,
+)
+from .path_filter import PathFilter
+from .reader_backends import CSVSchema, PandasBackend, ReaderBackend
+
 Year = int
 
 SDF_METADATA_FILE_NAME = "metadata.json"
 
+# Names of the SDF files without the extension: group 1 - input, group 2 - year
+_FILE_STEM_PATTERN = re.compile(r"(intensities|indicators)_?([0-9]{4})?|targets")
+
 
 def validate_tech_units(tech_metadata: pd.DataFrame) -> None:
     if tech_metadata.empty:
@@ -28,67 +47,74 @@ def validate_tech_units(tech_metadata: pd.DataFrame) -> None:
 
 
 class InputReader(ABC):
+    """Reader of one kind of the SDF files. CSV files are parsed by its `backend`.
+
+    Attributes:
+        backend (ReaderBackend): CSV parser. Defaults to the reference PandasBackend.
+    """
+
+    backend: ReaderBackend
+
+    def __init__(self, backend: ReaderBackend | None = None):
+        self.backend = backend or PandasBackend()
+
     @property
     @abstractmethod
     def file_pattern(self) -> re.Pattern:
         ...
 
+    @property
     @abstractmethod
-    def read(self, path: FileOrPath) -> pd.DataFrame:
+    def schema(self) -> CSVSchema:
         ...
 
+    def read_csv(self, path: FileOrPath) -> pd.DataFrame:
+        return self.backend.read_csv(path, self.schema)
+
+    def read(self, path: FileOrPath) -> pd.DataFrame:
+        """Read the file in any of the SDF formats. File objects are read as CSV."""
+        if (
+            isinstance(path, (str, Path))
+            and Path(path).suffix == SDFFormat.BINARY.suffix
+        ):
+            return read_binary(path)
+        return self.read_csv(path)
+
 
 class IntensitiesReader(InputReader):
     @property
     def file_pattern(self) -> re.Pattern:
-        return re.compile(r"intensities_?([0-9]{4})?.csv")
+        return re.compile(r"intensities_?([0-9]{4})?\.(csv|sdfb)$")
 
-    def read(self, path: FileOrPath) -> pd.DataFrame:
-        str_cols = [
-            "Category",
-            "Specific",
-            "Description",
-            "Material Unit",
-            "Production Unit",
-        ]
-        return pd.read_csv(
-            path,
-            index_col=["Category", "Specific"],
-            dtype=defaultdict(np.float64, {c: str for c in str_cols}),
-            na_values={c: "" for c in str_cols},
+    @property
+    def schema(self) -> CSVSchema:
+        return CSVSchema(
+            index_columns=("Category", "Specific"),
+            string_columns=("Description", "Material Unit", "Production Unit"),
         )
 
 
 class TargetsReader(InputReader):
     @property
     def file_pattern(self) -> re.Pattern:
-        return re.compile("targets.csv")
+        return re.compile(r"targets\.(csv|sdfb)$")
 
-    def read(self, path: FileOrPath) -> pd.DataFrame:
-        return pd.read_csv(
-            path,
-            index_col=["Category", "Specific"],
-            dtype=defaultdict(
-                np.float64,
-                {
-                    "Category": str,
-                    "Specific": str,
-                },
-            ),
-        )
+    @property
+    def schema(self) -> CSVSchema:
+        return CSVSchema(index_columns=("Category", "Specific"))
 
 
 class IndicatorsReader(InputReader):
     @property
     def file_pattern(self) -> re.Pattern:
-        return re.compile(r"indicators_?([0-9]{4})?.csv")
+        return re.compile(r"indicators_?([0-9]{4})?\.(csv|sdfb)$")
+
+    @property
+    def schema(self) -> CSVSchema:
+        return CSVSchema(index_columns=("Resource",))
 
-    def read(self, path: FileOrPath) -> pd.DataFrame:
-        return pd.read_csv(
-            path,
-            index_col="Resource",
-            dtype=defaultdict(np.float64, {"Resource": str}),
-        )
+
+_READERS: list[InputReader] = [IntensitiesReader(), IndicatorsReader(), TargetsReader()]
 
 
 class SDFMetadata(pydantic.BaseModel):
@@ -117,7 +143,7 @@ class StandardDataFormat:
     indicators_yearly: dict[Year, pd.DataFrame]
 
     targets: pd.DataFrame | None
-    children: dict[str, "StandardDataFormat"]
+    children: Mapping[str, "StandardDataFormat"]
 
     tech_metadata: pd.DataFrame
 
@@ -126,6 +152,114 @@ class StandardDataFormat:
     def __post_init__(self):
         self.validate()
 
+    @classmethod
+    def from_frames(
+        cls,
+        name: str,
+        base_intensities: pd.DataFrame | None,
+        intensities_yearly: dict[Year, pd.DataFrame],
+        base_indicators: pd.DataFrame | None,
+        indicators_yearly: dict[Year, pd.DataFrame],
+        targets: pd.DataFrame | None,
+        children: Mapping[str, "StandardDataFormat"],
+        metadata: SDFMetadata,
+    ) -> "StandardDataFormat":
+        """Create a node out of frames in the form returned by the InputReaders. In particular,
+        intensities still contain the tech metadata columns, which are moved to `tech_metadata`.
+        """
+        base_intensities = (
+            pd.DataFrame() if base_intensities is None else base_intensities
+        )
+        base_indicators = pd.DataFrame() if base_indicators is None else base_indicators
+
+        # *Move* metadata from all intensity frames into tech_metadata
+        tech_metadata_cols = ["Description", "Material Unit", "Production Unit"]
+        all_intensities = list(intensities_yearly.values()) + [base_intensities]
+        all_metadata = [
+            i.loc[:, tech_metadata_cols] for i in all_intensities if not i.empty
+        ]
+        if all_metadata:
+            tech_metadata = pd.concat(all_metadata).groupby(level=(0, 1)).last()
+        else:
+            tech_metadata = pd.DataFrame()
+
+        for intensities in filter(lambda df: not df.empty, all_intensities):
+            intensities.drop(columns=tech_metadata_cols, inplace=True)
+
+        return cls(
+            name=name,
+            base_intensities=base_intensities,
+            intensities_yearly=intensities_yearly,
+            base_indicators=base_indicators,
+            indicators_yearly=indicators_yearly,
+            targets=targets,
+            children=children,
+            tech_metadata=tech_metadata,
+            metadata=metadata,
+        )
+
+    @classmethod
+    def from_files(
+        cls,
+        name: str,
+        files: dict[str, pd.DataFrame],
+        children: Mapping[str, "StandardDataFormat"],
+        metadata: SDFMetadata,
+    ) -> "StandardDataFormat":
+        """Create a node out of its files' frames, in the form returned by the InputReaders,
+        keyed by the file names without the extension (e.g. "intensities_2030").
+        """
+        base_intensities: pd.DataFrame | None = None
+        intensities_yearly: dict[Year, pd.DataFrame] = {}
+        base_indicators: pd.DataFrame | None = None
+        indicators_yearly: dict[Year, pd.DataFrame] = {}
+        targets: pd.DataFrame | None = None
+
+        for stem, df in files.items():
+            if not (match := _FILE_STEM_PATTERN.fullmatch(stem)):
+                raise ValueError(f"{name}: Unknown SDF file {stem}!")
+            kind, year = match.groups()
+            if kind == "intensities":
+                if year is None:
+                    base_intensities = df
+                else:
+                    intensities_yearly[Year(year)] = df
+            elif kind == "indicators":
+                if year is None:
+                    base_indicators = df
+                else:
+                    indicators_yearly[Year(year)] = df
+            else:
+                targets = df
+
+        return cls.from_frames(
+            name=name,
+            base_intensities=base_intensities,
+            intensities_yearly=intensities_yearly,
+            base_indicators=base_indicators,
+            indicators_yearly=indicators_yearly,
+            targets=targets,
+            children=children,
+            metadata=metadata,
+        )
+
+    def file_frames(self) -> dict[str, pd.DataFrame]:
+        """Frames of the node's own files, as they're saved, keyed by the file names
+        without the extension. The inverse of `from_files`.
+        """
+        files = {}
+        if not self.base_intensities.empty:
+            files["intensities"] = self._with_tech_metadata(self.base_intensities)
+        for year, intensities in self.intensities_yearly.items():
+            files[f"intensities_{year}"] = self._with_tech_metadata(intensities)
+        if not self.base_indicators.empty:
+            files["indicators"] = self.base_indicators
+        for year, indicators in self.indicators_yearly.items():
+            files[f"indicators_{year}"] = indicators
+        if self.targets is not None:
+            files["targets"] = self.targets
+        return files
+
     def is_leaf(self) -> bool:
         return self.targets is not None
 
@@ -160,161 +294,417 @@ class StandardDataFormat:
             # us then. Just warn for now. We'll validate again for the calculation.
             logging.warning(e)
 
-    def _prepare_output_dir(self, root_dir: Path, is_root: bool) -> Path:
-        output_dir = root_dir
-        if not is_root:
-            output_dir /= self.name
+    def _with_tech_metadata(self, intensities: pd.DataFrame) -> pd.DataFrame:
+        # Tech metadata has a unique index, so aligning it is a left join
+        metadata = self.tech_metadata.reindex(intensities.index)
+        return pd.concat([metadata, intensities], axis="columns")
+
+    def _saved_files(
+        self, output_dir: Path, kinds: set[str], below_leaf: bool = False
+    ) -> Iterator[tuple[Path, pd.DataFrame]]:
+        """Files of the subtree, in a single traversal: their paths (without the
+        extension) and frames. Creates the directories of the nodes on the way.
+        """
         output_dir.mkdir(parents=True, exist_ok=True)
-        return output_dir
-
-    def _save_intensities(self, root_dir: Path, is_root: bool = False) -> None:
-        def add_metadata(intensities: pd.DataFrame):
-            df = intensities.join(self.tech_metadata)
-            assert len(df) == len(intensities)
-            cols = self.tech_metadata.columns.to_list() + intensities.columns.to_list()
-            return df.loc[:, cols]
+        for stem, df in self.file_frames().items():
+            kind = stem.split("_")[0]
+            # Targets of the nodes below a leaf are never read
+            if kind in kinds and not (kind == "targets" and below_leaf):
+                yield output_dir / stem, df
+        for sdf in self.children.values():
+            yield from sdf._saved_files(
+                output_dir / sdf.name, kinds, below_leaf or self.is_leaf()
+            )
 
-        output_dir = self._prepare_output_dir(root_dir, is_root)
+    def _save_files(
+        self,
+        root_dir: Path,
+        format: SDFFormat,
+        kinds: set[str],
+        workers: int | None = None,
+        previous: Manifest | None = None,
+    ) -> Manifest | None:
+        """Write the files of the given kinds concurrently. With a `previous`
+        manifest, the files still current in it are skipped, and the manifest of all
+        of them is returned.
+        """
+        files = list(self._saved_files(root_dir, kinds))
+
+        def save_file(
+            file: tuple[Path, pd.DataFrame]
+        ) -> tuple[str, ManifestEntry | None]:
+            stem, df = file
+            path = stem.with_suffix(format.suffix)
+            name = path.relative_to(root_dir).as_posix()
+            if previous is None:
+                write_frame(df, stem, format)
+                return name, None
+            digest = frame_digest(df)
+            entry = previous.get(name)
+            if entry is None or not entry.is_current(path, digest):
+                write_frame(df, stem, format)
+                entry = ManifestEntry.of(path, digest)
+            return name, entry
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1 or len(files) < 2:
+            saved = dict(map(save_file, files))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                saved = dict(ex.map(save_file, files))
+        return None if previous is None else saved
 
-        if not self.base_intensities.empty:
-            add_metadata(self.base_intensities).to_csv(output_dir / "intensities.csv")
-        for year, intensities in self.intensities_yearly.items():
-            add_metadata(intensities).to_csv(output_dir / f"intensities_{year}.csv")
+    def save_intensities(
+        self, root_dir: Path, format: SDFFormat | str = SDFFormat.CSV
+    ) -> None:
+        self._save_files(root_dir, SDFFormat(format), {"intensities"})
 
-        for sdf in self.children.values():
-            sdf._save_intensities(output_dir)
+    def save_indicators(
+        self, root_dir: Path, format: SDFFormat | str = SDFFormat.CSV
+    ) -> None:
+        self._save_files(root_dir, SDFFormat(format), {"indicators"})
 
-    def save_intensities(self, root_dir: Path) -> None:
-        self._save_intensities(root_dir, is_root=True)
+    def save_targets(
+        self, root_dir: Path, format: SDFFormat | str = SDFFormat.CSV
+    ) -> None:
+        self._save_files(root_dir, SDFFormat(format), {"targets"})
 
-    def _save_indicators(self, root_dir: Path, is_root: bool = False) -> None:
-        output_dir = self._prepare_output_dir(root_dir, is_root)
+    def save_metadata(self, root_dir: Path) -> None:
+        with open(root_dir / SDF_METADATA_FILE_NAME, "w") as f:
+            f.write(self.metadata.json())
 
-        if not self.base_indicators.empty:
-            self.base_indicators.to_csv(output_dir / "indicators.csv")
-        for year, indicators in self.indicators_yearly.items():
-            indicators.to_csv(output_dir / f"indicators_{year}.csv")
+    def save(
+        self,
+        root_dir: Path,
+        format: SDFFormat | str = SDFFormat.CSV,
+        workers: int | None = None,
+        incremental: bool = False,
+    ) -> None:
+        """Save the SDF in the directory layout. The tree is traversed once and its
+        files are written concurrently.
+
+        With `incremental`, a manifest of the saved frames' digests is stored
+        alongside, and files whose frames haven't changed since the last incremental
+        save (and which haven't been modified since) are skipped. Files of the nodes
+        that are no longer in the SDF are removed then. Otherwise all the files are
+        written, and nothing else in `root_dir` is touched.
+
+        Args:
+            root_dir (Path): Root directory of the SDF
+            format (SDFFormat | str, optional): Encoding of the intensities, indicators
+                and targets files: "csv" or "binary". `load` detects it
+                automatically. Defaults to SDFFormat.CSV.
+            workers (int | None, optional): Number of threads writing the files. 1
+                writes them serially. Defaults to None - the number of CPUs.
+            incremental (bool, optional): Rewrite only the changed files. Defaults
+                to False.
+        """
+        kinds = {"intensities", "indicators", "targets"}
+        if not incremental:
+            self._save_files(root_dir, SDFFormat(format), kinds, workers)
+            self.save_metadata(root_dir)
+            return
+
+        previous = read_manifest(root_dir)
+        manifest = self._save_files(
+            root_dir, SDFFormat(format), kinds, workers, previous
+        )
+        assert manifest is not None
+        # Files saved before, which are no longer part of the SDF
+        for name in previous.keys() - manifest.keys():
+            path = root_dir / name
+            path.unlink(missing_ok=True)
+            # Directories of removed nodes would be loaded as empty nodes
+            for directory in path.parents:
+                if directory == root_dir or any(directory.iterdir()):
+                    break
+                directory.rmdir()
+        write_manifest(root_dir, manifest)
+        self.save_metadata(root_dir)
 
-        for sdf in self.children.values():
-            sdf._save_indicators(output_dir)
 
-    def save_indicators(self, root_dir: Path) -> None:
-        self._save_indicators(root_dir, is_root=True)
+def subtree_parts(subtree: Path | str | None) -> list[str]:
+    """Names of the nodes on the way from the root to the `subtree` node."""
+    if subtree is None:
+        return []
+    return [p for p in Path(subtree).parts if p != "/"]
 
-    def _save_targets(self, root_dir: Path, is_root: bool = False) -> None:
-        output_dir = self._prepare_output_dir(root_dir, is_root)
 
-        if self.targets is not None:
-            self.targets.to_csv(output_dir / "targets.csv")
-        else:
-            for sdf in self.children.values():
-                sdf._save_targets(output_dir)
+@dataclass
+class _NodeFiles:
+    """SDF files of a directory, keyed by the file names without the extension."""
 
-    def save_targets(self, root_dir: Path) -> None:
-        self._save_targets(root_dir, is_root=True)
+    directory: Path
+    files: dict[str, Path]
+    children: list["_NodeFiles"]
 
-    def save_metadata(self, root_dir: Path) -> None:
-        with open(root_dir / SDF_METADATA_FILE_NAME, "w") as f:
-            f.write(self.metadata.json())
+    def all_files(self) -> Iterator[Path]:
+        yield from self.files.values()
+        for child in self.children:
+            yield from child.all_files()
 
-    def save(self, root_dir: Path) -> None:
-        self.save_intensities(root_dir)
-        self.save_indicators(root_dir)
-        self.save_targets(root_dir)
-        self.save_metadata(root_dir)
 
+def _reader_for(
+    file_name: str, backend: ReaderBackend | None = None
+) -> InputReader | None:
+    reader = next((r for r in _READERS if r.file_pattern.match(file_name)), None)
+    if reader is not None and backend is not None:
+        reader = type(reader)(backend)
+    return reader
 
-def load(input_dir: Path) -> StandardDataFormat:
-    assert input_dir.is_dir()
-    targets_reader = TargetsReader()
-    intensities_reader = IntensitiesReader()
-    indicators_reader = IndicatorsReader()
 
-    metadata_file = Path(input_dir / SDF_METADATA_FILE_NAME)
+def _read_file(path: Path, backend: ReaderBackend | None = None) -> pd.DataFrame:
+    reader = _reader_for(path.name, backend)
+    assert reader is not None
+    return reader.read(path)
 
-    def dfs(node: Path, is_root: bool) -> StandardDataFormat | None:
-        sub_directories = list(filter(lambda p: p.is_dir(), node.iterdir()))
 
-        base_intensities: pd.DataFrame | None = None
-        intensities_yearly: dict[Year, pd.DataFrame] = {}
-        base_indicators: pd.DataFrame | None = None
-        indicators_yearly: dict[Year, pd.DataFrame] = {}
-        targets: pd.DataFrame | None = None
-        children: dict[str, StandardDataFormat] = {}
+def _file_reader(
+    cache: SDFCache | None, backend: ReaderBackend | None
+) -> Callable[[Path], pd.DataFrame]:
+    """Function reading a single SDF file. Picklable, so that it can be sent to
+    the workers of a process pool.
+    """
+    read_file = _read_file if backend is None else partial(_read_file, backend=backend)
+    return read_file if cache is None else partial(cache.read, read_file=read_file)
+
+
+def _walk(
+    directory: Path,
+    path_to_subtree: list[str],
+    recursive: bool = True,
+    path_filter: PathFilter | None = None,
+    node_path: PurePosixPath = PurePosixPath("/"),
+) -> _NodeFiles | None:
+    """Collect the SDF files of the `directory` and (if `recursive`) its descendants.
+    Non-recursive walk lists the children with no files.
+
+    Subdirectories that can't contain any node selected by the `path_filter` are
+    skipped. So are the files of nodes that aren't selected and have no children
+    left - a recursive walk returns None for them.
+    """
+    sub_directories = list(filter(lambda p: p.is_dir(), directory.iterdir()))
+    if path_to_subtree:
+        sub_directories = [directory / path_to_subtree[0]]
+        if not sub_directories[0].is_dir():
+            raise ValueError(f"{sub_directories[0]} not found!")
+    if path_filter is not None:
+        sub_directories = [
+            d for d in sub_directories if path_filter.may_contain(node_path / d.name)
+        ]
 
-        files = filter(lambda f: f.is_file(), node.iterdir())
-        for file in files:
-            if match := intensities_reader.file_pattern.match(file.name):
-                year = match.group(1)
-                df = intensities_reader.read(file)
-                if year is None:
-                    base_intensities = df
-                else:
-                    year = Year(year)
-                    intensities_yearly[year] = df
-            elif match := indicators_reader.file_pattern.match(file.name):
-                year = match.group(1)
-                df = indicators_reader.read(file)
-                if year is None:
-                    base_indicators = df
-                else:
-                    year = Year(year)
-                    indicators_yearly[year] = df
-            elif targets_reader.file_pattern.match(file.name):
-                targets = targets_reader.read(file)
+    if recursive:
+        children = [
+            _walk(d, path_to_subtree[1:], True, path_filter, node_path / d.name)
+            for d in sub_directories
+        ]
+        children = [child for child in children if child is not None]
+    else:
+        children = [
+            _NodeFiles(directory=d, files={}, children=[]) for d in sub_directories
+        ]
 
-        for sub_directory in sub_directories:
-            leaf = dfs(sub_directory, False)
-            if leaf is not None:
-                children[sub_directory.name] = leaf
+    if not children and path_filter is not None and not path_filter.matches(node_path):
+        if recursive:
+            return None
+        return _NodeFiles(directory=directory, files={}, children=[])
+
+    # Each input can be stored in only one of the formats
+    files: dict[str, Path] = {}
+    for file in filter(lambda f: f.is_file(), directory.iterdir()):
+        if _reader_for(file.name) is None:
+            continue
+        if file.stem in files:
+            raise ValueError(
+                f"{directory}: {file.stem} stored as both {files[file.stem].name} "
+                f"and {file.name}!"
+            )
+        files[file.stem] = file
 
-        # If not intensities or indicators were provided, use empty ones
-        base_intensities = (
-            pd.DataFrame() if base_intensities is None else base_intensities
-        )
-        base_indicators = pd.DataFrame() if base_indicators is None else base_indicators
+    return _NodeFiles(directory=directory, files=files, children=children)
 
-        # Ignore leaves with nothing specified
-        if (
-            targets is None
-            and base_intensities is None
-            and base_indicators is None
-            and not sub_directories
-        ):
-            logging.warning(f"No files found in {node.name}. Ignoring.")
-            return None
-        else:
-            # *Move* metadata from all intensity frames into tech_metadata
-            tech_metadata_cols = ["Description", "Material Unit", "Production Unit"]
-            all_intensities = list(intensities_yearly.values()) + [base_intensities]
-            all_metadata = [
-                i.loc[:, tech_metadata_cols] for i in all_intensities if not i.empty
-            ]
-            if all_metadata:
-                tech_metadata = pd.concat(all_metadata).groupby(level=(0, 1)).last()
-            else:
-                tech_metadata = pd.DataFrame()
 
-            for intensities in filter(lambda df: not df.empty, all_intensities):
-                intensities.drop(columns=tech_metadata_cols, inplace=True)
+class LazyChildren(Mapping[str, "StandardDataFormat"]):
+    """Children of a lazily loaded SDF node. The names of the children are known
+    upfront, but each child is read (and validated) only the first time it's accessed.
+    Its own children are lazy too.
+    """
 
-            if is_root and metadata_file.exists():
-                metadata = SDFMetadata.parse_file(metadata_file)
-            else:
-                metadata = SDFMetadata()
-
-            return StandardDataFormat(
-                name="/" if is_root else node.name,
-                base_intensities=base_intensities,
-                intensities_yearly=intensities_yearly,
-                base_indicators=base_indicators,
-                indicators_yearly=indicators_yearly,
-                targets=targets,
-                children=children,
-                tech_metadata=tech_metadata,
-                metadata=metadata,
+    _directories: dict[str, Path]
+    _path_to_subtree: list[str]
+    _path_filter: PathFilter | None
+    _node_path: PurePosixPath
+    _read_file: Callable[[Path], pd.DataFrame]
+    _loaded: dict[str, "StandardDataFormat"]
+
+    def __init__(
+        self,
+        directories: dict[str, Path],
+        path_to_subtree: list[str],
+        path_filter: PathFilter | None = None,
+        node_path: PurePosixPath = PurePosixPath("/"),
+        read_file: Callable[[Path], pd.DataFrame] = _read_file,
+    ):
+        self._directories = directories
+        self._path_to_subtree = path_to_subtree
+        self._path_filter = path_filter
+        self._node_path = node_path
+        self._read_file = read_file
+        self._loaded = {}
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def __getitem__(self, name: str) -> "StandardDataFormat":
+        if name not in self._loaded:
+            self._loaded[name] = _load_lazy_node(
+                self._directories[name],
+                None,
+                self._path_to_subtree,
+                self._path_filter,
+                self._node_path / name,
+                self._read_file,
             )
+        return self._loaded[name]
+
+    def __contains__(self, name: object) -> bool:
+        # Mapping's default implementation would load the child
+        return name in self._directories
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._directories)
+
+    def __len__(self) -> int:
+        return len(self._directories)
+
+
+def _load_lazy_node(
+    directory: Path,
+    metadata_file: Path | None,
+    path_to_subtree: list[str],
+    path_filter: PathFilter | None = None,
+    node_path: PurePosixPath = PurePosixPath("/"),
+    read_file: Callable[[Path], pd.DataFrame] = _read_file,
+) -> "StandardDataFormat":
+    """Read the node's own files, leaving its children lazy. Only the root comes with
+    the `metadata_file`.
+    """
+    is_root = metadata_file is not None
+    node = _walk(directory, path_to_subtree, False, path_filter, node_path)
+    assert node is not None
+    if is_root and metadata_file.exists():
+        metadata = SDFMetadata.parse_file(metadata_file)
+    else:
+        metadata = SDFMetadata()
+
+    return StandardDataFormat.from_files(
+        name="/" if is_root else directory.name,
+        files={stem: read_file(path) for stem, path in node.files.items()},
+        children=LazyChildren(
+            {child.directory.name: child.directory for child in node.children},
+            path_to_subtree[1:],
+            path_filter,
+            node_path,
+            read_file,
+        ),
+        metadata=metadata,
+    )
+
+
+def _read_files(
+    files: list[Path],
+    workers: int | None,
+    processes: bool,
+    read_file: Callable[[Path], pd.DataFrame] = _read_file,
+) -> list[pd.DataFrame]:
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(files) < 2:
+        return [read_file(f) for f in files]
+
+    executor = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    with executor(max_workers=workers) as ex:
+        # Bigger chunks amortise the inter-process communication
+        chunksize = max(1, len(files) // (4 * workers)) if processes else 1
+        return list(ex.map(read_file, files, chunksize=chunksize))
+
+
+def load(
+    input_dir: Path,
+    subtree: Path | str | None = None,
+    workers: int | None = None,
+    processes: bool = False,
+    lazy: bool = False,
+    path_filter: PathFilter | None = None,
+    cache: SDFCache | None = None,
+    backend: ReaderBackend | None = None,
+) -> StandardDataFormat:
+    """Load the SDF from the directory layout. Each file can be in any of the SDF
+    formats (CSV or binary), detected by its extension.
+
+    The directory tree is walked first. Then, all the files are read concurrently,
+    and the SDF is assembled out of them at the end.
+
+    Args:
+        input_dir (Path): SDF root directory
+        subtree (Path | str | None, optional): Path of the node to load (e.g. "/Africa"),
+            together with all its descendants. Out of the other nodes, only its ancestors
+            are loaded (without their other children), so that the subtree still inherits
+            their inputs. Defaults to None - the whole SDF.
+        workers (int | None, optional): Number of workers reading the files. 1 reads them
+            in the calling thread. Defaults to None - the number of CPUs.
+        processes (bool, optional): Read the files in a process pool instead of a thread
+            pool. Worth it for large CSV files, as parsing them holds the GIL for most
+            of the time. Defaults to False.
+        lazy (bool, optional): Read only the root node now. Every other node is read,
+            and validated, the first time it's accessed in its parent's `children`
+            (see LazyChildren). `workers` and `processes` don't apply then.
+            Defaults to False.
+        path_filter (PathFilter | None, optional): Load only the leaves it selects, and
+            their ancestors. Directories of other nodes are never read. Defaults to None.
+        cache (SDFCache | None, optional): Cache of the parsed files. Only the files
+            that changed since they were cached are parsed again. Defaults to None.
+        backend (ReaderBackend | None, optional): Parser of the CSV files (e.g.
+            ArrowBackend). Defaults to None - the readers' own, PandasBackend.
+
+    Returns:
+        StandardDataFormat: Loaded SDF
+    """
+    assert input_dir.is_dir()
+    metadata_file = Path(input_dir / SDF_METADATA_FILE_NAME)
+    read_file = _file_reader(cache, backend)
+    if lazy:
+        sdf = _load_lazy_node(
+            input_dir,
+            metadata_file,
+            subtree_parts(subtree),
+            path_filter,
+            read_file=read_file,
+        )
+        if cache is not None:
+            cache.evict()
+        return sdf
+
+    root = _walk(input_dir, subtree_parts(subtree), path_filter=path_filter)
+    if root is None:
+        raise ValueError(f"{input_dir}: No SDF node matches {path_filter}!")
+    paths = list(root.all_files())
+    frames = dict(zip(paths, _read_files(paths, workers, processes, read_file)))
+    if cache is not None:
+        cache.evict()
+
+    def assemble(node: _NodeFiles, is_root: bool) -> StandardDataFormat:
+        if is_root and metadata_file.exists():
+            metadata = SDFMetadata.parse_file(metadata_file)
+        else:
+            metadata = SDFMetadata()
+
+        return StandardDataFormat.from_files(
+            name="/" if is_root else node.directory.name,
+            files={stem: frames[path] for stem, path in node.files.items()},
+            children={
+                child.directory.name: assemble(child, False) for child in node.children
+            },
+            metadata=metadata,
+        )
 
-    root_dfs = dfs(input_dir, True)
-    assert root_dfs is not None
-    return root_dfs
+    return assemble(root, True)
@@ -0,0 +1,241 @@
+"""Synthetic Standard Data Format trees of arbitrary size, for load and scaling tests."""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from .standard_data_format import (
+    SDF_METADATA_FILE_NAME,
+    SDFMetadata,
+    StandardDataFormat,
+    Year,
+)
+
+
+@dataclass(frozen=True)
+class SyntheticSDFSpec:
+    """Shape of a synthetic SDF. The tree is complete: every non-leaf node has
+    `fan_out` children and all the leaves are on the level `depth`, so there are
+    `fan_out ** depth` leaves.
+
+    Attributes:
+        depth (int): Number of levels below the root
+        fan_out (int): Number of children of each non-leaf node
+        n_techs (int): Number of technologies
+        n_categories (int): Number of tech categories the technologies are spread across
+        n_resources (int): Number of resources
+        n_indicators (int): Number of indicators
+        target_years (tuple[Year, ...]): Years in the targets
+        yearly_overlays (int): Number of yearly intensities files of each node defining intensities
+        override_fraction (float): Fraction of non-root nodes overriding intensities of their ancestors
+        sparsity (float): Fraction of values missing from the overrides & yearly files,
+            and fraction of techs missing from the targets
+        seed (int): Random seed. The same spec always generates the same SDF
+    """
+
+    depth: int = 2
+    fan_out: int = 3
+    n_techs: int = 10
+    n_categories: int = 3
+    n_resources: int = 5
+    n_indicators: int = 2
+    target_years: tuple[Year, ...] = (2020, 2030, 2040, 2050)
+    yearly_overlays: int = 1
+    override_fraction: float = 0.2
+    sparsity: float = 0.5
+    seed: int = 0
+
+    @property
+    def n_leaves(self) -> int:
+        return self.fan_out**self.depth
+
+    @property
+    def techs(self) -> pd.MultiIndex:
+        return pd.MultiIndex.from_tuples(
+            [
+                (f"Category {t % self.n_categories}", f"Tech {t}")
+                for t in range(self.n_techs)
+            ],
+            names=["Category", "Specific"],
+        )
+
+    @property
+    def resources(self) -> list[str]:
+        return [f"Resource {r}" for r in range(self.n_resources)]
+
+    @property
+    def indicators(self) -> list[str]:
+        return [f"Indicator {i}" for i in range(self.n_indicators)]
+
+
+@dataclass(frozen=True)
+class _NodeFrames:
+    """Frames of a single node, in the form returned by the InputReaders."""
+
+    base_intensities: pd.DataFrame | None
+    intensities_yearly: dict[Year, pd.DataFrame]
+    base_indicators: pd.DataFrame | None
+    targets: pd.DataFrame | None
+
+
+def _node_name(level: int, index: int) -> str:
+    return f"L{level}N{index}"
+
+
+def _intensities(
+    spec: SyntheticSDFSpec,
+    rng: np.random.Generator,
+    techs: pd.MultiIndex,
+    sparsity: float,
+) -> pd.DataFrame:
+    values = rng.uniform(0.0, 10.0, size=(len(techs), spec.n_resources)).round(6)
+    values[rng.random(values.shape) < sparsity] = np.nan
+    tech_ids = [int(specific.split(" ")[1]) for _, specific in techs]
+    metadata = pd.DataFrame(
+        {
+            "Description": [f"Synthetic tech {t}" for t in tech_ids],
+            "Material Unit": "tonnes",
+            # Production unit has to be unique within a category
+            "Production Unit": [c.replace("Category", "Unit") for c, _ in techs],
+        },
+        index=techs,
+    )
+    return metadata.join(pd.DataFrame(values, index=techs, columns=spec.resources))
+
+
+def _node_frames(spec: SyntheticSDFSpec, indices: tuple[int, ...]) -> _NodeFrames:
+    """Generate frames of the node reached by taking the `indices` children on
+    consecutive levels. Every node has its own random generator seeded with its
+    position, so the frames don't depend on the order of generation.
+    """
+    rng = np.random.default_rng([spec.seed, len(indices), *indices])
+    all_techs = spec.techs
+    is_root = not indices
+    is_leaf = len(indices) == spec.depth
+
+    base_intensities = None
+    intensities_yearly = {}
+    if is_root or rng.random() < spec.override_fraction:
+        if is_root:
+            techs = all_techs
+        else:
+            n = max(1, round(len(all_techs) * (1 - spec.sparsity)))
+            techs = all_techs[np.sort(rng.choice(len(all_techs), n, replace=False))]
+        # The root must define all the values, the overrides are sparse
+        base_intensities = _intensities(
+            spec, rng, techs, 0.0 if is_root else spec.sparsity
+        )
+
+        first, last = spec.target_years[0], spec.target_years[-1]
+        candidate_years = np.arange(first + 1, last + 1)
+        n_years = min(spec.yearly_overlays, len(candidate_years))
+        for year in np.sort(rng.choice(candidate_years, n_years, replace=False)):
+            n = max(1, round(len(techs) * (1 - spec.sparsity)))
+            yearly_techs = techs[np.sort(rng.choice(len(techs), n, replace=False))]
+            intensities_yearly[Year(year)] = _intensities(
+                spec, rng, yearly_techs, spec.sparsity
+            )
+
+    base_indicators = None
+    if is_root:
+        base_indicators = pd.DataFrame(
+            rng.uniform(0.0, 5.0, size=(spec.n_resources, spec.n_indicators)).round(6),
+            index=pd.Index(spec.resources, name="Resource"),
+            columns=spec.indicators,
+        )
+
+    targets = None
+    if is_leaf:
+        n = max(1, round(len(all_techs) * (1 - spec.sparsity)))
+        techs = all_techs[np.sort(rng.choice(len(all_techs), n, replace=False))]
+        values = rng.uniform(0.0, 1000.0, size=(len(techs), len(spec.target_years)))
+        targets = pd.DataFrame(
+            values.round(3),
+            index=techs,
+            columns=[str(y) for y in spec.target_years],
+        )
+
+    return _NodeFrames(
+        base_intensities=base_intensities,
+        intensities_yearly=intensities_yearly,
+        base_indicators=base_indicators,
+        targets=targets,
+    )
+
+
+def _walk(
+    spec: SyntheticSDFSpec, indices: tuple[int, ...] = ()
+) -> Iterator[tuple[tuple[int, ...], Path]]:
+    """All the nodes' indices and paths (relative to the root), depth-first."""
+    path = Path(*(_node_name(level + 1, i) for level, i in enumerate(indices)))
+    yield indices, path
+    if len(indices) < spec.depth:
+        for i in range(spec.fan_out):
+            yield from _walk(spec, indices + (i,))
+
+
+def generate_sdf(spec: SyntheticSDFSpec = SyntheticSDFSpec()) -> StandardDataFormat:
+    """Generate a synthetic SDF in memory.
+
+    Args:
+        spec (SyntheticSDFSpec, optional): Shape of the SDF. Defaults to SyntheticSDFSpec().
+
+    Returns:
+        StandardDataFormat: SDF, equal to the one `write_synthetic_sdf` writes for the same spec
+    """
+
+    def build(indices: tuple[int, ...]) -> StandardDataFormat:
+        frames = _node_frames(spec, indices)
+        children = {}
+        if len(indices) < spec.depth:
+            children = {
+                _node_name(len(indices) + 1, i): build(indices + (i,))
+                for i in range(spec.fan_out)
+            }
+        is_root = not indices
+        return StandardDataFormat.from_frames(
+            name="/" if is_root else _node_name(len(indices), indices[-1]),
+            base_intensities=frames.base_intensities,
+            intensities_yearly=frames.intensities_yearly,
+            base_indicators=frames.base_indicators,
+            indicators_yearly={},
+            targets=frames.targets,
+            children=children,
+            metadata=SDFMetadata(),
+        )
+
+    return build(())
+
+
+def write_synthetic_sdf(
+    output_dir: Path, spec: SyntheticSDFSpec = SyntheticSDFSpec()
+) -> Path:
+    """Write a synthetic SDF in the CSV layout, node by node, without keeping the
+    whole tree in memory.
+
+    Args:
+        output_dir (Path): SDF root directory. Created if it doesn't exist.
+        spec (SyntheticSDFSpec, optional): Shape of the SDF. Defaults to SyntheticSDFSpec().
+
+    Returns:
+        Path: `output_dir`
+    """
+    for indices, path in _walk(spec):
+        frames = _node_frames(spec, indices)
+        node_dir = output_dir / path
+        node_dir.mkdir(parents=True, exist_ok=True)
+        if frames.base_intensities is not None:
+            frames.base_intensities.to_csv(node_dir / "intensities.csv")
+        for year, intensities in frames.intensities_yearly.items():
+            intensities.to_csv(node_dir / f"intensities_{year}.csv")
+        if frames.base_indicators is not None:
+            frames.base_indicators.to_csv(node_dir / "indicators.csv")
+        if frames.targets is not None:
+            frames.targets.to_csv(node_dir / "targets.csv")
+
+    with open(output_dir / SDF_METADATA_FILE_NAME, "w") as f:
+        f.write(SDFMetadata().json())
+    return output_dir
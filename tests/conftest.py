@@ -4,6 +4,7 @@ import pandas as pd
 import pytest
 
 from mat_dp_pipeline.pipeline.common import ProcessableInput
+from mat_dp_pipeline.sdf import StandardDataFormat
 
 
 @pytest.fixture()
@@ -29,3 +30,27 @@ def calculation_test_input(data_path) -> ProcessableInput:
     return ProcessableInput(
         intensities=intensities, targets=targets, indicators=indicators
     )
+
+
+@pytest.fixture()
+def assert_sdf_equal():
+    def inner(a: StandardDataFormat, b: StandardDataFormat) -> None:
+        assert a.name == b.name
+        assert a.metadata == b.metadata
+        pd.testing.assert_frame_equal(a.base_intensities, b.base_intensities)
+        pd.testing.assert_frame_equal(a.base_indicators, b.base_indicators)
+        pd.testing.assert_frame_equal(a.tech_metadata, b.tech_metadata)
+        assert a.intensities_yearly.keys() == b.intensities_yearly.keys()
+        for year, intensities in a.intensities_yearly.items():
+            pd.testing.assert_frame_equal(intensities, b.intensities_yearly[year])
+        assert a.indicators_yearly.keys() == b.indicators_yearly.keys()
+        for year, indicators in a.indicators_yearly.items():
+            pd.testing.assert_frame_equal(indicators, b.indicators_yearly[year])
+        assert (a.targets is None) == (b.targets is None)
+        if a.targets is not None:
+            pd.testing.assert_frame_equal(a.targets, b.targets)
+        assert sorted(a.children) == sorted(b.children)
+        for name, child in a.children.items():
+            inner(child, b.children[name])
+
+    return inner
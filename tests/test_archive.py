@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline import pipeline
+from mat_dp_pipeline.sdf import (
+    SDFArchive,
+    SyntheticSDFSpec,
+    convert_sdf,
+    create_sdf,
+    generate_sdf,
+    save_archive,
+)
+from mat_dp_pipeline.sdf.standard_data_format import load
+
+SPEC = SyntheticSDFSpec(depth=2, fan_out=3, n_techs=6, yearly_overlays=2, seed=5)
+
+
+def test_archive_round_trip(tmp_path, assert_sdf_equal):
+    save_archive(generate_sdf(SPEC), tmp_path / "world.sdfa")
+    assert_sdf_equal(create_sdf(tmp_path / "world.sdfa"), generate_sdf(SPEC))
+
+
+def test_archive_directory_round_trip(data_path, tmp_path, assert_sdf_equal):
+    source = data_path("World")
+    archive = convert_sdf(source, tmp_path / "world.sdfa")
+    directory = convert_sdf(archive, tmp_path / "world", "csv")
+
+    assert archive.is_file()
+    assert_sdf_equal(create_sdf(archive), load(source))
+    assert_sdf_equal(load(directory), load(source))
+
+
+def test_subtree(tmp_path, assert_sdf_equal):
+    sdf = generate_sdf(SPEC)
+    save_archive(sdf, tmp_path / "world.sdfa")
+    sdf.save(tmp_path / "world")
+
+    with SDFArchive(tmp_path / "world.sdfa") as archive:
+        assert archive.nodes[:2] == ["/", "/L1N0"]
+        subtree = archive.load("/L1N1")
+    assert list(subtree.children) == ["L1N1"]
+    assert_sdf_equal(subtree.children["L1N1"], sdf.children["L1N1"])
+    assert_sdf_equal(create_sdf(tmp_path / "world", subtree="L1N1"), subtree)
+
+    # The subtree inherits its ancestors' inputs
+    full_output = pipeline(generate_sdf(SPEC))
+    subtree_output = pipeline(subtree)
+    assert len(subtree_output.by_path) == SPEC.fan_out
+    for path, by_year in subtree_output.by_path.items():
+        for year, output in by_year.items():
+            pd.testing.assert_frame_equal(
+                output.emissions, full_output[path, year].emissions
+            )
+
+
+def test_missing_subtree(tmp_path):
+    save_archive(generate_sdf(SPEC), tmp_path / "world.sdfa")
+    with pytest.raises(ValueError, match="not found"):
+        create_sdf(tmp_path / "world.sdfa", subtree="/Atlantis")
@@ -0,0 +1,103 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.sdf import SDFCache, create_sdf
+from mat_dp_pipeline.sdf import standard_data_format as sdf_module
+
+
+@pytest.fixture()
+def world(data_path, tmp_path):
+    return shutil.copytree(data_path("World"), tmp_path / "World")
+
+
+@pytest.fixture()
+def parsed(monkeypatch):
+    """Names of the files parsed (not taken from the cache) during the test."""
+    names = []
+    read_file = sdf_module._read_file
+
+    def counting_read_file(path):
+        names.append(path.name)
+        return read_file(path)
+
+    monkeypatch.setattr(sdf_module, "_read_file", counting_read_file)
+    return names
+
+
+def test_cached_load_equals_uncached(world, tmp_path, assert_sdf_equal):
+    cache = SDFCache(tmp_path / "cache")
+    expected = create_sdf(world)
+    assert_sdf_equal(create_sdf(world, cache=cache), expected)
+    assert_sdf_equal(create_sdf(world, cache=cache), expected)
+    assert cache.stats().entries == len(list(world.rglob("*.csv")))
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_only_changed_files_are_parsed(world, tmp_path, parsed, lazy):
+    cache = SDFCache(tmp_path / "cache")
+    create_sdf(world, cache=cache, workers=1)
+    parsed.clear()
+
+    uk = world / "Europe" / "UK" / "targets.csv"
+    targets = pd.read_csv(uk, index_col=["Category", "Specific"])
+    targets.iloc[0, 0] += 1
+    targets.to_csv(uk)
+
+    sdf = create_sdf(world, cache=cache, workers=1, lazy=lazy)
+    uk_targets = sdf.children["Europe"].children["UK"].targets
+    assert uk_targets is not None
+    assert uk_targets.iloc[0, 0] == targets.iloc[0, 0]
+    assert parsed == ["targets.csv"]
+    # The stale entry is replaced
+    assert cache.stats().entries == len(list(world.rglob("*.csv")))
+
+
+def test_content_hash(world, tmp_path):
+    cache = SDFCache(tmp_path / "cache", hash_contents=True)
+    create_sdf(world, cache=cache)
+
+    indicators = world / "indicators.csv"
+    stat = indicators.stat()
+    contents = indicators.read_text()
+    indicators.write_text(contents.replace("0", "1", 1))
+    os.utime(indicators, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    sdf = create_sdf(world, cache=cache)
+    pd.testing.assert_frame_equal(
+        sdf.base_indicators, create_sdf(world).base_indicators
+    )
+
+
+def test_eviction(world, tmp_path):
+    cache = SDFCache(tmp_path / "cache", max_size=0)
+    create_sdf(world, cache=cache)
+    assert cache.stats().entries == 0
+
+    cache = SDFCache(tmp_path / "cache")
+    create_sdf(world, cache=cache)
+    full_size = cache.stats().size
+    cache = SDFCache(tmp_path / "cache", max_size=full_size // 2)
+    cache.evict()
+    assert 0 < cache.stats().size <= full_size // 2
+
+
+def test_invalidate(world, tmp_path, parsed):
+    cache = SDFCache(tmp_path / "cache")
+    create_sdf(world, cache=cache, workers=1)
+    n_files = cache.stats().entries
+
+    cache.invalidate(world / "Europe")
+    assert cache.stats().entries == n_files - len(
+        list((world / "Europe").rglob("*.csv"))
+    )
+    cache.invalidate(world / "indicators.csv")
+    assert cache.stats().entries == 1
+
+    cache.invalidate()
+    assert cache.stats().entries == 0
+    parsed.clear()
+    create_sdf(world, cache=cache, workers=1)
+    assert len(parsed) == n_files
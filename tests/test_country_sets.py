@@ -0,0 +1,88 @@
+from dataclasses import replace
+
+import pandas as pd
+import pytest
+
+import mat_dp_pipeline.data_sources as ds
+from mat_dp_pipeline.data_sources.country_sets import (
+    CountryIndex,
+    CountrySet,
+    CustomCountry,
+    Identifier,
+)
+from mat_dp_pipeline.data_sources.country_sets.create_country_to_path import (
+    create_country_to_path,
+)
+from mat_dp_pipeline.data_sources.country_sets.source_with_countries import (
+    COUNTRY_CODES_FILE,
+)
+
+
+@pytest.fixture()
+def country_code_df() -> pd.DataFrame:
+    return pd.read_csv(COUNTRY_CODES_FILE, keep_default_na=False)
+
+
+def test_country_index(country_code_df):
+    index = CountryIndex(country_code_df)
+    assert index.contains("name", "Kenya")
+    assert not index.contains("name", "KEN")
+    assert index.contains("alpha-3", "KEN")
+
+    expected = country_code_df[country_code_df["sub-region"] == "Western Europe"]
+    assert index.countries("sub-region", "Western Europe", Identifier.alpha_2) == list(
+        zip(expected["alpha-2"], expected["name"])
+    )
+    assert index.countries("region", "Atlantis", Identifier.alpha_2) == []
+
+
+@pytest.mark.parametrize("identifier", list(Identifier))
+def test_all_countries(country_code_df, identifier):
+    country_set = CountrySet(
+        countries=["Kenya"],
+        sub_regions=["Western Europe"],
+        intermediate_regions=["Eastern Africa", "Caribbean"],
+        custom_countries=[CustomCountry("Kosovo", "XK", "XKX")],
+    )
+    countries = country_set.all_countries(country_code_df, identifier)
+    # The table and its index give the same countries
+    assert countries == replace(country_set).all_countries(
+        CountryIndex(country_code_df), identifier
+    )
+
+    assert len(countries) == len(set(countries))
+    names = {name for _, name in countries}
+    assert {"Kenya", "France", "Jamaica", "Kosovo"} <= names
+    members = country_code_df["intermediate-region"].isin(
+        ["Eastern Africa", "Caribbean"]
+    ) | (country_code_df["sub-region"] == "Western Europe")
+    assert len(names) == members.sum() + 1
+
+
+def test_unknown_members(country_code_df):
+    with pytest.raises(ValueError, match="Country Atlantis not found"):
+        CountrySet(countries=["Atlantis"]).all_countries(
+            country_code_df, Identifier.country_name
+        )
+    with pytest.raises(ValueError, match="sub-region Atlantis not found"):
+        CountrySet(sub_regions=["Atlantis"]).all_countries(
+            country_code_df, Identifier.country_name
+        )
+
+
+def test_many_custom_countries(country_code_df):
+    regions = [CustomCountry(f"Region {i}", None, f"R{i:02}") for i in range(500)]
+    country_sets = {
+        "Africa": CountrySet(regions=["Africa"]),
+        "Subnational": {"__root__": CountrySet(custom_countries=regions)},
+    }
+    country_to_path = create_country_to_path(
+        country_sets, CountryIndex(country_code_df), Identifier.alpha_3
+    )
+    assert country_to_path["R42"].as_posix() == "/Subnational/Region 42"
+    assert country_to_path["KEN"].as_posix() == "/Africa/Kenya"
+
+
+def test_country_index_built_once():
+    source = ds.MatDPDBIntensitiesSource
+    assert source.country_index is source.country_index
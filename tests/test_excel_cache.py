@@ -0,0 +1,84 @@
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.data_sources import excel_cache
+from mat_dp_pipeline.data_sources.excel_cache import (
+    EXCEL_CACHE_DIR_ENV,
+    ExcelCache,
+    read_excel,
+)
+
+
+def _write_workbook(path, value):
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame({"Resource": ["Steel", "Copper"], "CO2": [value, 2.5]}).to_excel(
+            writer, sheet_name="Emissions", index=False
+        )
+        pd.DataFrame({"Tech": ["Solar"], "Unit": ["GW"]}).to_excel(
+            writer, sheet_name="Techs", index=False
+        )
+
+
+@pytest.fixture()
+def parse_count(monkeypatch):
+    calls = []
+    read = pd.read_excel
+
+    def counted(*args, **kwargs):
+        calls.append(kwargs.get("sheet_name"))
+        return read(*args, **kwargs)
+
+    monkeypatch.setattr(excel_cache.pd, "read_excel", counted)
+    return calls
+
+
+def test_cached_sheets(tmp_path, parse_count):
+    workbook = tmp_path / "workbook.xlsx"
+    _write_workbook(workbook, 1.0)
+    cache = ExcelCache(tmp_path / "cache")
+
+    parsed = cache.read(workbook, sheet_name="Emissions")
+    pd.testing.assert_frame_equal(
+        cache.read(workbook, sheet_name="Emissions"),
+        pd.read_excel(workbook, sheet_name="Emissions"),
+    )
+    pd.testing.assert_frame_equal(cache.read(workbook, sheet_name="Emissions"), parsed)
+    assert parse_count == ["Emissions", "Emissions"]
+
+    # Each sheet and set of arguments has an entry of its own
+    cache.read(workbook, sheet_name="Techs")
+    cache.read(workbook, sheet_name="Emissions", header=1)
+    assert cache.stats().entries == 3
+    assert len(parse_count) == 4
+
+    _write_workbook(workbook, 3.0)
+    assert cache.read(workbook, sheet_name="Emissions").loc[0, "CO2"] == 3.0
+    # Entries of the previous contents are gone
+    assert cache.stats().entries == 1
+
+    cache.invalidate(workbook)
+    assert cache.stats().entries == 0
+
+
+def test_default_cache(tmp_path, monkeypatch, parse_count):
+    workbook = tmp_path / "workbook.xlsx"
+    _write_workbook(workbook, 1.0)
+
+    read_excel(workbook, sheet_name="Techs")
+    assert not (tmp_path / "cache").exists()
+
+    monkeypatch.setenv(EXCEL_CACHE_DIR_ENV, str(tmp_path / "cache"))
+    read_excel(workbook, sheet_name="Techs")
+    read_excel(workbook, sheet_name="Techs")
+    # The direct read, and the first one through the cache
+    assert len(parse_count) == 2
+    assert ExcelCache(tmp_path / "cache").stats().entries == 1
+
+
+def test_eviction(tmp_path, parse_count):
+    workbook = tmp_path / "workbook.xlsx"
+    _write_workbook(workbook, 1.0)
+    cache = ExcelCache(tmp_path / "cache", max_size=0)
+    cache.read(workbook, sheet_name="Techs")
+    assert cache.stats().entries == 0
+    assert not list((tmp_path / "cache").glob("*.tmp"))
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.sdf import (
+    IndicatorsReader,
+    IntensitiesReader,
+    SDFFormat,
+    SyntheticSDFSpec,
+    convert_sdf,
+    create_sdf,
+    generate_sdf,
+)
+from mat_dp_pipeline.sdf.file_format import decode_frame, encode_frame, write_binary
+from mat_dp_pipeline.sdf.standard_data_format import load
+
+SPEC = SyntheticSDFSpec(depth=2, fan_out=3, n_techs=6, yearly_overlays=2, seed=3)
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        pd.MultiIndex.from_tuples(
+            [("Power plant", "Coal"), ("Power plant", "Gas"), ("Grid", "Cable")],
+            names=["Category", "Specific"],
+        ),
+        pd.Index(["Steel", np.nan, "Copper"], name="Resource"),
+    ],
+)
+def test_binary_round_trip(index):
+    df = pd.DataFrame(
+        {
+            "Description": ["a", np.nan, "c"],
+            "Steel": [1.5, np.nan, 0.0],
+            "Production Unit": ["MW", "MW", "km"],
+            "2030": [1.0, 2.0, 3.0],
+        },
+        index=index,
+    )
+    pd.testing.assert_frame_equal(decode_frame(encode_frame(df)), df)
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        pd.Index([], name="Resource", dtype=object),
+        pd.Index([], name="Year", dtype=np.int64),
+        pd.Index([], dtype=np.float64),
+        pd.MultiIndex.from_arrays(
+            [pd.Index([], dtype=object), pd.Index([], dtype=np.int64)],
+            names=["Category", "Year"],
+        ),
+    ],
+)
+def test_empty_frame_round_trip(index):
+    df = pd.DataFrame({"Steel": [], "Unit": []}, index=index).astype(
+        {"Steel": np.float64, "Unit": object}
+    )
+    pd.testing.assert_frame_equal(
+        decode_frame(encode_frame(df)), df, check_index_type=True
+    )
+    empty = pd.DataFrame()
+    pd.testing.assert_frame_equal(decode_frame(encode_frame(empty)), empty)
+
+
+def test_empty_file_round_trip(tmp_path):
+    path = tmp_path / "indicators.csv"
+    path.write_text("Resource,CO2\n")
+    df = IndicatorsReader().read(path)
+    pd.testing.assert_frame_equal(
+        decode_frame(encode_frame(df)), df, check_index_type=True
+    )
+
+
+def test_binary_frame_at_offset():
+    df = pd.DataFrame({"x": [1.0, 2.0]}, index=pd.Index(["a", "b"], name="Resource"))
+    buffer = b"0123456" + encode_frame(df)
+    pd.testing.assert_frame_equal(decode_frame(buffer, offset=7), df)
+
+
+@pytest.mark.parametrize("format", ["csv", "binary"])
+def test_save_and_load(tmp_path, assert_sdf_equal, format):
+    sdf = generate_sdf(SPEC)
+    sdf.save(tmp_path, format=format)
+    suffix = SDFFormat(format).suffix
+    assert all(f.suffix == suffix for f in tmp_path.rglob("*.*") if f.suffix != ".json")
+    assert_sdf_equal(create_sdf(tmp_path), generate_sdf(SPEC))
+
+
+def test_convert_round_trip(data_path, tmp_path, assert_sdf_equal):
+    source = data_path("World")
+    binary_dir = convert_sdf(source, tmp_path / "binary", SDFFormat.BINARY)
+    csv_dir = convert_sdf(binary_dir, tmp_path / "csv", SDFFormat.CSV)
+
+    assert not list(binary_dir.rglob("*.csv"))
+    assert_sdf_equal(load(binary_dir), load(source))
+    assert_sdf_equal(load(csv_dir), load(source))
+
+
+def test_both_formats_in_one_node(tmp_path):
+    generate_sdf(SPEC).save(tmp_path)
+    base = tmp_path / "intensities.csv"
+    write_binary(IntensitiesReader().read(base), base.with_suffix(".sdfb"))
+    with pytest.raises(ValueError, match="stored as both"):
+        load(tmp_path)
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import mat_dp_pipeline.data_sources as ds
+from mat_dp_pipeline.data_sources.common import (
+    check_disjoint_parameters,
+    scale_units,
+    split_parameters,
+)
+
+
+def test_split_parameters():
+    variables = pd.Series(
+        [
+            "Capacity|Electricity|Solar",
+            "Capacity|Heat|Solar",
+            "Capacity|Electricity",
+            "Primary Energy|Coal|w/ CCS",
+            np.nan,
+            "Capacity|Electricity|Solar",
+            0,
+        ]
+    )
+    parameters, rest = split_parameters(
+        variables, ["Capacity|Electricity", "Primary Energy"]
+    )
+    assert parameters.tolist() == [
+        "Capacity|Electricity",
+        None,
+        None,
+        "Primary Energy",
+        None,
+        "Capacity|Electricity",
+        None,
+    ]
+    assert rest[pd.notna(parameters)].tolist() == ["Solar", "Coal|w/ CCS", "Solar"]
+
+
+@pytest.mark.parametrize(
+    "parameters",
+    [["Capacity", "Capacity|Electricity"], ["B", "Capacity", "A", "Capacity"]],
+)
+def test_overlapping_parameters(parameters):
+    with pytest.raises(ValueError, match="Overlapping definition of parameters"):
+        check_disjoint_parameters(parameters)
+
+
+def test_scale_units():
+    targets = pd.DataFrame(
+        {
+            "Region": ["KEN", "KEN", "GBR"],
+            "Unit": ["GW", "MW", "EJ/yr"],
+            "2020": [1.0, 2.0, np.nan],
+            "2030": [3.0, 4.0, 5.0],
+        }
+    )
+    scaled = scale_units(targets, {"GW": 1000, "EJ/yr": 0.5})
+    expected = pd.DataFrame(
+        {
+            "Region": ["KEN", "KEN", "GBR"],
+            "2020": [1000.0, 2.0, np.nan],
+            "2030": [3000.0, 4.0, 2.5],
+        }
+    )
+    pd.testing.assert_frame_equal(scaled, expected)
+    assert "Unit" in targets
+
+
+def test_frames_leave_targets_intact():
+    targets = pd.DataFrame(
+        {
+            "Unnamed: 0": [0, 1, 2],
+            "Model": ["M", "M", "M"],
+            "Scenario": ["S", "S", "S"],
+            "Region": ["KEN", "KEN", "GBR"],
+            "Variable": [
+                "Capacity|Electricity|Coal|w/o CCS",
+                "Capacity|Heat|Coal|w/o CCS",
+                "Capacity|Electricity|Coal|w/o CCS",
+            ],
+            "Unit": ["GW", "GW", "MW"],
+            "2020": [1.0, 2.0, 3.0],
+        }
+    )
+    original = targets.copy()
+    source = ds.IntegratedAssessmentModel(
+        targets, ["Capacity|Electricity"], ds.MatDPDBIntensitiesSource
+    )
+    frames = list(source.frames())
+    pd.testing.assert_frame_equal(targets, original)
+
+    assert [(path.as_posix(), file_name) for path, file_name, _ in frames] == [
+        (
+            "/Europe/United Kingdom of Great Britain and Northern Ireland/M/S/Capacity|Electricity",
+            "targets.csv",
+        ),
+        ("/Africa/Kenya/M/S/Capacity|Electricity", "targets.csv"),
+    ]
+    assert [df["2020"].tolist() for _, _, df in frames] == [[3.0], [1000.0]]
+    assert len(list(source.frames())) == 2
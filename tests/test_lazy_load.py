@@ -0,0 +1,58 @@
+import shutil
+
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline import pipeline
+from mat_dp_pipeline.sdf import LazyChildren, create_sdf
+
+
+def test_lazy_load_equals_eager(data_path, assert_sdf_equal):
+    lazy = create_sdf(data_path("World"), lazy=True)
+    assert isinstance(lazy.children, LazyChildren)
+    assert not any(lazy.children.is_loaded(name) for name in lazy.children)
+
+    europe = lazy.children["Europe"]
+    assert lazy.children.is_loaded("Europe")
+    assert not any(europe.children.is_loaded(name) for name in europe.children)
+
+    assert_sdf_equal(lazy, create_sdf(data_path("World")))
+
+
+def test_lazy_pipeline(data_path):
+    lazy_output = pipeline(create_sdf(data_path("World"), lazy=True))
+    output = pipeline(create_sdf(data_path("World")))
+    assert lazy_output.by_path.keys() == output.by_path.keys()
+    for path, year in [(p, y) for p in output.by_path for y in output[p]]:
+        pd.testing.assert_frame_equal(
+            lazy_output[path, year].emissions, output[path, year].emissions
+        )
+
+
+def test_lazy_validation_is_deferred(data_path, tmp_path):
+    shutil.copytree(data_path("World"), tmp_path, dirs_exist_ok=True)
+    shutil.copytree(data_path("Invalid_YearlyFileWithNewTech"), tmp_path / "Invalid")
+
+    sdf = create_sdf(tmp_path, lazy=True)
+    assert "Invalid" in sdf.children
+    with pytest.raises(ValueError, match="introduces new items"):
+        sdf.children["Invalid"]
+
+
+def test_lazy_pipeline_skips_excluded_subtrees(data_path, tmp_path):
+    shutil.copytree(data_path("World"), tmp_path, dirs_exist_ok=True)
+    shutil.copytree(data_path("Invalid_YearlyFileWithNewTech"), tmp_path / "Invalid")
+
+    # The invalid subtree would fail to load, if it were read at all
+    sdf = create_sdf(tmp_path, lazy=True)
+    lazy_output = pipeline(sdf, paths=["/Europe/UK"])
+    europe = sdf.children["Europe"]
+    assert not sdf.children.is_loaded("Invalid")
+    assert not europe.children.is_loaded("Germany")
+
+    output = pipeline(create_sdf(data_path("World")), paths=["/Europe/UK"])
+    assert lazy_output.by_path.keys() == output.by_path.keys()
+    for path, year in [(p, y) for p in output.by_path for y in output[p]]:
+        pd.testing.assert_frame_equal(
+            lazy_output[path, year].emissions, output[path, year].emissions
+        )
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+import mat_dp_pipeline.data_sources as ds
+from mat_dp_pipeline.data_sources.country_sets import Identifier
+from mat_dp_pipeline.data_sources.tech_map import TECH_MAP_FILE, tech_map_frame
+
+
+def test_tech_map_artifact_is_up_to_date(caplog):
+    tech_map_frame.cache_clear()
+    pd.testing.assert_frame_equal(
+        tech_map_frame(), pd.read_excel(TECH_MAP_FILE, header=1)
+    )
+    # The frame comes from the artifact, which would be reported as out of date
+    # otherwise
+    assert "out of date" not in caplog.text
+
+
+def test_import_parses_no_lookups():
+    code = (
+        "import sys\n"
+        "import mat_dp_pipeline.data_sources as ds\n"
+        "assert 'openpyxl' not in sys.modules\n"
+        "assert not ds.MatDPDBIntensitiesSource._country_to_path\n"
+    )
+    subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+
+
+def test_lazy_country_to_path():
+    source = ds.MatDPDBIntensitiesSource
+    assert (
+        source.country_to_path(Identifier.alpha_2)["KE"]
+        == source.country_to_path(Identifier.alpha_3)["KEN"]
+    )
+    assert source.country_to_path(Identifier.alpha_2) is source.country_to_path(
+        Identifier.alpha_2
+    )
+    assert "Kenya" not in source.missing_countries()
@@ -0,0 +1,70 @@
+import country_converter as coco
+import numpy as np
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.data_sources import common
+
+
+@pytest.fixture()
+def converted(monkeypatch):
+    """Names passed to coco.convert, with the in-process memo emptied."""
+    monkeypatch.setattr(common, "_resolved_countries", {})
+    calls = []
+    convert = coco.convert
+
+    def counted(names, **kwargs):
+        calls.append(list(names))
+        return convert(names=names, **kwargs)
+
+    monkeypatch.setattr(common.coco, "convert", counted)
+    return calls
+
+
+def test_unique_names_resolved_once(converted):
+    regions = pd.Series(
+        ["Kenya", "United Kingdom", "UK", "Atlantis", np.nan, "Kenya"] * 50,
+        name="Region",
+    )
+    iso3 = common.match_countries(regions)
+    assert iso3.name == "Region"
+    assert iso3.to_list() == ["KEN", "GBR", "GBR", "Atlantis", "nan", "KEN"] * 50
+    # Short names and ISO3 of each distinct name
+    assert [len(names) for names in converted] == [5, 5]
+
+    assert common.match_countries(pd.Series(["UK", "Kenya"])).to_list() == [
+        "GBR",
+        "KEN",
+    ]
+    assert common.match_countries(pd.Series(["Kenya", "France"])).to_list() == [
+        "KEN",
+        "FRA",
+    ]
+    # Only France was new. A single name gives a single result too.
+    assert converted[2:] == [["France"], ["France"]]
+
+
+def test_persistent_cache(converted, monkeypatch, tmp_path):
+    cache_file = tmp_path / "countries.json"
+    regions = pd.Series(["Kenya", "Japan", "Kenya"])
+    assert common.match_countries(regions, cache_file).to_list() == [
+        "KEN",
+        "JPN",
+        "KEN",
+    ]
+    assert len(converted) == 2
+
+    # A new process has only the cache file
+    monkeypatch.setattr(common, "_resolved_countries", {})
+    assert common.match_countries(regions, cache_file).to_list() == [
+        "KEN",
+        "JPN",
+        "KEN",
+    ]
+    assert len(converted) == 2
+
+    # Cache of another version of country_converter is ignored
+    monkeypatch.setattr(common, "_resolved_countries", {})
+    monkeypatch.setattr(common.coco, "__version__", "0.0.0")
+    common.match_countries(regions, cache_file)
+    assert len(converted) == 4
@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mat_dp_pipeline.abstract_data_sources import write_frames
+from mat_dp_pipeline.data_sources import (
+    StoredIndicators,
+    StoredIntensities,
+    StoredTargets,
+)
+from mat_dp_pipeline.data_sources.common import partitions
+from mat_dp_pipeline.sdf import create_sdf
+
+
+def test_partitions_equal_groupby():
+    rng = np.random.default_rng(0)
+    size = 1000
+    df = pd.DataFrame(
+        {
+            "Region": rng.choice(
+                np.array(["KEN", "GBR", "JPN", None], dtype=object), size
+            ),
+            "Value": rng.random(size),
+            "Parameter": rng.choice(
+                np.array(["Capacity", "Energy", None], dtype=object),
+                size,
+                p=[0.5, 0.4, 0.1],
+            ),
+            "Model": rng.choice(["M1", "M2"], size),
+        },
+        index=rng.permutation(size),
+    )
+    grouping = ["Region", "Model", "Parameter"]
+    expected = [
+        (key, group.drop(columns=grouping)) for key, group in df.groupby(grouping)
+    ]
+    actual = list(partitions(df, grouping))
+    assert len(actual) == len(expected) == 12
+
+    assert [key for key, _ in actual] == [key for key, _ in expected]
+    for (_, group), (_, expected_group) in zip(actual, expected):
+        pd.testing.assert_frame_equal(group, expected_group)
+
+
+def test_partitions_of_empty_frame():
+    df = pd.DataFrame({"Region": [np.nan], "Value": [1.0]})
+    assert list(partitions(df, ["Region"])) == []
+    assert list(partitions(df.iloc[:0], ["Region"])) == []
+
+
+def test_concurrent_write_frames(tmp_path):
+    frames = [
+        (Path("/Africa/Kenya") / str(i), "targets.csv", pd.DataFrame({"2020": [i]}))
+        for i in range(20)
+    ]
+    write_frames(tmp_path / "serial", frames, workers=1)
+    write_frames(tmp_path / "concurrent", frames, workers=4)
+
+    files = sorted(
+        p.relative_to(tmp_path / "serial") for p in (tmp_path / "serial").rglob("*.csv")
+    )
+    assert len(files) == 20
+    for file in files:
+        assert (tmp_path / "concurrent" / file).read_text() == (
+            tmp_path / "serial" / file
+        ).read_text()
+
+
+def test_stored_sources_in_archives(data_path, tmp_path, assert_sdf_equal):
+    world = data_path("World")
+    for source_type in (StoredTargets, StoredIntensities, StoredIndicators):
+        source_type(world).save_archive(tmp_path / f"{source_type.__name__}.sdfa")
+
+    sdf = create_sdf(
+        intensities=StoredIntensities(tmp_path / "StoredIntensities.sdfa"),
+        indicators=StoredIndicators(tmp_path / "StoredIndicators.sdfa"),
+        targets=StoredTargets(tmp_path / "StoredTargets.sdfa"),
+    )
+    assert_sdf_equal(sdf, create_sdf(world))
+
+    # Files written out of the archive are read back the same
+    StoredTargets(tmp_path / "StoredTargets.sdfa")(tmp_path / "targets")
+    targets_sdf = create_sdf(
+        intensities=StoredIntensities(world),
+        indicators=StoredIndicators(world),
+        targets=StoredTargets(tmp_path / "targets"),
+    )
+    assert_sdf_equal(targets_sdf, create_sdf(world))
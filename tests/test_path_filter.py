@@ -0,0 +1,99 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline import pipeline
+from mat_dp_pipeline.sdf import PathFilter, create_sdf, save_archive
+
+
+@pytest.mark.parametrize(
+    "pattern, path, matches",
+    [
+        ("/Europe/UK", "/Europe/UK", True),
+        ("Europe/UK", "/Europe/UK", True),
+        ("/Europe", "/Europe/UK", True),
+        ("/Europe/*", "/Europe/Germany", True),
+        ("/Europe/U?", "/Europe/Germany", False),
+        ("/**/UK", "/Europe/UK", True),
+        ("/**/UK", "/UK", True),
+        ("/**/UK", "/Europe/Germany", False),
+        ("/Asia/**", "/Europe/UK", False),
+    ],
+)
+def test_include_matches(pattern, path, matches):
+    assert PathFilter(include=(pattern,)).matches(path) == matches
+
+
+def test_may_contain():
+    path_filter = PathFilter(include=("/Europe/UK/**/SSP2*",), exclude=("/Asia",))
+    assert path_filter.may_contain("/")
+    assert path_filter.may_contain("/Europe")
+    assert path_filter.may_contain("/Europe/UK/London")
+    assert not path_filter.may_contain("/Europe/Germany")
+    assert not PathFilter(exclude=("/Asia",)).may_contain("/Asia/China")
+    assert PathFilter(exclude=("/Asia",)).may_contain("/Europe")
+
+
+def test_create():
+    assert PathFilter.create() is None
+    assert PathFilter.create(["/Europe"]) == PathFilter(include=("/Europe",))
+
+
+def _leaves(sdf, label=Path("/")) -> list[Path]:
+    if not sdf.children:
+        return [label]
+    return [
+        leaf
+        for name, child in sdf.children.items()
+        for leaf in _leaves(child, label / name)
+    ]
+
+
+@pytest.mark.parametrize(
+    "include, exclude",
+    [(["/Europe/UK"], None), (None, ["/**/Germany"]), (["/**/U*"], ["/Asia"])],
+)
+def test_load_filtered(data_path, tmp_path, include, exclude, assert_sdf_equal):
+    sdf = create_sdf(data_path("World"), include=include, exclude=exclude)
+    assert _leaves(sdf) == [Path("/Europe/UK")]
+    # Ancestors are kept, with their inputs
+    full = create_sdf(data_path("World"))
+    pd.testing.assert_frame_equal(sdf.base_intensities, full.base_intensities)
+    pd.testing.assert_frame_equal(
+        sdf.children["Europe"].base_intensities,
+        full.children["Europe"].base_intensities,
+    )
+
+    save_archive(full, tmp_path / "world.sdfa")
+    assert_sdf_equal(
+        create_sdf(tmp_path / "world.sdfa", include=include, exclude=exclude), sdf
+    )
+
+
+def test_load_nothing_matches(data_path):
+    with pytest.raises(ValueError, match="No SDF node matches"):
+        create_sdf(data_path("World"), include=["/Asia"])
+
+
+def test_lazy_load_filtered(data_path):
+    sdf = create_sdf(data_path("World"), include=["/Europe/UK"], lazy=True)
+    europe = sdf.children["Europe"]
+    assert list(europe.children) == ["UK"]
+
+
+def test_pipeline_paths(data_path):
+    full_output = pipeline(create_sdf(data_path("World")))
+    lazy = create_sdf(data_path("World"), lazy=True)
+    output = pipeline(lazy, paths=["/Europe/UK"])
+
+    assert list(output.by_path) == [Path("/Europe/UK")]
+    assert not lazy.children["Europe"].children.is_loaded("Germany")
+    for year in output[Path("/Europe/UK")]:
+        pd.testing.assert_frame_equal(
+            output[Path("/Europe/UK"), year].emissions,
+            full_output[Path("/Europe/UK"), year].emissions,
+        )
+
+    excluded = pipeline(lazy, paths=PathFilter(exclude=("/Europe/UK",)))
+    assert list(excluded.by_path) == [Path("/Europe/Germany")]
@@ -0,0 +1,37 @@
+import json
+
+from mat_dp_pipeline import create_sdf, pipeline
+from mat_dp_pipeline.pipeline import ProfilingReport
+
+
+def test_pipeline_profile(data_path, tmp_path):
+    report = ProfilingReport()
+    with report.stage("sdf_load"):
+        sdf = create_sdf(data_path("World"))
+    output = pipeline(sdf, profile=report)
+
+    assert output.profile is report
+    assert list(report.summary().index) == [
+        "sdf_load",
+        "flatten_hierarchy",
+        "interpolation",
+        "calculate",
+        "result_transfer",
+        "output_assembly",
+    ]
+    assert all(s.wall_time >= 0 and s.peak_rss >= 0 for s in report.stages)
+
+    timings = report.leaf_timings()
+    assert sorted(timings.index) == ["/Europe/Germany", "/Europe/UK"]
+    assert set(timings.columns) == {"interpolation", "calculate", "result_transfer"}
+
+    trace_file = tmp_path / "trace.json"
+    report.save_chrome_trace(trace_file)
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    stage_events = [e["name"] for e in events if e.get("cat") == "stage"]
+    assert stage_events == list(report.summary().index)
+
+
+def test_pipeline_without_profile(data_path):
+    output = pipeline(create_sdf(data_path("World")))
+    assert output.profile is None
@@ -0,0 +1,64 @@
+import io
+
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.sdf import (
+    ArrowBackend,
+    CSVSchema,
+    IndicatorsReader,
+    IntensitiesReader,
+    PandasBackend,
+    ReaderBackend,
+    TargetsReader,
+    create_sdf,
+)
+
+
+class RecordingBackend(ReaderBackend):
+    def __init__(self):
+        self.schemas = []
+
+    def read_csv(self, path, schema: CSVSchema) -> pd.DataFrame:
+        self.schemas.append(schema)
+        return PandasBackend().read_csv(path, schema)
+
+
+def test_readers_use_the_backend(data_path, assert_sdf_equal):
+    backend = RecordingBackend()
+    sdf = create_sdf(data_path("World"), backend=backend)
+    assert_sdf_equal(sdf, create_sdf(data_path("World")))
+    assert {s.index_columns for s in backend.schemas} == {
+        ("Category", "Specific"),
+        ("Resource",),
+    }
+
+
+def test_pandas_backend_types():
+    csv = io.StringIO(
+        "Category,Specific,Description,Material Unit,Production Unit,Steel\n"
+        "Solar,PV,,t,MW,1\n"
+        "Wind,Onshore,Turbine,t,MW,\n"
+    )
+    df = IntensitiesReader(PandasBackend()).read(csv)
+    assert df.index.names == ["Category", "Specific"]
+    assert df["Steel"].dtype == "float64"
+    assert pd.isna(df.loc[("Solar", "PV"), "Description"])
+    assert df.loc[("Wind", "Onshore"), "Description"] == "Turbine"
+
+
+@pytest.mark.parametrize(
+    "reader, file",
+    [
+        (IntensitiesReader, "World/Europe/intensities.csv"),
+        (IntensitiesReader, "World/Europe/Germany/intensities2015.csv"),
+        (TargetsReader, "World/Europe/UK/targets.csv"),
+        (IndicatorsReader, "World/indicators.csv"),
+    ],
+)
+def test_arrow_backend_equals_reference(data_path, reader, file):
+    pytest.importorskip("pyarrow")
+    pd.testing.assert_frame_equal(
+        reader(ArrowBackend()).read(data_path(file)),
+        reader().read(data_path(file)),
+    )
@@ -0,0 +1,120 @@
+import dataclasses
+from multiprocessing import Pool
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.pipeline.calculation import calculate, label_output
+from mat_dp_pipeline.pipeline.flatten_hierarchy import flatten_hierarchy
+from mat_dp_pipeline.pipeline.registry import Registry
+from mat_dp_pipeline.pipeline.sparse_to_processable_input import (
+    _interpolate_years,
+    to_processable_input,
+)
+from mat_dp_pipeline.sdf import SDFBuilder, create_sdf
+
+
+def test_codes_are_sorted_ranks(data_path):
+    sdf = create_sdf(data_path("World"))
+    registry = Registry.from_sdf(sdf)
+    assert registry.techs.is_monotonic_increasing
+    assert registry.resources.to_list() == ["PVC", "Silicon", "Steel"]
+    assert registry.indicators.to_list() == ["CO2"]
+
+    intensities = sdf.base_intensities
+    encoded = registry.encode_intensities(intensities)
+    assert encoded.index.to_list() == [
+        registry.techs.get_loc(tech) for tech in intensities.index
+    ]
+    decoded = encoded.set_axis(
+        registry.tech_labels(encoded.index), axis="index"
+    ).set_axis(registry.resource_labels(encoded.columns).rename(None), axis="columns")
+    pd.testing.assert_frame_equal(decoded, intensities)
+
+    with pytest.raises(ValueError, match="Resources missing"):
+        registry.resource_codes(pd.Index(["Copper"]))
+
+
+def test_interpolation_equals_pandas():
+    rng = np.random.default_rng(0)
+    years = np.array([2015, 2016, 2020, 2021, 2030, 2050])
+    values = rng.random((len(years), 40))
+    values[rng.random(values.shape) < 0.5] = np.nan
+    values[:, 0] = np.nan
+    values[1:, 1] = np.nan
+
+    expected = pd.DataFrame(values, index=years).interpolate(method="index")
+    np.testing.assert_array_equal(_interpolate_years(values, years), expected)
+
+
+def test_yearly_indicators(data_path):
+    builder = SDFBuilder()
+    builder.add_directory(data_path("World"))
+    builder.add(
+        "/",
+        "indicators2017.csv",
+        pd.DataFrame({"Resource": ["Steel", "Silicon", "PVC"], "CO2": [22, 33, 44]}),
+    )
+    flattened = dict(flatten_hierarchy(builder.build()))
+    inputs = {
+        year: inpt.labelled()
+        for _, year, inpt in to_processable_input(
+            Path("/Europe/UK"), flattened[Path("/Europe/UK")]
+        )
+    }
+
+    assert inputs[2014].indicators.loc["Steel", "CO2"] == 20
+    assert inputs[2016].indicators.loc["Steel", "CO2"] == pytest.approx(20 + 2 * 2 / 3)
+    assert inputs[2018].indicators.loc["Steel", "CO2"] == 22
+
+
+def test_subtree_registries(data_path):
+    sdf = create_sdf(data_path("World"))
+    serial = flatten_hierarchy(sdf)
+    with Pool(1) as pool:
+        # Germany and UK have techs of their own, collected by separate workers
+        parallel = flatten_hierarchy(create_sdf(data_path("World"), lazy=True), pool)
+
+    assert [path for path, _ in parallel] == [path for path, _ in serial]
+    assert {id(sparse_years.registry) for _, sparse_years in parallel} == {
+        id(parallel[0][1].registry)
+    }
+    assert parallel[0][1].registry.same_labels(Registry.from_sdf(sdf))
+    for (path, expected), (_, actual) in zip(serial, parallel):
+        assert actual.digest == expected.digest
+        for (_, year, inpt), (_, _, expected_inpt) in zip(
+            to_processable_input(path, actual),
+            to_processable_input(path, expected),
+        ):
+            labelled, expected_labelled = inpt.labelled(), expected_inpt.labelled()
+            pd.testing.assert_frame_equal(
+                labelled.intensities, expected_labelled.intensities
+            )
+            pd.testing.assert_frame_equal(
+                labelled.indicators, expected_labelled.indicators
+            )
+            pd.testing.assert_series_equal(labelled.targets, expected_labelled.targets)
+
+
+def test_outputs_labelled_later(data_path):
+    flattened = dict(flatten_hierarchy(create_sdf(data_path("World"))))
+    memo = {}
+    labelled = []
+    for _, year, inpt in to_processable_input(
+        Path("/Europe/UK"), flattened[Path("/Europe/UK")]
+    ):
+        # Workers get the coded frames only
+        coded = calculate(dataclasses.replace(inpt, registry=None), labelled=False)
+        output = label_output(coded, inpt.registry, memo)
+        expected = calculate(inpt)
+        pd.testing.assert_frame_equal(
+            output.required_resources, expected.required_resources
+        )
+        pd.testing.assert_frame_equal(output.emissions, expected.emissions)
+        labelled.append(output)
+
+    # The years of the leaf share their labels
+    assert len(labelled) > 1 and len(memo) == 1
+    assert labelled[0].emissions.index is labelled[-1].emissions.index
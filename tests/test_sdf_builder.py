@@ -0,0 +1,158 @@
+import io
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mat_dp_pipeline.abstract_data_sources import TargetsSource
+from mat_dp_pipeline.data_sources import StoredIndicators, StoredIntensities
+from mat_dp_pipeline.data_sources.stored import StoredTargets
+from mat_dp_pipeline.sdf import (
+    IntensitiesReader,
+    PathFilter,
+    SDFBuilder,
+    TargetsReader,
+    create_sdf,
+)
+from mat_dp_pipeline.sdf.reader_backends import conform_frame
+
+
+def test_conform_frame_equals_csv_round_trip():
+    df = pd.DataFrame(
+        {
+            "Category": ["Power plant", "Power plant", "Storage"],
+            "Specific": ["Solar", 5, "NA"],
+            "Description": [None, "", "Batteries"],
+            "Material Unit": "t",
+            "Production Unit": ["GW", "GW", np.nan],
+            "Steel": [1, 2, 3],
+            "Copper": [0.1, None, 1e20],
+            "Zinc": ["1.5", "", "NaN"],
+        }
+    )
+    schema = IntensitiesReader().schema
+    csv = io.StringIO(df.to_csv(index=False))
+    pd.testing.assert_frame_equal(
+        conform_frame(df, schema), IntensitiesReader().read(csv)
+    )
+
+    targets = pd.DataFrame(
+        {"Category": ["A"], "Specific": ["B"], 2020: [1], 2030: [2.5]}
+    )
+    csv = io.StringIO(targets.to_csv(index=False))
+    pd.testing.assert_frame_equal(
+        conform_frame(targets, TargetsReader().schema), TargetsReader().read(csv)
+    )
+
+
+def test_builder_equals_directory(data_path, assert_sdf_equal):
+    world = data_path("World")
+    sdf = create_sdf(
+        intensities=StoredIntensities(world),
+        indicators=StoredIndicators(world),
+        targets=StoredTargets(world),
+    )
+    assert_sdf_equal(sdf, create_sdf(world))
+
+
+class FileOnlyTargets(TargetsSource):
+    """Source implementing only the file-writing interface."""
+
+    def __call__(self, output_dir: Path) -> None:
+        uk = output_dir / "Europe" / "UK"
+        uk.mkdir(parents=True)
+        pd.DataFrame(
+            {"Category": ["Power plant"], "Specific": ["Solar PV"], "2020": [1.0]}
+        ).to_csv(uk / self.file_name, index=False)
+
+
+def test_file_only_source(data_path):
+    world = data_path("World")
+    sdf = create_sdf(
+        intensities=StoredIntensities(world),
+        indicators=StoredIndicators(world),
+        targets=FileOnlyTargets(),
+    )
+    targets = sdf.children["Europe"].children["UK"].targets
+    assert targets is not None
+    assert targets.loc[("Power plant", "Solar PV"), "2020"] == 1.0
+
+
+def test_builder():
+    builder = SDFBuilder()
+    indicators = pd.DataFrame({"Resource": ["Steel"], "CO2": [1.0]})
+    intensities = pd.DataFrame(
+        {
+            "Category": ["Power plant"],
+            "Specific": ["Solar PV"],
+            "Description": ["PV"],
+            "Material Unit": ["t"],
+            "Production Unit": ["GW"],
+            "Steel": [2.0],
+        }
+    )
+    targets = pd.DataFrame(
+        {"Category": ["Power plant"], "Specific": ["Solar PV"], "2020": [3.0]}
+    )
+    builder.add("/", "indicators.csv", indicators)
+    builder.add_frames(
+        [
+            (Path("/"), "intensities.csv", intensities),
+            (Path("/Europe/UK"), "targets.csv", targets),
+            (Path("/Africa"), "targets.csv", targets),
+        ]
+    )
+    with pytest.raises(ValueError, match="isn't a name of an SDF file"):
+        builder.add("/", "emissions.csv", indicators)
+
+    sdf = builder.build()
+    assert list(sdf.children) == ["Europe", "Africa"]
+    assert list(sdf.children["Europe"].children) == ["UK"]
+    assert sdf.base_indicators.loc["Steel", "CO2"] == 1.0
+
+    filtered = builder.build(path_filter=PathFilter(include=("/Africa",)))
+    assert list(filtered.children) == ["Africa"]
+
+
+@pytest.mark.parametrize(
+    "workers, processes", [(1, None), (2, False), (2, True), (2, None)]
+)
+def test_concurrent_targets_sources(
+    data_path, tmp_path, assert_sdf_equal, workers, processes
+):
+    world = data_path("World")
+    targets = []
+    for country in ("Germany", "UK"):
+        (tmp_path / country / "Europe" / country).mkdir(parents=True)
+        shutil.copy(
+            world / "Europe" / country / "targets.csv",
+            tmp_path / country / "Europe" / country,
+        )
+        targets.append(StoredTargets(tmp_path / country))
+
+    sdf = create_sdf(
+        intensities=StoredIntensities(world),
+        indicators=StoredIndicators(world),
+        targets=targets,
+        workers=workers,
+        processes=processes,
+    )
+    assert_sdf_equal(sdf, create_sdf(world))
+
+
+def test_conflicting_targets_sources(data_path, caplog):
+    world = data_path("World")
+    sdf = create_sdf(
+        intensities=StoredIntensities(world),
+        indicators=StoredIndicators(world),
+        targets=[StoredTargets(world), FileOnlyTargets()],
+        workers=2,
+    )
+    assert "FileOnlyTargets replaced files" in caplog.text
+    assert "/Europe/UK/targets" in caplog.text
+    # The last source wins
+    targets = sdf.children["Europe"].children["UK"].targets
+    assert targets is not None
+    assert list(targets.index) == [("Power plant", "Solar PV")]
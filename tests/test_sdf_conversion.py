@@ -1,9 +1,12 @@
+import dataclasses
 import difflib
 import logging
 import re
+from multiprocessing import Pool
 from pathlib import Path
 from typing import TextIO
 
+import pandas as pd
 import pytest
 
 from mat_dp_pipeline.pipeline.common import ProcessableInput
@@ -17,6 +20,7 @@ class DiffError(Exception):
 
 
 def to_markdown(output: TextIO, path: Path, year: sdf.Year, inpt: ProcessableInput):
+    inpt = inpt.labelled()
     s = f"""
 ## {path} -- {year}
 ### Intensities
@@ -83,3 +87,75 @@ def test_failure_new_tech_in_yearly_file(data_path):
         match=re.escape("/: Yearly file (2020) introduces new items!"),
     ):
         list(flatten_hierarchy(sdf.load(data_path("Invalid_YearlyFileWithNewTech"))))
+
+
+def test_identical_leaves_share_inputs(data_path):
+    root = sdf.load(data_path("HierarchyTest"))
+    europe = root.children["Europe"]
+    uk = europe.children["UK"]
+    europe.children["UK2"] = dataclasses.replace(uk, name="UK2", targets=uk.targets * 2)
+
+    flattened = dict(flatten_hierarchy(root))
+    uk_input, uk2_input = flattened[Path("/Europe/UK")], flattened[Path("/Europe/UK2")]
+    assert uk_input.digest is not None and uk_input.digest == uk2_input.digest
+    assert uk_input.intensities is uk2_input.intensities
+
+    cache = {}
+    for path, sparse_years_input in flattened.items():
+        cached = to_processable_input(path, sparse_years_input, cache)
+        uncached = to_processable_input(path, sparse_years_input)
+        for (_, _, a), (_, _, b) in zip(cached, uncached, strict=True):
+            pd.testing.assert_frame_equal(a.intensities, b.intensities)
+            pd.testing.assert_frame_equal(a.indicators, b.indicators)
+            pd.testing.assert_series_equal(a.targets, b.targets)
+
+
+def test_indicators_interpolated_once_per_defining_node(data_path):
+    root = sdf.load(data_path("HierarchyTest"))
+    europe = root.children["Europe"]
+    uk = europe.children["UK"]
+    # Two siblings with different intensities, both inheriting Europe's indicators
+    for name, factor in [("FR", 2), ("DE", 3)]:
+        europe.children[name] = dataclasses.replace(
+            uk,
+            name=name,
+            base_intensities=uk.base_intensities * factor,
+            base_indicators=pd.DataFrame(),
+        )
+
+    flattened = dict(flatten_hierarchy(root))
+    fr_input, de_input = flattened[Path("/Europe/FR")], flattened[Path("/Europe/DE")]
+    assert fr_input.digest != de_input.digest
+    assert fr_input.indicators_source == de_input.indicators_source == Path("/Europe")
+    assert flattened[Path("/Europe/UK")].indicators_source == Path("/Europe/UK")
+
+    cache = {}
+    fr_inputs = list(to_processable_input(Path("/Europe/FR"), fr_input, cache))
+    de_inputs = list(to_processable_input(Path("/Europe/DE"), de_input, cache))
+    for (_, _, a), (_, _, b) in zip(fr_inputs, de_inputs, strict=True):
+        assert a.indicators is b.indicators
+        assert not a.intensities.equals(b.intensities)
+
+
+@pytest.mark.parametrize("test_name", ["World", "HierarchyTest", "ScalingTest"])
+def test_parallel_flatten_hierarchy(data_path, test_name: str):
+    root = sdf.load(data_path(test_name))
+    serial = flatten_hierarchy(root)
+    with Pool(2) as pool:
+        parallel = flatten_hierarchy(root, pool=pool)
+
+    assert [path for path, _ in parallel] == [path for path, _ in serial]
+    for (_, a), (_, b) in zip(parallel, serial):
+        assert a.digest == b.digest
+        pd.testing.assert_frame_equal(a.intensities, b.intensities)
+        pd.testing.assert_frame_equal(a.indicators, b.indicators)
+        pd.testing.assert_frame_equal(a.targets, b.targets)
+        pd.testing.assert_frame_equal(a.tech_metadata, b.tech_metadata)
+
+
+@pytest.mark.parametrize("workers, processes", [(1, False), (4, False), (2, True)])
+def test_concurrent_load(data_path, assert_sdf_equal, workers, processes):
+    root = data_path("World")
+    assert_sdf_equal(
+        sdf.load(root, workers=workers, processes=processes), sdf.load(root, workers=1)
+    )
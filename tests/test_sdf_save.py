@@ -0,0 +1,61 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from mat_dp_pipeline.sdf import create_sdf
+from mat_dp_pipeline.sdf.manifest import MANIFEST_FILE_NAME, read_manifest
+
+
+def _mtimes(root):
+    return {f.relative_to(root): f.stat().st_mtime_ns for f in root.rglob("*.csv")}
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_save_round_trip(data_path, tmp_path, assert_sdf_equal, workers):
+    sdf = create_sdf(data_path("World"))
+    sdf.save(tmp_path, workers=workers)
+    assert_sdf_equal(create_sdf(tmp_path), create_sdf(data_path("World")))
+    # Only incremental saves keep a manifest
+    assert not (tmp_path / MANIFEST_FILE_NAME).exists()
+
+
+def test_save_keeps_other_files(data_path, tmp_path):
+    (tmp_path / "Asia").mkdir()
+    (tmp_path / "Asia" / "targets.csv").write_text("Category,Specific,2030\n")
+    create_sdf(data_path("World")).save(tmp_path)
+    create_sdf(data_path("World") / "Europe").save(tmp_path)
+    assert (tmp_path / "Asia" / "targets.csv").exists()
+    assert (tmp_path / "Europe" / "UK" / "targets.csv").exists()
+
+
+def test_incremental_save(data_path, tmp_path, assert_sdf_equal):
+    source = tmp_path / "source"
+    output = tmp_path / "output"
+    shutil.copytree(data_path("World"), source)
+    create_sdf(source).save(output, incremental=True)
+    assert set(read_manifest(output)) == {
+        f.relative_to(output).as_posix() for f in output.rglob("*.csv")
+    }
+    before = _mtimes(output)
+
+    # Unchanged SDF: nothing is written
+    create_sdf(source).save(output, incremental=True)
+    assert _mtimes(output) == before
+
+    uk_targets = source / "Europe" / "UK" / "targets.csv"
+    uk_targets.write_text(uk_targets.read_text().replace("1", "2"))
+    shutil.rmtree(source / "Europe" / "Germany")
+    # A file modified since the last save is rewritten too
+    (output / "intensities.csv").write_text("")
+
+    create_sdf(source).save(output, incremental=True)
+    after = _mtimes(output)
+    changed = {f for f in after if after[f] != before[f]}
+    assert changed == {
+        Path() / "intensities.csv",
+        Path() / "Europe" / "UK" / "targets.csv",
+    }
+    assert not list((output / "Europe" / "Germany").glob("*.csv"))
+    assert (output / MANIFEST_FILE_NAME).exists()
+    assert_sdf_equal(create_sdf(output), create_sdf(source))
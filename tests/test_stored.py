@@ -0,0 +1,48 @@
+from pathlib import Path
+
+import pytest
+
+from mat_dp_pipeline.data_sources import LinkMode, StoredSDF, StoredTargets
+from mat_dp_pipeline.sdf import create_sdf
+
+
+@pytest.mark.parametrize("link", list(LinkMode))
+def test_link_modes(data_path, tmp_path, link):
+    world = data_path("World")
+    StoredTargets(world, link)(tmp_path)
+
+    source_files = sorted(world.rglob("targets.csv"))
+    files = sorted(tmp_path.rglob("targets.csv"))
+    assert [f.relative_to(tmp_path) for f in files] == [
+        f.relative_to(world) for f in source_files
+    ]
+    for file, source_file in zip(files, source_files):
+        assert file.read_bytes() == source_file.read_bytes()
+        assert file.is_symlink() == (link == LinkMode.SYMLINK)
+        if link == LinkMode.HARDLINK:
+            assert file.samefile(source_file)
+
+
+def test_shared_scan(data_path, monkeypatch, assert_sdf_equal):
+    walks = []
+    rglob = Path.rglob
+
+    def counted(self, pattern):
+        walks.append(self)
+        return rglob(self, pattern)
+
+    monkeypatch.setattr(Path, "rglob", counted)
+    world = data_path("World")
+    stored = StoredSDF.scan(world)
+    assert walks == [world]
+    sdf = create_sdf(
+        intensities=stored.intensities,
+        indicators=stored.indicators,
+        targets=stored.targets,
+        # Walks of the source threads would be counted here too
+        processes=False,
+    )
+    assert walks == [world]
+
+    monkeypatch.setattr(Path, "rglob", rglob)
+    assert_sdf_equal(sdf, create_sdf(world))
@@ -0,0 +1,33 @@
+from mat_dp_pipeline import pipeline
+from mat_dp_pipeline.sdf import SyntheticSDFSpec, generate_sdf, write_synthetic_sdf
+from mat_dp_pipeline.sdf.standard_data_format import load
+
+SPEC = SyntheticSDFSpec(depth=2, fan_out=3, n_techs=6, yearly_overlays=2, seed=7)
+
+
+def test_generated_sdf_shape():
+    sdf = generate_sdf(SPEC)
+    leaves = [
+        grandchild
+        for child in sdf.children.values()
+        for grandchild in child.children.values()
+    ]
+    assert len(leaves) == SPEC.n_leaves == 9
+    assert all(leaf.is_leaf() and not leaf.children for leaf in leaves)
+    assert len(sdf.intensities_yearly) == 2
+    assert list(sdf.base_indicators.columns) == SPEC.indicators
+
+
+def test_generation_is_deterministic(assert_sdf_equal):
+    assert_sdf_equal(generate_sdf(SPEC), generate_sdf(SPEC))
+
+
+def test_written_sdf_matches_generated(tmp_path, assert_sdf_equal):
+    write_synthetic_sdf(tmp_path, SPEC)
+    assert_sdf_equal(load(tmp_path), generate_sdf(SPEC))
+
+
+def test_generated_sdf_runs_through_pipeline():
+    output = pipeline(generate_sdf(SPEC))
+    assert len(output.by_path) == SPEC.n_leaves
+    assert sorted(output.by_year) == list(SPEC.target_years)
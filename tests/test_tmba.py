@@ -0,0 +1,57 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import mat_dp_pipeline.data_sources as ds
+
+
+@pytest.fixture()
+def results_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    keys = pd.MultiIndex.from_product(
+        [
+            ["KE", "NM", "ZA"],
+            ["Capacity", "Generation", "Emissions"],
+            ["Coal", "Geothermal", "Unmapped"],
+        ],
+        names=["country", "parameter", "variable"],
+    ).to_frame(index=False)
+    keys.insert(0, "Unnamed: 0", range(len(keys)))
+    keys.insert(1, "scenario", "1.5")
+    values = pd.DataFrame(
+        rng.uniform(0.0, 100.0, size=(len(keys), 3)), columns=[2020, 2030, 2040]
+    )
+    values.iloc[4, 1] = np.nan
+    path = tmp_path / "results.csv"
+    keys.join(values).sample(frac=1, random_state=0).to_csv(path, index=False)
+    return path
+
+
+@pytest.mark.parametrize("chunksize", [1, 5, 1000])
+def test_streaming_equals_full_read(results_csv, chunksize):
+    parameters = ["Capacity", "Generation"]
+    full = ds.TMBATargetsSource.from_csv(
+        results_csv, parameters, ds.MatDPDBIntensitiesSource
+    )
+    streamed = ds.TMBATargetsSource.from_csv(
+        results_csv, parameters, ds.MatDPDBIntensitiesSource, chunksize=chunksize
+    )
+
+    expected = list(full.frames())
+    assert len(expected) == 6
+    for _ in range(2):  # The file is read anew each time
+        frames = list(streamed.frames())
+        assert [(p, f) for p, f, _ in frames] == [(p, f) for p, f, _ in expected]
+        for (_, _, df), (_, _, expected_df) in zip(frames, expected):
+            pd.testing.assert_frame_equal(df, expected_df)
+
+
+def test_streaming_without_selected_targets(results_csv, caplog):
+    source = ds.TMBATargetsSource.from_csv(
+        results_csv, ["Missing"], ds.MatDPDBIntensitiesSource, chunksize=5
+    )
+    with caplog.at_level(logging.WARNING):
+        assert list(source.frames()) == []
+    assert "Targets for selected parameters are empty!" in caplog.text